@@ -1 +1,5 @@
 __version__ = "1.1.2"
+
+from firebolt_db.frames import read_frame, write_frame  # noqa: E402
+
+__all__ = ["read_frame", "write_frame"]
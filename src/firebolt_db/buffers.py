@@ -0,0 +1,250 @@
+"""Buffers holding fetched rows of the async driver until they're consumed.
+
+The async driver fetches a whole result set during execution, since
+SQLAlchemy consumes it later from synchronous code. A buffer only has to be
+a sequence of rows, see `AsyncCursorWrapper`.
+"""
+
+import pickle
+from array import array
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
+from typing import (
+    IO,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+DEFAULT_SPILL_BATCH_ROWS = 1000
+
+# Array type codes for column types of the SDK cursor description
+_TYPECODES = {int: "q", float: "d"}
+
+
+def _compact_column(
+    values: List[Any], type_code: Any
+) -> Tuple[Sequence[Any], Optional[bytearray]]:
+    """Store numeric values in a typed array, with a mask of NULL values."""
+    typecode = _TYPECODES.get(type_code)
+    if typecode is None:
+        return values, None
+    try:
+        return array(typecode, values), None
+    except TypeError:
+        nulls = bytearray(value is None for value in values)
+        try:
+            return array(typecode, [0 if v is None else v for v in values]), nulls
+        except (TypeError, OverflowError):
+            return values, None
+    except OverflowError:
+        # Integers outside of 64 bits
+        return values, None
+
+
+class ColumnarRows(Sequence):
+    """Rows of a result set stored column by column.
+
+    Values of integer and floating point columns are kept in typed arrays,
+    other columns in lists. Rows are built as tuples when they are accessed,
+    so a buffered result doesn't hold a Python object per row and per value.
+
+    Args:
+        rows: Rows of the result.
+        type_codes: Python type of each column, as in the cursor description.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[Any]], type_codes: Sequence[Any]):
+        self._length = len(rows)
+        self._columns: List[Sequence[Any]] = []
+        # (column position, NULL mask) of numeric columns with NULL values
+        self._nulls: List[Tuple[int, bytearray]] = []
+        for position, type_code in enumerate(type_codes):
+            column, nulls = _compact_column([row[position] for row in rows], type_code)
+            self._columns.append(column)
+            if nulls is not None:
+                self._nulls.append((position, nulls))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            rows = zip(*(column[start:stop:step] for column in self._columns))
+            if not self._nulls:
+                return list(rows)
+            indexes = range(start, stop, step)
+            return [self._set_nulls(row, i) for row, i in zip(rows, indexes)]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        row = tuple(column[index] for column in self._columns)
+        return self._set_nulls(row, index) if self._nulls else row
+
+    def _set_nulls(self, row: Tuple, index: int) -> Tuple:
+        if not any(nulls[index] for _, nulls in self._nulls):
+            return row
+        values = list(row)
+        for position, nulls in self._nulls:
+            if nulls[index]:
+                values[position] = None
+        return tuple(values)
+
+
+class SpilledRows(Sequence):
+    """Rows of a result set that spill to disk past a threshold.
+
+    The first `threshold` rows are kept in memory, the rest is pickled in
+    batches of `batch_rows` into an anonymous temporary file. Once `finish`
+    is called the file is memory-mapped and read back one batch at a time,
+    so fetching a result sequentially holds at most one batch of spilled rows.
+
+    Args:
+        threshold: Number of rows kept in memory.
+        batch_rows: Number of rows written and read back at once.
+    """
+
+    def __init__(self, threshold: int, batch_rows: int = DEFAULT_SPILL_BATCH_ROWS):
+        self.threshold = threshold
+        self.batch_rows = batch_rows
+        self._head: List[Any] = []
+        self._pending: List[Any] = []
+        self._file: Optional[IO[bytes]] = None
+        self._map: Optional[mmap] = None
+        # Start of each batch in the file
+        self._offsets: List[int] = []
+        self._spilled_rows = 0
+        self._loaded_batch = -1
+        self._loaded: List[Any] = []
+
+    @property
+    def spilled(self) -> bool:
+        """Whether any rows were written to disk."""
+        return self._file is not None
+
+    def extend(self, rows: Iterable[Any]) -> None:
+        """Append rows, writing full batches past the threshold to disk."""
+        rows = list(rows)
+        room = self.threshold - len(self._head)
+        if room > 0:
+            self._head.extend(rows[:room])
+            rows = rows[room:]
+        self._pending.extend(rows)
+        while len(self._pending) >= self.batch_rows:
+            self._write_batch(self._pending[: self.batch_rows])
+            del self._pending[: self.batch_rows]
+
+    def finish(self) -> None:
+        """Write the last batch and map the file for reading."""
+        if self._pending:
+            self._write_batch(self._pending)
+            self._pending = []
+        if self._file is not None and self._map is None:
+            self._file.flush()
+            self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+
+    def _write_batch(self, rows: List[Any]) -> None:
+        if self._file is None:
+            self._file = TemporaryFile(prefix="firebolt_db_")
+        self._offsets.append(self._file.tell())
+        pickle.dump(rows, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled_rows += len(rows)
+
+    def _load_batch(self, batch: int) -> List[Any]:
+        if batch != self._loaded_batch:
+            if self._map is None:
+                raise RuntimeError("Spilled rows are read only after finish()")
+            start = self._offsets[batch]
+            end = (
+                self._offsets[batch + 1]
+                if batch + 1 < len(self._offsets)
+                else len(self._map)
+            )
+            self._loaded = pickle.loads(self._map[start:end])
+            self._loaded_batch = batch
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._head) + self._spilled_rows + len(self._pending)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        if index < len(self._head):
+            return self._head[index]
+        batch, position = divmod(index - len(self._head), self.batch_rows)
+        return self._load_batch(batch)[position]
+
+    def close(self) -> None:
+        """Release rows in memory and delete the file."""
+        self._head = []
+        self._pending = []
+        self._loaded = []
+        self._loaded_batch = -1
+        self._offsets = []
+        self._spilled_rows = 0
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RemainingRows(Sequence):
+    """Rows of a buffer from `start` on, read from the buffer as they are
+    accessed.
+
+    `AsyncCursorWrapper.fetchall` returns spilled rows this way, so that
+    iterating over them holds one batch in memory at a time. The view takes
+    over the buffer, which is closed with the view or once it's collected.
+
+    Args:
+        rows: Buffer of rows.
+        start: Position of the first row of the view in the buffer.
+    """
+
+    def __init__(self, rows: Sequence, start: int = 0):
+        self._rows = rows
+        self._start = start
+        self._length = max(len(rows) - start, 0)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return self._rows[self._start + index]
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self._start, self._start + self._length):
+            yield self._rows[index]
+
+    def close(self) -> None:
+        """Close the buffer."""
+        close_buffer(self._rows)
+        self._rows = []
+        self._length = 0
+
+
+def close_buffer(rows: Sequence) -> None:
+    """Close a buffer if it holds resources other than memory."""
+    close = getattr(rows, "close", None)
+    if close is not None:
+        close()
@@ -0,0 +1,68 @@
+"""Coalescing of identical read-only statements running at the same time.
+
+When many coroutines issue the same query at once, e.g. to render the same
+dashboard, only the first one sends it to Firebolt. The others wait for its
+result and share the buffered rows, see `AsyncCursorWrapper`.
+"""
+
+import asyncio
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run a single call at a time per key, sharing its result with callers
+    asking for the same key while it runs.
+
+    Results are not kept once the call completes. Calls made in different
+    event loops are never shared.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+        self._lock = Lock()
+        self._metrics = {"executed": 0, "coalesced": 0}
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of calls `executed`, and `coalesced` into one of them."""
+        with self._lock:
+            return dict(self._metrics)
+
+    async def run(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Await `function`, or the call running for `key` already."""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        while True:
+            with self._lock:
+                future = self._calls.get(call_key)
+                if future is None:
+                    future = self._calls[call_key] = loop.create_future()
+                    self._metrics["executed"] += 1
+                    break
+                self._metrics["coalesced"] += 1
+            try:
+                # Cancelling a waiting caller must not cancel the call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller running it was cancelled, run it again
+
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Retrieved, so that it isn't logged when nobody else waits
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[call_key]
+        return result
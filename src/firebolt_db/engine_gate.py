@@ -0,0 +1,141 @@
+"""Single-flight connection to Firebolt engines that may need to start.
+
+Connecting to a stopped engine either fails or waits for the engine to start.
+Without coordination every pool slot does the same, so connections to an
+engine go through a gate: until the engine is known to be running only one
+caller connects, the others queue behind it.
+"""
+
+import logging
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+UNKNOWN = "unknown"
+STARTING = "starting"
+RUNNING = "running"
+FAILED = "failed"
+
+DEFAULT_START_TIMEOUT = 0.0
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+
+def _is_engine_not_running(error: BaseException) -> bool:
+    from firebolt.utils.exception import EngineNotRunningError
+
+    return isinstance(error, EngineNotRunningError)
+
+
+class ConnectGate:
+    """Serialize connections to an engine until one of them succeeds.
+
+    The caller at the front retries with exponential backoff while the engine
+    is not running. If it gives up, callers queued behind it fail with the
+    same error instead of waiting for the engine one after another. Once a
+    connection succeeds, the gate is open and connections are made concurrently.
+
+    Args:
+        name: Engine target the gate is for, used in log messages.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = UNKNOWN
+        self.last_error: Optional[BaseException] = None
+        self._lock = Lock()
+        self._failures = 0
+
+    def connect(
+        self,
+        connect: Callable[[], T],
+        start_timeout: float = DEFAULT_START_TIMEOUT,
+        backoff: float = DEFAULT_BACKOFF,
+    ) -> T:
+        """Connect through the gate.
+
+        Args:
+            connect: Function creating the connection.
+            start_timeout: Seconds to keep retrying while the engine is not
+                running, 0 to fail on the first attempt.
+            backoff: Seconds before the first retry, doubled after each one
+                up to `MAX_BACKOFF`.
+        """
+        if self.status == RUNNING:
+            try:
+                return connect()
+            except Exception as error:
+                if not _is_engine_not_running(error):
+                    raise
+                logger.info("Firebolt engine %s is no longer running", self.name)
+                self.status = UNKNOWN
+
+        failures = self._failures
+        with self._lock:
+            if self.status == RUNNING:
+                return connect()
+            if self._failures != failures and self.last_error is not None:
+                # Whoever was in front of us just gave up on this engine
+                raise self.last_error
+            try:
+                connection = self._connect_with_backoff(connect, start_timeout, backoff)
+            except Exception as error:
+                self.status = FAILED
+                self.last_error = error
+                self._failures += 1
+                raise
+            if self.status == STARTING:
+                logger.info("Firebolt engine %s is running", self.name)
+            self.status = RUNNING
+            self.last_error = None
+            return connection
+
+    def _connect_with_backoff(
+        self, connect: Callable[[], T], start_timeout: float, backoff: float
+    ) -> T:
+        deadline = monotonic() + start_timeout
+        attempt = 1
+        while True:
+            try:
+                return connect()
+            except Exception as error:
+                remaining = deadline - monotonic()
+                if not _is_engine_not_running(error) or remaining <= 0:
+                    raise
+                delay = min(backoff * 2 ** (attempt - 1), MAX_BACKOFF, remaining)
+                self.status = STARTING
+                logger.info(
+                    "Firebolt engine %s is not running, connection attempt %d "
+                    "will be retried in %.1f seconds",
+                    self.name,
+                    attempt,
+                    delay,
+                )
+                sleep(delay)
+                attempt += 1
+
+
+_gates: Dict[str, ConnectGate] = {}
+_gates_lock = Lock()
+
+
+def get_connect_gate(name: str) -> ConnectGate:
+    """Get the gate of an engine target, see `engine_target_name`."""
+    with _gates_lock:
+        if name not in _gates:
+            _gates[name] = ConnectGate(name)
+        return _gates[name]
+
+
+def engine_target_name(connect_kwargs: Mapping[str, Any]) -> str:
+    """Name of the engine SDK connection arguments point to."""
+    if connect_kwargs.get("url"):
+        return connect_kwargs["url"]
+    return "{}/{}".format(
+        connect_kwargs.get("account_name") or "",
+        connect_kwargs.get("engine_name") or "system",
+    )
@@ -3,19 +3,47 @@ from __future__ import annotations
 from asyncio import Lock
 from functools import partial
 from types import ModuleType
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import firebolt.async_db as async_dbapi
-from firebolt.async_db import Connection
 from sqlalchemy.engine import AdaptedConnection  # type: ignore[attr-defined]
 
 # Ignoring type since sqlalchemy-stubs doesn't cover AdaptedConnection
 # and util.concurrency
-from sqlalchemy.pool import AsyncAdaptedQueuePool  # type: ignore[attr-defined]
 from sqlalchemy.util.concurrency import await_only  # type: ignore[import]
-from trio import run
 
-from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.buffers import (
+    ColumnarRows,
+    RemainingRows,
+    SpilledRows,
+    close_buffer,
+)
+from firebolt_db.coalescing import SingleFlight
+from firebolt_db.firebolt_dialect import FireboltDialect, request_encoding
+from firebolt_db.overload import EngineGuard
+from firebolt_db.pool import FireboltAsyncAdaptedQueuePool
+from firebolt_db.prepared import (
+    PreparedStatement,
+    PreparedStatementCache,
+    aexecute_prepared,
+)
+from firebolt_db.retry import RetryPolicy
+from firebolt_db.routing import is_read_statement
+
+if TYPE_CHECKING:
+    # firebolt.async_db and trio are imported lazily, on first connection
+    from firebolt.async_db import Connection
 
 
 class AsyncCursorWrapper:
@@ -24,7 +52,9 @@ class AsyncCursorWrapper:
         "_connection",
         "await_",
         "_cursor",
-        "_rows",
+        "_buffer",
+        "_position",
+        "_soft_closed_memoized",
     )
 
     server_side = False
@@ -33,15 +63,31 @@ class AsyncCursorWrapper:
         self._adapt_connection = adapt_connection
         self._connection = adapt_connection._connection
         self.await_ = adapt_connection.await_
-        self._rows: List[List] = []
+        self._buffer: Sequence = []
+        self._position = 0
+        self._soft_closed_memoized: Dict[str, Any] = {}
         self._cursor = self._connection.cursor()
 
+    @property
+    def _rows(self) -> List:
+        """Rows that have not been fetched yet."""
+        return list(self._buffer[self._position :])
+
+    @_rows.setter
+    def _rows(self, rows: Sequence) -> None:
+        close_buffer(self._buffer)
+        self._buffer = rows
+        self._position = 0
+
     def close(self) -> None:
-        self._rows[:] = []
-        self._cursor.close()
+        self._rows = []
+        if not self._soft_closed_memoized:
+            self._cursor.close()
 
     @property
     def description(self) -> str:
+        if "description" in self._soft_closed_memoized:
+            return self._soft_closed_memoized["description"]
         return self._cursor.description
 
     @property
@@ -54,37 +100,164 @@ class AsyncCursorWrapper:
 
     @property
     def rowcount(self) -> int:
+        if "rowcount" in self._soft_closed_memoized:
+            return self._soft_closed_memoized["rowcount"]
         return self._cursor.rowcount
 
     def execute(
         self,
         operation: str,
         parameters: Optional[Tuple] = None,
+        skip_parsing: bool = False,
     ) -> None:
-        self.await_(self._execute(operation, parameters))
+        self.await_(self._execute(operation, parameters, skip_parsing))
 
     async def _execute(
         self,
         operation: str,
         parameters: Optional[Tuple] = None,
+        skip_parsing: bool = False,
     ) -> None:
         async with self._adapt_connection._execute_mutex:
-            await self._cursor.execute(operation, parameters)
-            if self._cursor.description:
-                self._rows = await self._cursor.fetchall()
-            else:
-                self._rows = []
+            self._rows = []
+            single_flight = self._adapt_connection._single_flight
+            key = (
+                self._coalescing_key(operation, parameters, skip_parsing)
+                if single_flight is not None
+                else None
+            )
+            if single_flight is None or key is None:
+                await self._run(operation, parameters, skip_parsing)
+                return
+            description, rowcount, rows = await single_flight.run(
+                key, partial(self._run_shared, operation, parameters, skip_parsing)
+            )
+            if rows is not self._buffer:
+                # Result of a statement run by another cursor, this one's SDK
+                # cursor wasn't used
+                self._rows = rows
+                self._soft_closed_memoized = {
+                    "description": description,
+                    "rowcount": rowcount,
+                }
+                await self._cursor.aclose()
+
+    def _coalescing_key(
+        self, operation: str, parameters: Optional[Tuple], skip_parsing: bool
+    ) -> Optional[Hashable]:
+        """Key of a statement and the session it runs in, None if its result
+        can't be shared."""
+        if (
+            not is_read_statement(operation)
+            # Spilled results are deleted once consumed by a cursor
+            or self._adapt_connection._spill_threshold is not None
+            # Connections only track transactions since firebolt-sdk 1.18.0
+            or getattr(self._connection, "in_transaction", False)
+        ):
+            return None
+        key = (
+            operation,
+            tuple(parameters or ()),
+            skip_parsing,
+            self._cursor.database,
+            self._cursor.engine_url,
+            frozenset(self._cursor._set_parameters.items()),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            # e.g. lists as parameter values
+            return None
+        return key
+
+    async def _run_shared(
+        self, operation: str, parameters: Optional[Tuple], skip_parsing: bool
+    ) -> Tuple[Any, int, Sequence]:
+        await self._run(operation, parameters, skip_parsing)
+        return self._cursor.description, self._cursor.rowcount, self._buffer
+
+    async def _run(
+        self, operation: str, parameters: Optional[Tuple], skip_parsing: bool
+    ) -> None:
+        """Execute a statement and buffer its result."""
+        is_read = is_read_statement(operation)
+        # Only results of read-only statements are streamed and spilled
+        spill_threshold = self._adapt_connection._spill_threshold
+        if not is_read:
+            spill_threshold = None
+        prepared_statements = self._adapt_connection._prepared_statements
+        prepared = (
+            prepared_statements.prepare(operation, parameters or ())
+            if prepared_statements is not None
+            else None
+        )
+        execute: Callable[[], Awaitable[Any]]
+        if prepared is not None:
+            execute = partial(
+                aexecute_prepared,
+                self._cursor,
+                prepared,
+                parameters,
+                spill_threshold is not None,
+            )
+        else:
+            execute = partial(
+                (
+                    self._cursor.execute
+                    if spill_threshold is None
+                    else self._cursor.execute_stream
+                ),
+                operation,
+                parameters,
+                skip_parsing,
+            )
+        engine_guard = self._adapt_connection._engine_guard
+        if engine_guard is not None:
+            execute = partial(engine_guard.acall, execute)
+        retry_policy = self._adapt_connection._retry_policy
+        if retry_policy is not None and is_read:
+            await retry_policy.acall(execute)
+        else:
+            await execute()
+        if not self._cursor.description:
+            return
+        if spill_threshold is not None:
+            self._rows = await self._fetch_spilled(spill_threshold)
+            return
+        rows = await self._cursor.fetchall()
+        if self._adapt_connection._columnar_results:
+            rows = ColumnarRows(
+                rows, [column.type_code for column in self._cursor.description]
+            )
+        self._rows = rows
+
+    async def _fetch_spilled(self, threshold: int) -> SpilledRows:
+        """Fetch a streamed result, spilling rows past `threshold` to disk."""
+        rows = SpilledRows(threshold)
+        try:
+            while True:
+                batch = await self._cursor.fetchmany(rows.batch_rows)
+                if not batch:
+                    break
+                rows.extend(batch)
+            rows.finish()
+        except BaseException:
+            rows.close()
+            raise
+        return rows
 
     def executemany(self, operation: str, seq_of_parameters: List[Tuple]) -> None:
         raise NotImplementedError("executemany is not supported yet")
 
     def __iter__(self) -> Iterator[List]:
-        while self._rows:
-            yield self._rows.pop(0)
+        while self._position < len(self._buffer):
+            yield self.fetchone()
 
     def fetchone(self) -> Optional[List]:
-        if self._rows:
-            return self._rows.pop(0)
+        if self._position < len(self._buffer):
+            row = self._buffer[self._position]
+            self._position += 1
+            return row
         else:
             return None
 
@@ -92,15 +265,32 @@ class AsyncCursorWrapper:
         if size is None:
             size = self._cursor.arraysize
 
-        retval = self._rows[0:size]
-        self._rows[:] = self._rows[size:]
-        return retval
+        retval = self._buffer[self._position : self._position + size]
+        self._position += len(retval)
+        return list(retval)
 
-    def fetchall(self) -> List[List]:
-        retval = self._rows[:]
-        self._rows[:] = []
+    def fetchall(self) -> Sequence[List]:
+        """Fetch the remaining rows.
+
+        Spilled rows are returned as a `RemainingRows` view reading them back
+        from disk as they're accessed, rather than loaded into a list. Fetching
+        with `fetchmany`, or streaming the result from SQLAlchemy, keeps the
+        memory held bounded, as SQLAlchemy builds a list of all rows fetched
+        by `fetchall`.
+        """
+        if isinstance(self._buffer, SpilledRows) and self._buffer.spilled:
+            # The view takes over the buffer, it isn't closed here
+            retval: Sequence[List] = RemainingRows(self._buffer, self._position)
+            self._buffer, self._position = [], 0
+            return retval
+        retval = list(self._buffer[self._position :])
+        self._rows = []
         return retval
 
+    @property
+    def connection(self) -> AsyncConnectionWrapper:
+        return self._adapt_connection
+
     @property
     def _set_parameters(self) -> Dict[str, Any]:
         return self._cursor._set_parameters
@@ -110,23 +300,58 @@ class AsyncCursorWrapper:
         self._cursor._set_parameters = value
 
     async def _async_soft_close(self) -> None:
-        """close the cursor but keep the results pending, and memoize the
-        description.
-
-        We don't have ability to memorize results with async driver yet so
-        keeping this a no-op.
+        """Close the SDK cursor but keep the buffered results, and memoize
+        the description and row count.
 
+        Called by the asyncio extension once a result is buffered, so that
+        the SDK cursor and the raw rows it holds are released right away.
         """
+        if self._soft_closed_memoized or self._cursor.closed:
+            return
+        self._soft_closed_memoized = {
+            "description": self._cursor.description,
+            "rowcount": self._cursor.rowcount,
+        }
+        await self._cursor.aclose()
 
 
 class AsyncConnectionWrapper(AdaptedConnection):
     await_ = staticmethod(await_only)
-    __slots__ = ("dbapi", "_connection", "_execute_mutex")
+    __slots__ = (
+        "dbapi",
+        "_connection",
+        "_execute_mutex",
+        "_set_parameters",
+        "_spill_threshold",
+        "_columnar_results",
+        "_retry_policy",
+        "_engine_guard",
+        "_single_flight",
+        "_prepared_statements",
+    )
 
-    def __init__(self, dbapi: AsyncAPIWrapper, connection: Connection):
+    def __init__(
+        self,
+        dbapi: AsyncAPIWrapper,
+        connection: Connection,
+        spill_threshold: Optional[int] = None,
+        columnar_results: bool = False,
+    ):
         self.dbapi = dbapi
         self._connection = connection
         self._execute_mutex = Lock()
+        self._set_parameters: Dict[str, Any] = {}
+        # Rows of a result kept in memory, None to never spill to disk
+        self._spill_threshold = spill_threshold
+        # Buffer results in memory column by column, see ColumnarRows
+        self._columnar_results = columnar_results
+        # Set by the dialect, see FireboltDialect.retry_policy and engine_guard
+        self._retry_policy: Optional[RetryPolicy] = None
+        self._engine_guard: Optional[EngineGuard] = None
+        # Shared by the connections of an engine, see `coalesce_reads`
+        self._single_flight: Optional[SingleFlight] = None
+        # Statements prepared on the connection, see `prepared_statements`
+        self._prepared_statements: Optional[PreparedStatementCache] = None
 
     def cursor(self) -> AsyncCursorWrapper:
         return AsyncCursorWrapper(self)
@@ -162,26 +387,74 @@ class AsyncAPIWrapper(ModuleType):
             setattr(self, name, getattr(self.dbapi, name))
 
     def connect(self, *arg: Any, **kw: Any) -> AsyncConnectionWrapper:
+        from trio import run
+
+        spill_threshold = kw.pop("spill_threshold", None)
+        columnar_results = kw.pop("columnar_results", False)
+        encoding = kw.pop("compression", None)
         # Synchronously establish a connection that can execute
         # asynchronous queries later
         conn_func = partial(self.dbapi.connect, *arg, **kw)  # type: ignore[attr-defined] # noqa: F821,E501
         connection = run(conn_func)
+        if encoding is not None:
+            request_encoding(connection, encoding)
         return AsyncConnectionWrapper(
-            self,
-            connection,
+            self, connection, spill_threshold, columnar_results
         )
 
 
 class AsyncFireboltDialect(FireboltDialect):
     driver = "firebolt_aio"
-    supports_statement_cache: bool = False
+    supports_statement_cache: bool = True
     supports_server_side_cursors: bool = False
     is_async: bool = True
-    poolclass = AsyncAdaptedQueuePool
+    # Read engine pools are only implemented for the sync driver
+    supports_read_routing: bool = False
+    supports_engine_start_wait: bool = False
+    supports_result_buffers: bool = True
+    # Coalescing of identical reads running at once, see `coalesce_reads`
+    single_flight: Optional[SingleFlight] = None
+    poolclass = FireboltAsyncAdaptedQueuePool
 
     @classmethod
-    def dbapi(cls) -> AsyncAPIWrapper:
+    def import_dbapi(cls) -> AsyncAPIWrapper:  # For sqlalchemy >= 2.0.0
+        import firebolt.async_db as async_dbapi
+
         return AsyncAPIWrapper(async_dbapi)
 
+    @classmethod
+    def dbapi(cls) -> AsyncAPIWrapper:  # Kept for backwards compatibility
+        return cls.import_dbapi()
+
+    def connect(self, *cargs: Any, **cparams: Any) -> Any:
+        connection = super().connect(*cargs, **cparams)
+        connection._retry_policy = self.retry_policy
+        connection._engine_guard = self.engine_guard
+        connection._single_flight = self.single_flight
+        return connection
+
+    def _pop_result_buffer_options(self, parameters: Dict[str, Any]) -> Dict:
+        options = super()._pop_result_buffer_options(parameters)
+        # Coalescing is set up per engine, connections only share it
+        self.single_flight = (
+            SingleFlight() if options.pop("coalesce_reads", False) else None
+        )
+        return options
+
+    def _run_statement(self, statement: str, execute: Callable[[], Any]) -> None:
+        # AsyncCursorWrapper guards and retries statements without blocking
+        # the event loop
+        execute()
+
+    def _prepare(
+        self, connection: Any, statement: str, parameters: Sequence[Any]
+    ) -> Optional[PreparedStatement]:
+        # AsyncCursorWrapper executes prepared statements with the SDK cursor
+        return None
+
+    def _connect_dbapi(self, **cparams: Any) -> Any:
+        # AsyncAPIWrapper sets the encoding on the SDK connection it wraps
+        return self.loaded_dbapi.connect(**cparams)
+
 
 dialect = AsyncFireboltDialect
@@ -1,23 +1,34 @@
+import json
 import os
+import re
+from functools import partial
+from importlib.util import find_spec
 from types import ModuleType
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-import firebolt.db as dbapi
 import sqlalchemy.types as sqltypes
-from firebolt.client.auth import (
-    Auth,
-    ClientCredentials,
-    FireboltCore,
-    UsernamePassword,
-)
-from firebolt.db import Cursor
+from sqlalchemy import event
 from sqlalchemy.engine import Connection as AlchemyConnection
-from sqlalchemy.engine import ExecutionContext, default
+from sqlalchemy.engine import Engine, ExecutionContext, default, reflection
+from sqlalchemy.engine.reflection import ObjectKind, ObjectScope
 from sqlalchemy.engine.url import URL
-from sqlalchemy.exc import ArgumentError
-from sqlalchemy.sql import compiler, text
+from sqlalchemy.exc import ArgumentError, NoSuchTableError
+from sqlalchemy.sql import bindparam, compiler
+from sqlalchemy.sql import schema as sa_schema
+from sqlalchemy.sql import text
+from sqlalchemy.sql.ddl import CreateIndex, DropIndex
+from sqlalchemy.sql.elements import BindParameter, ClauseElement, TextClause
 from sqlalchemy.types import (
-    ARRAY,
     BIGINT,
     BOOLEAN,
     DATE,
@@ -29,11 +40,177 @@ from sqlalchemy.types import (
     TIMESTAMP,
 )
 
+from firebolt_db.engine_gate import (
+    DEFAULT_BACKOFF,
+    DEFAULT_START_TIMEOUT,
+    engine_target_name,
+    get_connect_gate,
+)
+from firebolt_db.overload import (
+    EngineGuard,
+    get_engine_guard,
+    pop_engine_guard_options,
+)
+from firebolt_db.pool import FireboltQueuePool, trace_auth
+from firebolt_db.prepared import (
+    PreparedStatement,
+    PreparedStatementCache,
+    execute_prepared,
+    parse_prepared_statements,
+)
+from firebolt_db.reflection import ColumnCache, Fingerprint
+from firebolt_db.retry import RetryPolicy, parse_retry_policy
+from firebolt_db.routing import (
+    ROUND_ROBIN,
+    ReadRouter,
+    RoutingConnection,
+    is_read_statement,
+    parse_pool_sizes,
+    parse_read_targets,
+)
+from firebolt_db.token_refresh import (
+    TokenRefresher,
+    get_token_endpoint,
+    refresh_in_background,
+)
+
+if TYPE_CHECKING:
+    # The SDK is imported lazily, loading it is deferred until a connection
+    # is made so that registering the dialect stays cheap.
+    from firebolt.client.auth import Auth
+    from firebolt.db import Cursor
+
+# Values of the `compression` URL option and the content coding requested
+# for it; "none" turns off the codings httpx asks for by default
+COMPRESSION_ENCODINGS = {"gzip": "gzip", "zstd": "zstd", "none": "identity"}
+
 
 class BYTEA(sqltypes.LargeBinary):
     __visit_name__ = "BYTEA"
 
 
+class ARRAY(sqltypes.ARRAY):
+    """Firebolt ARRAY type.
+
+    Accepts Python sequences and NumPy arrays as values. Arrays of numbers and
+    booleans are rendered into literals with a single `json.dumps` call, and
+    results are only processed element by element if the item type requires it.
+
+    Args:
+        as_numpy: Return numeric array results as NumPy arrays.
+    """
+
+    def __init__(
+        self,
+        item_type: Union[sqltypes.TypeEngine, type],
+        as_tuple: bool = False,
+        dimensions: Optional[int] = None,
+        zero_indexes: bool = False,
+        as_numpy: bool = False,
+    ):
+        super().__init__(item_type, as_tuple, dimensions, zero_indexes)
+        self.as_numpy = as_numpy
+
+    def bind_processor(self, dialect: default.DefaultDialect) -> Callable:
+        item_processor = self.item_type.dialect_impl(dialect).bind_processor(dialect)
+
+        def process(value: Any) -> Any:
+            if value is None:
+                return None
+            value = _to_list(value)
+            if item_processor is not None:
+                value = _map_array(value, item_processor, self.dimensions, list)
+            return value
+
+        return process
+
+    def literal_processor(self, dialect: default.DefaultDialect) -> Optional[Callable]:
+        item_type = self.item_type.dialect_impl(dialect)
+        if isinstance(item_type, (sqltypes.Integer, sqltypes.Float, sqltypes.Boolean)):
+            # JSON arrays of numbers are valid Firebolt array literals
+            return lambda value: json.dumps(_to_list(value), allow_nan=False)
+
+        item_processor: Optional[Callable]
+        if isinstance(item_type, sqltypes.String):
+            item_processor = render_string_literal
+        elif isinstance(item_type, sqltypes.LargeBinary):
+            item_processor = render_bytea_literal
+        else:
+            item_processor = item_type.literal_processor(dialect)
+        if item_processor is None:
+            return None
+
+        def render(elements: List[str]) -> str:
+            return "[%s]" % ", ".join(elements)
+
+        def process(value: Any) -> str:
+            return _map_array(
+                _to_list(value), item_processor, self.dimensions, render, "NULL"
+            )
+
+        return process
+
+    def result_processor(
+        self, dialect: default.DefaultDialect, coltype: Any
+    ) -> Optional[Callable]:
+        # The SDK already returns arrays as (nested) lists
+        if self.as_numpy:
+            from numpy import asarray
+
+            return lambda value: None if value is None else asarray(value)
+
+        item_processor = self.item_type.dialect_impl(dialect).result_processor(
+            dialect, coltype
+        )
+        if item_processor is None and not self.as_tuple:
+            return None
+        collection = tuple if self.as_tuple else list
+
+        def process(value: Any) -> Any:
+            if value is None:
+                return None
+            return _map_array(
+                value, item_processor or _identity, self.dimensions, collection
+            )
+
+        return process
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_list(value: Any) -> Any:
+    """Convert NumPy arrays to nested lists, which is done in C."""
+    tolist = getattr(value, "tolist", None)
+    return tolist() if tolist is not None else value
+
+
+def _map_array(
+    value: Sequence,
+    function: Callable,
+    dimensions: Optional[int],
+    collection: Callable,
+    null: Any = None,
+) -> Any:
+    """Apply `function` to every item of a (nested) array in a single pass."""
+    if dimensions == 1 or (
+        dimensions is None and not (value and isinstance(value[0], (list, tuple)))
+    ):
+        return collection([null if item is None else function(item) for item in value])
+    sub_dimensions = dimensions - 1 if dimensions is not None else None
+    return collection(
+        [
+            (
+                null
+                if item is None
+                else _map_array(item, function, sub_dimensions, collection, null)
+            )
+            for item in value
+        ]
+    )
+
+
 # Firebolt data types compatibility with sqlalchemy.sql.types
 type_map = {
     "text": TEXT,
@@ -102,23 +279,247 @@ def strtobool(val: str) -> int:
 
 DEFAULT_TYPE = TEXT
 
-
-class UniversalSet(set):
-    def __contains__(self, item: Any) -> bool:
-        return True
+# Escape string (E'...') rules, needed to keep backslashes and NUL bytes intact
+_ESCAPE_STRING_TRANSLATION = str.maketrans({"\\": "\\\\", "'": "\\'", "\0": "\\0"})
+
+
+def render_string_literal(value: str) -> str:
+    """Render a Python string as a Firebolt string literal."""
+    if "\\" in value or "\0" in value:
+        return "E'%s'" % value.translate(_ESCAPE_STRING_TRANSLATION)
+    return "'%s'" % value.replace("'", "''")
+
+
+def render_bytea_literal(value: Union[bytes, bytearray]) -> str:
+    """Render Python bytes as a Firebolt BYTEA literal in hex format."""
+    return "'\\x%s'::BYTEA" % value.hex()
+
+
+# Firebolt reserved words, identifiers matching them have to be quoted.
+# ANSI reserved words and a few clause keywords (BY, VALUES, QUALIFY, ...) are
+# included too, Firebolt SQL can't use them as bare identifiers either.
+RESERVED_WORDS = frozenset(
+    [
+        "all",
+        "alter",
+        "and",
+        "array",
+        "as",
+        "between",
+        "bigint",
+        "bool",
+        "boolean",
+        "both",
+        "by",
+        "case",
+        "cast",
+        "char",
+        "concat",
+        "copy",
+        "create",
+        "cross",
+        "current_date",
+        "current_timestamp",
+        "database",
+        "date",
+        "datetime",
+        "decimal",
+        "delete",
+        "describe",
+        "distinct",
+        "double",
+        "doublecolon",
+        "dow",
+        "doy",
+        "drop",
+        "empty_identifier",
+        "epoch",
+        "except",
+        "execute",
+        "exists",
+        "explain",
+        "extract",
+        "false",
+        "fetch",
+        "first",
+        "float",
+        "from",
+        "full",
+        "generate",
+        "group",
+        "having",
+        "if",
+        "ilike",
+        "in",
+        "inner",
+        "insert",
+        "int",
+        "integer",
+        "intersect",
+        "interval",
+        "is",
+        "isnull",
+        "join",
+        "join_type",
+        "lateral",
+        "leading",
+        "left",
+        "like",
+        "limit",
+        "limit_distinct",
+        "localtimestamp",
+        "long",
+        "natural",
+        "next",
+        "not",
+        "null",
+        "numeric",
+        "offset",
+        "on",
+        "only",
+        "or",
+        "order",
+        "outer",
+        "over",
+        "partition",
+        "precision",
+        "prepare",
+        "primary",
+        "qualify",
+        "quarter",
+        "right",
+        "row",
+        "rows",
+        "sample",
+        "select",
+        "set",
+        "show",
+        "text",
+        "time",
+        "timestamp",
+        "top",
+        "trailing",
+        "trim",
+        "true",
+        "truncate",
+        "union",
+        "unknown_char",
+        "unnest",
+        "unterminated_string",
+        "update",
+        "using",
+        "values",
+        "varchar",
+        "week",
+        "when",
+        "where",
+        "window",
+        "with",
+    ]
+).union(compiler.RESERVED_WORDS)
 
 
 class FireboltIdentifierPreparer(compiler.IdentifierPreparer):
-    reserved_words = UniversalSet()
+    """Quote identifiers only if they are reserved words, contain characters
+    other than letters, digits and underscores, or have uppercase letters, as
+    Firebolt folds unquoted identifiers to lowercase."""
+
+    reserved_words = RESERVED_WORDS
 
 
 class FireboltCompiler(compiler.SQLCompiler):
-    pass
+    def visit_bindparam(self, bindparam: BindParameter, **kw: Any) -> str:
+        # In literal binds mode values are rendered into the statement on
+        # execution, so the SDK doesn't have to parse it and substitute them
+        # once again. The compiled form is still cacheable, as values are only
+        # rendered after compilation. DML is excluded since literal_execute
+        # parameters can't be combined with executemany().
+        if (
+            self.dialect.render_literal_binds
+            and not (self.isinsert or self.isupdate or self.isdelete)
+            and bindparam.type._cached_literal_processor(self.dialect) is not None
+        ):
+            kw["literal_execute"] = True
+        return super().visit_bindparam(bindparam, **kw)
+
+    def render_literal_value(self, value: Any, type_: sqltypes.TypeEngine) -> str:
+        """Render strings and bytes with Firebolt-specific escaping."""
+        if not isinstance(type_, sqltypes.TypeDecorator):
+            if isinstance(value, str):
+                return render_string_literal(value)
+            if isinstance(value, (bytes, bytearray)):
+                return render_bytea_literal(value)
+        return super().render_literal_value(value, type_)
+
+
+class FireboltDDLCompiler(compiler.DDLCompiler):
+    def post_create_table(self, table: sa_schema.Table) -> str:
+        """Render `PRIMARY INDEX` and `PARTITION BY` table options."""
+        options = table.dialect_options["firebolt"]
+        text = ""
+        if options["primary_index"] is not None:
+            text += "\nPRIMARY INDEX %s" % ", ".join(
+                (
+                    self.preparer.quote(column)
+                    if isinstance(column, str)
+                    else self.preparer.format_column(column)
+                )
+                for column in _as_list(options["primary_index"])
+            )
+        if options["partition_by"] is not None:
+            text += "\nPARTITION BY %s" % ", ".join(
+                (
+                    expression
+                    if isinstance(expression, str)
+                    else self.sql_compiler.process(
+                        expression, include_table=False, literal_binds=True
+                    )
+                )
+                for expression in _as_list(options["partition_by"])
+            )
+        return text
+
+    def visit_create_index(self, create: CreateIndex, **kw: Any) -> str:
+        index = create.element
+        if not index.dialect_options["firebolt"]["aggregating"]:
+            return super().visit_create_index(create, **kw)
+        self._verify_index_table(index)
+        text = "CREATE AGGREGATING INDEX "
+        if create.if_not_exists:
+            text += "IF NOT EXISTS "
+        return text + "%s ON %s (%s)" % (
+            self._prepared_index_name(index, include_schema=False),
+            self.preparer.format_table(index.table),
+            ", ".join(
+                self.sql_compiler.process(
+                    expression, include_table=False, literal_binds=True
+                )
+                for expression in index.expressions
+            ),
+        )
+
+    def visit_drop_index(self, drop: DropIndex, **kw: Any) -> str:
+        index = drop.element
+        if not index.dialect_options["firebolt"]["aggregating"]:
+            return super().visit_drop_index(drop, **kw)
+        text = "DROP AGGREGATING INDEX "
+        if drop.if_exists:
+            text += "IF EXISTS "
+        return text + self._prepared_index_name(index, include_schema=False)
+
+
+def _as_list(value: Any) -> List:
+    if isinstance(value, (str, ClauseElement)):
+        return [value]
+    return list(value)
 
 
 class FireboltTypeCompiler(compiler.GenericTypeCompiler):
-    def visit_ARRAY(self, type: sqltypes.TypeEngine, **kw: int) -> str:
-        return "Array(%s)" % type
+    def visit_ARRAY(self, type: sqltypes.ARRAY, **kw: Any) -> str:
+        result = self.process(type.item_type, **kw)
+        for _ in range(type.dimensions or 1):
+            result = "ARRAY(%s)" % result
+        return result
 
 
 class FireboltDialect(default.DefaultDialect):
@@ -134,34 +535,75 @@ class FireboltDialect(default.DefaultDialect):
     password = None
     preparer = FireboltIdentifierPreparer
     statement_compiler = FireboltCompiler
+    ddl_compiler = FireboltDDLCompiler
     type_compiler = FireboltTypeCompiler
     supports_alter = False
     supports_pk_autoincrement = False
     supports_default_values = False
     supports_empty_insert = False
+    supports_multivalues_insert = True
     supports_unicode_statements = True
     supports_unicode_binds = True
-    supports_statement_cache = False
-    # supports_statement_cache Set to False to disable warning
+    # Compiled statements, including reflection queries, are cached
     # https://sqlalche.me/e/20/cprf
+    supports_statement_cache = True
     returns_unicode_strings = True
     description_encoding = None
     supports_native_boolean = True
-    _set_parameters: Dict[str, Any] = dict()
+    colspecs = {sqltypes.ARRAY: ARRAY}
+    poolclass = FireboltQueuePool
+    supports_read_routing = True
+    # The connect gate sleeps between attempts to connect to a stopped engine,
+    # which would block the event loop of async drivers
+    supports_engine_start_wait = True
+    # Options for buffered results only apply to the async driver,
+    # which buffers whole results
+    supports_result_buffers = False
+    read_router: Optional[ReadRouter] = None
+    # Opt-in retries of read-only statements, see `retries` URL option
+    retry_policy: Optional[RetryPolicy] = None
+    # Opt-in concurrency limit and circuit breaker of the engine
+    engine_guard: Optional[EngineGuard] = None
+    # Opt-in refresh of access tokens before they expire, see `token_refresh`
+    token_refresher: Optional[TokenRefresher] = None
+    # Opt-in server-side parameters, see `prepared_statements` URL option
+    prepared_statements: Optional[int] = None
+    construct_arguments = [
+        (sa_schema.Table, {"primary_index": None, "partition_by": None}),
+        (sa_schema.Index, {"aggregating": False}),
+    ]
 
     def __init__(
-        self, context: Optional[ExecutionContext] = None, *args: Any, **kwargs: Any
+        self,
+        context: Optional[ExecutionContext] = None,
+        render_literal_binds: bool = False,
+        incremental_reflection: bool = False,
+        *args: Any,
+        **kwargs: Any
     ):
+        """
+        Args:
+            render_literal_binds: Render bound values of SELECT statements
+                directly into the SQL text instead of sending them as parameters.
+                Can be passed to `create_engine`.
+            incremental_reflection: Keep reflected columns across reflections
+                and only read them again for tables that changed, see
+                `ColumnCache`. Can be passed to `create_engine`.
+        """
         super(FireboltDialect, self).__init__(*args, **kwargs)
         self.context: Union[ExecutionContext, Dict] = context or {}
+        self.render_literal_binds = render_literal_binds
+        self.column_cache = ColumnCache() if incremental_reflection else None
 
     @classmethod
     def import_dbapi(cls) -> ModuleType:  # For sqlalchemy >= 2.0.0
+        import firebolt.db as dbapi
+
         return dbapi
 
     @classmethod
     def dbapi(cls) -> ModuleType:  # Kept for backwards compatibility
-        return dbapi
+        return cls.import_dbapi()
 
     def create_connect_args(self, url: URL) -> Tuple[List, Dict]:
         """
@@ -177,10 +619,39 @@ class FireboltDialect(default.DefaultDialect):
             self._validate_core_connection(url, parameters)
 
         token_cache_flag = self._parse_token_cache_flag(parameters)
-        auth = _determine_auth(url, token_cache_flag)
+        token_refresh_flag = self._parse_token_refresh_flag(
+            parameters, is_core_connection
+        )
+        routing_parameters = self._pop_read_routing_parameters(parameters)
+        engine_start_options = self._pop_engine_start_options(parameters)
+        result_buffer_options = self._pop_result_buffer_options(parameters)
+        self.retry_policy = parse_retry_policy(parameters)
+        self.prepared_statements = parse_prepared_statements(parameters)
+        if self.prepared_statements is not None and routing_parameters:
+            raise ArgumentError(
+                "prepared_statements are not supported with read_engines"
+            )
+        engine_guard_options = pop_engine_guard_options(parameters)
+        # Token requests are timed for the telemetry of the pool
+        auth = trace_auth(_determine_auth(url, token_cache_flag))
         kwargs = self._build_connection_kwargs(
             url, parameters, auth, is_core_connection
         )
+        kwargs.update(engine_start_options)
+        kwargs.update(result_buffer_options)
+        self.token_refresher = (
+            refresh_in_background(
+                auth, get_token_endpoint(kwargs.get("api_endpoint"), auth)
+            )
+            if token_refresh_flag
+            else None
+        )
+        self.engine_guard = get_engine_guard(
+            engine_target_name(kwargs), engine_guard_options
+        )
+        self.read_router = self._build_read_router(
+            routing_parameters, kwargs, is_core_connection
+        )
 
         return ([], kwargs)
 
@@ -198,16 +669,134 @@ class FireboltDialect(default.DefaultDialect):
         """Parse and remove token cache flag from parameters."""
         return bool(strtobool(parameters.pop("use_token_cache", "True")))
 
+    def _parse_token_refresh_flag(
+        self, parameters: Dict[str, str], is_core_connection: bool
+    ) -> bool:
+        """Parse and remove the flag refreshing tokens in the background."""
+        token_refresh = bool(strtobool(parameters.pop("token_refresh", "False")))
+        if token_refresh and is_core_connection:
+            raise ArgumentError("Core connections do not use access tokens")
+        return token_refresh
+
+    def _pop_read_routing_parameters(self, parameters: Dict[str, Any]) -> Dict:
+        """Remove read routing options so they aren't sent as SET parameters."""
+        routing_parameters = {
+            name: parameters.pop(name)
+            for name in ("read_engines", "read_routing", "read_pool_size")
+            if name in parameters
+        }
+        if routing_parameters and "read_engines" not in routing_parameters:
+            raise ArgumentError(
+                "read_routing and read_pool_size require read_engines to be set"
+            )
+        if routing_parameters and not self.supports_read_routing:
+            raise ArgumentError(
+                "read_engines is not supported by the {} driver".format(self.driver)
+            )
+        return routing_parameters
+
+    def _pop_engine_start_options(self, parameters: Dict[str, Any]) -> Dict:
+        """Remove options for waiting on a stopped engine from parameters."""
+        options = {}
+        for name in ("engine_start_timeout", "engine_start_backoff"):
+            if name in parameters:
+                try:
+                    options[name] = float(parameters.pop(name))
+                except ValueError:
+                    raise ArgumentError("{} must be a number of seconds".format(name))
+        if options and not self.supports_engine_start_wait:
+            raise ArgumentError(
+                "{} are not supported by the {} driver".format(
+                    ", ".join(options), self.driver
+                )
+            )
+        return options
+
+    def _pop_result_buffer_options(self, parameters: Dict[str, Any]) -> Dict:
+        """Remove options for how results are buffered from parameters."""
+        options: Dict[str, Any] = {}
+        for name in ("columnar_results", "coalesce_reads"):
+            if name in parameters:
+                options[name] = bool(strtobool(parameters.pop(name)))
+        if "spill_threshold" in parameters:
+            try:
+                options["spill_threshold"] = int(parameters.pop("spill_threshold"))
+            except ValueError:
+                options["spill_threshold"] = -1
+            if options["spill_threshold"] < 0:
+                raise ArgumentError(
+                    "spill_threshold must be a non-negative number of rows"
+                )
+        if options and not self.supports_result_buffers:
+            raise ArgumentError(
+                "{} are not supported by the {} driver".format(
+                    ", ".join(options), self.driver
+                )
+            )
+        return options
+
+    def _build_read_router(
+        self,
+        routing_parameters: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        is_core_connection: bool,
+    ) -> Optional[ReadRouter]:
+        """Build pools for read engines, addressed by engine name or, for
+        Core, by URL, with the same credentials and database as the writer."""
+        if not routing_parameters:
+            return None
+        targets = parse_read_targets(routing_parameters["read_engines"])
+        if not targets:
+            raise ArgumentError("read_engines must list at least one engine")
+        target_argument = "url" if is_core_connection else "engine_name"
+        return ReadRouter(
+            [
+                partial(
+                    self._connect_read_engine,
+                    **dict(kwargs, **{target_argument: target})
+                )
+                for target in targets
+            ],
+            parse_pool_sizes(routing_parameters.get("read_pool_size"), targets),
+            routing_parameters.get("read_routing", ROUND_ROBIN),
+        )
+
+    def _connect_read_engine(self, **kwargs: Any) -> Any:
+        return self._connect_engine(kwargs)
+
+    def _connect_engine(self, cparams: Dict[str, Any]) -> Any:
+        """Connect through the gate of the engine, so that only one caller
+        waits for a stopped engine while the others queue behind it."""
+        # Read engines follow SET parameters of the writer, see RoutingCursor
+        cparams.pop("set_parameters", None)
+        start_timeout = cparams.pop("engine_start_timeout", DEFAULT_START_TIMEOUT)
+        backoff = cparams.pop("engine_start_backoff", DEFAULT_BACKOFF)
+        gate = get_connect_gate(engine_target_name(cparams))
+        return gate.connect(
+            partial(self._connect_dbapi, **cparams), start_timeout, backoff
+        )
+
+    def _connect_dbapi(self, **cparams: Any) -> Any:
+        encoding = cparams.pop("compression", None)
+        connection = self.loaded_dbapi.connect(**cparams)
+        if encoding is not None:
+            request_encoding(connection, encoding)
+        return connection
+
     def _build_connection_kwargs(
-        self, url: URL, parameters: Dict[str, str], auth: Auth, is_core_connection: bool
-    ) -> Dict[str, Union[str, Auth, Dict[str, Any], None]]:
+        self,
+        url: URL,
+        parameters: Dict[str, str],
+        auth: "Auth",
+        is_core_connection: bool,
+    ) -> Dict[str, Union[str, "Auth", Dict[str, Any], None]]:
         """Build connection kwargs for the SDK.
 
         SQLAlchemy URL mapping:
         - url.host -> database (Firebolt database name)
         - url.database -> engine_name (Firebolt engine name)
         """
-        kwargs: Dict[str, Union[str, Auth, Dict[str, Any], None]] = {
+        kwargs: Dict[str, Union[str, "Auth", Dict[str, Any], None]] = {
             "database": url.host or None,
             "auth": auth,
             "engine_name": url.database,
@@ -219,18 +808,22 @@ class FireboltDialect(default.DefaultDialect):
 
         self._handle_account_name(parameters, auth, kwargs)
         self._handle_environment_config(kwargs)
+        self._handle_compression(parameters, kwargs)
         kwargs["additional_parameters"] = self._build_additional_parameters(parameters)
-        self._set_parameters = parameters
+        # Remaining parameters are SET on every connection, see connect()
+        kwargs["set_parameters"] = parameters
 
         return kwargs
 
     def _handle_account_name(
         self,
         parameters: Dict[str, str],
-        auth: Auth,
-        kwargs: Dict[str, Union[str, Auth, Dict[str, Any], None]],
+        auth: "Auth",
+        kwargs: Dict[str, Union[str, "Auth", Dict[str, Any], None]],
     ) -> None:
         """Handle account_name parameter and validation."""
+        from firebolt.client.auth import ClientCredentials
+
         if "account_name" in parameters:
             kwargs["account_name"] = parameters.pop("account_name")
         elif isinstance(auth, ClientCredentials):
@@ -239,12 +832,32 @@ class FireboltDialect(default.DefaultDialect):
             )
 
     def _handle_environment_config(
-        self, kwargs: Dict[str, Union[str, Auth, Dict[str, Any], None]]
+        self, kwargs: Dict[str, Union[str, "Auth", Dict[str, Any], None]]
     ) -> None:
         """Handle environment-based configuration."""
         if "FIREBOLT_BASE_URL" in os.environ:
             kwargs["api_endpoint"] = os.environ["FIREBOLT_BASE_URL"]
 
+    def _handle_compression(
+        self,
+        parameters: Dict[str, str],
+        kwargs: Dict[str, Union[str, "Auth", Dict[str, Any], None]],
+    ) -> None:
+        """Handle compression parameter, the content coding of responses."""
+        if "compression" not in parameters:
+            return
+        compression = parameters.pop("compression").lower()
+        if compression not in COMPRESSION_ENCODINGS:
+            raise ArgumentError(
+                "compression must be one of: {}".format(
+                    ", ".join(COMPRESSION_ENCODINGS)
+                )
+            )
+        if compression == "zstd" and find_spec("zstandard") is None:
+            # httpx only decodes zstd responses with it installed
+            raise ArgumentError("compression=zstd requires the zstandard package")
+        kwargs["compression"] = COMPRESSION_ENCODINGS[compression]
+
     def _build_additional_parameters(
         self, parameters: Dict[str, str]
     ) -> Dict[str, Any]:
@@ -257,6 +870,30 @@ class FireboltDialect(default.DefaultDialect):
 
         return additional_parameters
 
+    def connect(self, *cargs: Any, **cparams: Any) -> Any:
+        # Connection arguments are always passed as keywords
+        set_parameters = cparams.pop("set_parameters", {})
+        connection = self._connect_engine(cparams)
+        if self.read_router is not None:
+            connection = RoutingConnection(connection, self.read_router)
+        # SET parameters belong to the connection, the dialect is shared
+        # by all connections and threads of an engine
+        connection._set_parameters = dict(set_parameters)
+        if self.prepared_statements is not None:
+            connection._prepared_statements = PreparedStatementCache(
+                self.prepared_statements
+            )
+        return connection
+
+    @classmethod
+    def engine_created(cls, engine: Engine) -> None:
+        read_router = engine.dialect.read_router
+        if read_router is not None:
+            event.listen(engine, "engine_disposed", lambda _: read_router.dispose())
+        token_refresher = engine.dialect.token_refresher
+        if token_refresher is not None:
+            event.listen(engine, "engine_disposed", lambda _: token_refresher.stop())
+
     def get_schema_names(
         self, connection: AlchemyConnection, **kwargs: Any
     ) -> List[str]:
@@ -274,29 +911,42 @@ class FireboltDialect(default.DefaultDialect):
         query = """
             select count(*) > 0 as exists_
               from information_schema.tables
-             where table_name = '{table_name}'
-        """.format(
-            table_name=table_name
-        )
-        result = connection.execute(text(query))
+             where table_name = :table_name
+        """
+        parameters = {"table_name": table_name}
+        if schema:
+            query += " and table_schema = :schema"
+            parameters["schema"] = schema
+        result = connection.execute(text(query), parameters)
         return result.fetchone().exists_
 
+    @reflection.cache
     def get_table_names(
         self, connection: AlchemyConnection, schema: Optional[str] = None, **kwargs: Any
     ) -> List[str]:
         query = "select table_name from information_schema.tables"
+        parameters = {}
         if schema:
-            query = "{query} where table_schema = '{schema}'".format(
-                query=query, schema=schema
-            )
+            query += " where table_schema = :schema"
+            parameters["schema"] = schema
 
-        result = connection.execute(text(query))
+        result = connection.execute(text(query), parameters)
         return [row.table_name for row in result]
 
     def get_view_names(
         self, connection: AlchemyConnection, schema: Optional[str] = None, **kwargs: Any
     ) -> List[str]:
-        return []
+        return list(self._get_views(connection, schema=schema, **kwargs))
+
+    @reflection.cache
+    def _get_views(
+        self, connection: AlchemyConnection, schema: Optional[str] = None, **kwargs: Any
+    ) -> Dict[str, str]:
+        """Fetch names and definitions of all views with a single query."""
+        result = self._query_information_schema(
+            connection, "views", ["view_definition"], schema
+        )
+        return {row.table_name: row.view_definition for row in result}
 
     def get_table_options(
         self,
@@ -305,7 +955,13 @@ class FireboltDialect(default.DefaultDialect):
         schema: Optional[str] = None,
         **kwargs: Any
     ) -> Dict:
-        return {}
+        rows = self._get_index_rows(
+            connection,
+            schema=schema,
+            table_names=(table_name,),
+            info_cache=kwargs.get("info_cache"),
+        )
+        return _reflect_table_options(rows.get(table_name, []))
 
     def get_columns(
         self,
@@ -314,29 +970,15 @@ class FireboltDialect(default.DefaultDialect):
         schema: Optional[str] = None,
         **kwargs: Any
     ) -> List[Dict]:
-        query = """
-            select column_name,
-                   data_type,
-                   is_nullable
-              from information_schema.columns
-             where table_name = '{table_name}'
-        """.format(
-            table_name=table_name
+        result = self._query_information_schema(
+            connection,
+            "columns",
+            ["column_name", "data_type", "is_nullable"],
+            schema,
+            (table_name,),
         )
-        if schema:
-            query = "{query} and table_schema = '{schema}'".format(
-                query=query, schema=schema
-            )
-
-        result = connection.execute(text(query))
-
         return [
-            {
-                "name": row[0],
-                "type": resolve_type(row[1].lower()),
-                "nullable": get_is_nullable(row[2]),
-                "default": None,
-            }
+            _reflect_column(row.column_name, row.data_type, row.is_nullable)
             for row in result
         ]
 
@@ -383,7 +1025,13 @@ class FireboltDialect(default.DefaultDialect):
         schema: Optional[str] = None,
         **kwargs: Any
     ) -> List[Dict]:
-        return []
+        rows = self._get_index_rows(
+            connection,
+            schema=schema,
+            table_names=(table_name,),
+            info_cache=kwargs.get("info_cache"),
+        )
+        return _reflect_indexes(rows.get(table_name, []))
 
     def get_unique_constraints(
         self,
@@ -401,19 +1049,276 @@ class FireboltDialect(default.DefaultDialect):
         schema: Optional[str] = None,
         **kwargs: Any
     ) -> str:
-        pass
+        views = self._get_views(connection, schema=schema, **kwargs)
+        if view_name not in views:
+            raise NoSuchTableError(view_name)
+        return views[view_name]
+
+    def get_multi_columns(
+        self,
+        connection: AlchemyConnection,
+        *,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kwargs: Any
+    ) -> List[Tuple[Tuple[Optional[str], str], List[Dict]]]:
+        names = self._names_to_reflect(
+            connection, schema, filter_names, kind, scope, **kwargs
+        )
+        if not names:
+            return []
+        table_names = names if filter_names else None
+        if self.column_cache is None:
+            columns = self._fetch_columns(connection, schema, table_names)
+        else:
+            columns = self._get_columns_incrementally(
+                connection, self.column_cache, schema, names, table_names
+            )
+        return [((schema, name), columns[name]) for name in names if name in columns]
+
+    def _fetch_columns(
+        self,
+        connection: AlchemyConnection,
+        schema: Optional[str],
+        table_names: Optional[Sequence[str]],
+    ) -> Dict[str, List[Dict]]:
+        """Reflect columns of all tables, or only `table_names`, by table."""
+        result = self._query_information_schema(
+            connection,
+            "columns",
+            ["column_name", "data_type", "is_nullable"],
+            schema,
+            table_names,
+        )
+        columns: Dict[str, List[Dict]] = {}
+        for row in result:
+            columns.setdefault(row.table_name, []).append(
+                _reflect_column(row.column_name, row.data_type, row.is_nullable)
+            )
+        return columns
+
+    def _get_columns_incrementally(
+        self,
+        connection: AlchemyConnection,
+        column_cache: ColumnCache,
+        schema: Optional[str],
+        names: List[str],
+        table_names: Optional[Sequence[str]],
+    ) -> Dict[str, List[Dict]]:
+        """Reflect columns of tables whose fingerprint changed, and take the
+        others from the cache."""
+        result = self._query_information_schema(
+            connection,
+            "columns",
+            [
+                "count(*) as column_count",
+                "hash_agg(column_name, data_type, is_nullable) as column_hash",
+            ],
+            schema,
+            table_names,
+            group_by_table=True,
+        )
+        all_fingerprints: Dict[str, Fingerprint] = {
+            row.table_name: (row.column_count, row.column_hash) for row in result
+        }
+        if table_names is None:
+            column_cache.retain(schema, all_fingerprints)
+        fingerprints = {
+            name: all_fingerprints[name] for name in names if name in all_fingerprints
+        }
+        columns, changed = column_cache.lookup(schema, fingerprints)
+        if changed:
+            # Filtering by name only pays off when some tables are cached
+            fetched = self._fetch_columns(
+                connection,
+                schema,
+                changed if columns or table_names is not None else None,
+            )
+            column_cache.store(
+                schema, {name: fingerprints[name] for name in changed}, fetched
+            )
+            columns.update((name, fetched[name]) for name in changed if name in fetched)
+        return columns
+
+    def get_multi_indexes(
+        self,
+        connection: AlchemyConnection,
+        *,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kwargs: Any
+    ) -> List[Tuple[Tuple[Optional[str], str], List[Dict]]]:
+        names = self._names_to_reflect(
+            connection, schema, filter_names, kind, scope, **kwargs
+        )
+        if not names:
+            return []
+        rows = self._get_index_rows(
+            connection,
+            schema=schema,
+            table_names=tuple(names) if filter_names else None,
+            info_cache=kwargs.get("info_cache"),
+        )
+        return [
+            ((schema, name), _reflect_indexes(rows.get(name, []))) for name in names
+        ]
+
+    def get_multi_table_options(
+        self,
+        connection: AlchemyConnection,
+        *,
+        schema: Optional[str] = None,
+        filter_names: Optional[Sequence[str]] = None,
+        kind: ObjectKind = ObjectKind.TABLE,
+        scope: ObjectScope = ObjectScope.DEFAULT,
+        **kwargs: Any
+    ) -> List[Tuple[Tuple[Optional[str], str], Dict]]:
+        names = self._names_to_reflect(
+            connection, schema, filter_names, kind, scope, **kwargs
+        )
+        if not names:
+            return []
+        rows = self._get_index_rows(
+            connection,
+            schema=schema,
+            table_names=tuple(names) if filter_names else None,
+            info_cache=kwargs.get("info_cache"),
+        )
+        return [
+            ((schema, name), _reflect_table_options(rows.get(name, [])))
+            for name in names
+        ]
+
+    def _names_to_reflect(
+        self,
+        connection: AlchemyConnection,
+        schema: Optional[str],
+        filter_names: Optional[Sequence[str]],
+        kind: ObjectKind,
+        scope: ObjectScope,
+        **kwargs: Any
+    ) -> List[str]:
+        """Names of tables and views a get_multi_* call should cover."""
+        if ObjectScope.DEFAULT not in scope:
+            # Temporary tables are not supported
+            return []
+        if filter_names and kind is ObjectKind.ANY:
+            # Table(..., autoload_with=...) case, no need to list names
+            return list(filter_names)
+        info_cache = kwargs.get("info_cache")
+        views = self._get_views(connection, schema=schema, info_cache=info_cache)
+        names: List[str] = []
+        if ObjectKind.TABLE in kind:
+            names.extend(
+                name
+                for name in self.get_table_names(
+                    connection, schema=schema, info_cache=info_cache
+                )
+                if name not in views
+            )
+        if ObjectKind.VIEW in kind:
+            names.extend(views)
+        if filter_names:
+            wanted = set(filter_names)
+            names = [name for name in names if name in wanted]
+        return names
+
+    @reflection.cache
+    def _get_index_rows(
+        self,
+        connection: AlchemyConnection,
+        schema: Optional[str] = None,
+        table_names: Optional[Tuple[str, ...]] = None,
+        **kwargs: Any
+    ) -> Dict[str, List[Any]]:
+        """Fetch index rows grouped by table, shared by indexes and options."""
+        result = self._query_information_schema(
+            connection,
+            "indexes",
+            ["index_name", "index_type", "index_definition"],
+            schema,
+            table_names,
+        )
+        rows: Dict[str, List[Any]] = {}
+        for row in result:
+            rows.setdefault(row.table_name, []).append(row)
+        return rows
+
+    def _query_information_schema(
+        self,
+        connection: AlchemyConnection,
+        view: str,
+        columns: List[str],
+        schema: Optional[str] = None,
+        table_names: Optional[Sequence[str]] = None,
+        group_by_table: bool = False,
+    ) -> Any:
+        """Select `columns` of all tables, or only `table_names`, at once,
+        aggregated by table if `group_by_table`."""
+        query = "select table_name, {columns} from information_schema.{view}".format(
+            columns=", ".join(columns), view=view
+        )
+        conditions = []
+        parameters: Dict[str, Any] = {}
+        if schema:
+            conditions.append("table_schema = :schema")
+            parameters["schema"] = schema
+        if table_names is not None:
+            conditions.append("table_name in :table_names")
+            parameters["table_names"] = list(table_names)
+        if conditions:
+            query += " where " + " and ".join(conditions)
+        if group_by_table:
+            query += " group by table_name"
+        statement = text(query)
+        if table_names is not None:
+            statement = statement.bindparams(bindparam("table_names", expanding=True))
+        return connection.execute(statement, parameters)
 
     def do_execute(
         self,
-        cursor: Cursor,
+        cursor: "Cursor",
         statement: str,
         parameters: Tuple[str, Any],
         context: Optional[ExecutionContext] = None,
     ) -> None:
-        cursor._set_parameters = self._set_parameters
-        cursor.execute(statement, parameters=parameters)
-        # Persist set parameters across calls
-        self._set_parameters = cursor._set_parameters
+        connection = cursor.connection
+        cursor._set_parameters = getattr(connection, "_set_parameters", {})
+        prepared = self._prepare(connection, statement, parameters)
+        if prepared is not None:
+            execute = partial(execute_prepared, cursor, prepared, parameters)
+        elif not parameters and _is_compiled_construct(context):
+            # Statements compiled by SQLAlchemy are single statements that
+            # don't need to be split or checked for SET by the SDK
+            execute = partial(cursor.execute, statement, skip_parsing=True)
+        else:
+            execute = partial(cursor.execute, statement, parameters=parameters)
+        self._run_statement(statement, execute)
+        # Persist set parameters across calls on the same connection
+        connection._set_parameters = cursor._set_parameters
+
+    def _prepare(
+        self, connection: Any, statement: str, parameters: Sequence[Any]
+    ) -> Optional[PreparedStatement]:
+        """Get the prepared statement to execute, None to execute the
+        statement as is."""
+        if self.prepared_statements is None:
+            return None
+        return connection._prepared_statements.prepare(statement, parameters)
+
+    def _run_statement(self, statement: str, execute: Callable[[], Any]) -> None:
+        """Run the execution of a statement through the engine guard, and the
+        retry policy for read-only statements."""
+        if self.engine_guard is not None:
+            execute = partial(self.engine_guard.call, execute)
+        if self.retry_policy is not None and is_read_statement(statement):
+            self.retry_policy.call(execute)
+        else:
+            execute()
 
     def do_rollback(self, dbapi_connection: AlchemyConnection) -> None:
         pass
@@ -443,11 +1348,113 @@ class FireboltDialect(default.DefaultDialect):
 dialect = FireboltDialect
 
 
+def request_encoding(connection: Any, encoding: str) -> None:
+    """Ask for responses of an SDK connection in a content coding.
+
+    httpx decodes them while the SDK reads the response, streamed results
+    are decoded chunk by chunk.
+    """
+    connection._client.headers["Accept-Encoding"] = encoding
+
+
+def _is_compiled_construct(context: Optional[ExecutionContext]) -> bool:
+    """Check whether the statement was compiled from a SQLAlchemy construct,
+    rather than being a textual SQL."""
+    compiled = getattr(context, "compiled", None)
+    return compiled is not None and not isinstance(compiled.statement, TextClause)
+
+
+def _reflect_column(name: str, data_type: str, is_nullable: int) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "type": resolve_type(data_type.lower()),
+        "nullable": get_is_nullable(is_nullable),
+        "default": None,
+    }
+
+
+def _reflect_table_options(index_rows: List[Any]) -> Dict[str, Any]:
+    for row in index_rows:
+        if row.index_type.lower() == "primary":
+            return {
+                "firebolt_primary_index": [
+                    _unquote_identifier(column)
+                    for column in _split_index_definition(row.index_definition)
+                ]
+            }
+    return {}
+
+
+def _reflect_indexes(index_rows: List[Any]) -> List[Dict[str, Any]]:
+    indexes = []
+    for row in index_rows:
+        if row.index_type.lower() != "aggregating":
+            continue
+        expressions = _split_index_definition(row.index_definition)
+        column_names = [
+            (
+                _unquote_identifier(expression)
+                if _IDENTIFIER.fullmatch(expression)
+                else None
+            )
+            for expression in expressions
+        ]
+        index: Dict[str, Any] = {
+            "name": row.index_name,
+            "column_names": column_names,
+            "unique": False,
+            "dialect_options": {"firebolt_aggregating": True},
+        }
+        if None in column_names:
+            index["expressions"] = expressions
+        indexes.append(index)
+    return indexes
+
+
+_IDENTIFIER = re.compile(r'"(?:[^"]|"")+"|[A-Za-z_][A-Za-z0-9_$]*')
+
+
+def _split_index_definition(definition: str) -> List[str]:
+    """Split an index definition like `[a, "B", sum(c)]` into expressions."""
+    definition = definition.strip()
+    if definition[:1] in "[(" and definition[-1:] in "])":
+        definition = definition[1:-1]
+    expressions: List[str] = []
+    depth, start, quote = 0, 0, None
+    for position, char in enumerate(definition):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            expressions.append(definition[start:position].strip())
+            start = position + 1
+    expressions.append(definition[start:].strip())
+    return [expression for expression in expressions if expression]
+
+
+def _unquote_identifier(identifier: str) -> str:
+    if identifier.startswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier
+
+
 def get_is_nullable(column_is_nullable: int) -> bool:
     return column_is_nullable == 1
 
 
-def _determine_auth(url: URL, token_cache_flag: bool = True) -> Auth:
+def _determine_auth(url: URL, token_cache_flag: bool = True) -> "Auth":
+    from firebolt.client.auth import (
+        ClientCredentials,
+        FireboltCore,
+        UsernamePassword,
+    )
+
     parameters = dict(url.query)
     is_core_connection = "url" in parameters
 
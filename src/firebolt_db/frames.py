@@ -0,0 +1,410 @@
+"""Reading query results into and writing pandas DataFrames.
+
+`pandas.read_sql` fetches rows through the SDK, which parses every value
+into a Python object, and SQLAlchemy, which wraps every row, before pandas
+splits them into columns again. `read_frame` takes the raw response of the
+query and converts it column by column with NumPy and pandas instead.
+
+`DataFrame.to_sql` inserts chunks one after another over one connection.
+`write_frame` renders chunks into INSERT statements in worker processes and
+runs them over several connections at once.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
+from threading import BoundedSemaphore, Lock
+from time import sleep
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import sqlalchemy.types as sqltypes
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import ClauseElement, insert, text
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.schema import Table
+
+from firebolt_db.firebolt_dialect import FireboltDialect, resolve_type
+from firebolt_db.retry import is_transient_error
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 10_000
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_CHUNK_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 1.0
+
+NULLABLE_SUFFIXES = (" not null", " null")
+
+
+class _FloatText(str):
+    """Text of a JSON number with a fraction or exponent, see `_fetch_raw`."""
+
+
+def _firebolt_type(raw_type: str) -> Any:
+    """SQLAlchemy type of a column type reported in query results."""
+    for suffix in NULLABLE_SUFFIXES:
+        if raw_type.endswith(suffix):
+            raw_type = raw_type[: -len(suffix)]
+            break
+    return resolve_type(raw_type)
+
+
+def _convert_integers(values: List[Any]) -> Any:
+    import numpy
+    import pandas
+
+    if None in values:
+        return pandas.array(values, dtype="Int64")
+    return numpy.array(values, dtype=numpy.int64)
+
+
+def _convert_floats(values: List[Any]) -> Any:
+    import numpy
+
+    # Floats are kept as text by the JSON parser, NumPy parses them
+    # including "inf" and "nan"; NULL becomes NaN
+    return numpy.array(
+        ["nan" if value is None else value for value in values], dtype=numpy.float64
+    )
+
+
+def _convert_booleans(values: List[Any]) -> Any:
+    import numpy
+    import pandas
+
+    if None in values:
+        return pandas.array(values, dtype="boolean")
+    return numpy.array(values, dtype=bool)
+
+
+def _convert_datetimes(values: List[Any]) -> Any:
+    import pandas
+
+    return pandas.to_datetime(values, format="ISO8601")
+
+
+def _convert_decimals(values: List[Any]) -> Any:
+    return _object_array([None if v is None else Decimal(v) for v in values])
+
+
+def _convert_bytes(values: List[Any]) -> Any:
+    # Values are hex encoded with a "\x" prefix
+    return _object_array([None if v is None else bytes.fromhex(v[2:]) for v in values])
+
+
+def _object_array(values: List[Any]) -> Any:
+    import numpy
+
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _restore_numbers(value: Any, parse: Callable[[str], Any]) -> Any:
+    """Parse numbers kept as text in a value, including nested in arrays."""
+    if isinstance(value, list):
+        return [_restore_numbers(item, parse) for item in value]
+    if isinstance(value, _FloatText):
+        return parse(value)
+    return value
+
+
+def _convert_objects(values: List[Any], parse: Callable[[str], Any] = float) -> Any:
+    return _object_array([_restore_numbers(value, parse) for value in values])
+
+
+# Conversion of a column by the SQLAlchemy type the dialect maps its
+# Firebolt type to, see `type_map`. Other columns are kept as objects.
+_CONVERTERS: Dict[type, Callable[[List[Any]], Any]] = {
+    sqltypes.Integer: _convert_integers,
+    sqltypes.Float: _convert_floats,
+    sqltypes.Boolean: _convert_booleans,
+    sqltypes.Date: _convert_datetimes,
+    sqltypes.DateTime: _convert_datetimes,
+    sqltypes.Numeric: _convert_decimals,
+    sqltypes.LargeBinary: _convert_bytes,
+}
+
+
+def _converter(type_: Any) -> Callable[[List[Any]], Any]:
+    # `type_map` holds type classes, arrays are resolved to instances
+    if isinstance(type_, sqltypes.ARRAY):
+        item_type = type_.item_type
+        item_class = item_type if isinstance(item_type, type) else type(item_type)
+        if issubclass(item_class, sqltypes.Numeric) and not issubclass(
+            item_class, sqltypes.Float
+        ):
+            return partial(_convert_objects, parse=Decimal)
+        return _convert_objects
+    type_class = type_ if isinstance(type_, type) else type(type_)
+    for base in type_class.__mro__:
+        if base in _CONVERTERS:
+            return _CONVERTERS[base]
+    return _convert_objects
+
+
+def _compile(
+    connection: Connection,
+    statement: Union[str, ClauseElement],
+    parameters: Optional[Mapping[str, Any]],
+) -> str:
+    if isinstance(statement, str):
+        statement = text(statement)
+    if parameters and isinstance(statement, TextClause):
+        # Types of the values are needed to render them
+        statement = statement.bindparams(**parameters)
+    elif parameters:
+        statement = statement.params(**parameters)  # type: ignore[attr-defined]
+    # The query bypasses parameter substitution of the SDK
+    return str(
+        statement.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _fetch_raw(connection: Connection, query: str) -> Dict[str, Any]:
+    """Run a query and parse its JSON_Compact response, leaving floats as
+    text, so that decimals keep their precision. Columns parse them by type."""
+    from firebolt.common.constants import JSON_OUTPUT_FORMAT
+    from firebolt.utils.exception import FireboltStructuredError
+
+    dbapi_connection = connection.connection.dbapi_connection
+    # Like RoutingCursor, a read engine runs it with SET parameters of the writer
+    read_router = getattr(connection.dialect, "read_router", None)
+    read_connection = read_router.checkout() if read_router is not None else None
+    cursor = (read_connection or dbapi_connection).cursor()
+    try:
+        cursor._set_parameters = getattr(dbapi_connection, "_set_parameters", {})
+        response = cursor._api_request(query, {"output_format": JSON_OUTPUT_FORMAT})
+        cursor._raise_if_error(response)
+        body = response.read()
+    finally:
+        cursor.close()
+        if read_connection is not None:
+            read_connection.close()
+    if not body:
+        return {"meta": [], "data": []}
+    result = json.loads(body, parse_float=_FloatText)
+    if result.get("errors"):
+        raise FireboltStructuredError(result)
+    return result
+
+
+def read_frame(
+    bind: Union[Engine, Connection],
+    statement: Union[str, ClauseElement],
+    parameters: Optional[Mapping[str, Any]] = None,
+) -> "DataFrame":
+    """Read the result of a SELECT statement into a pandas DataFrame.
+
+    Columns are converted from the raw query response with NumPy: integers
+    to int64 (Int64 with NULLs), floating point numbers to float64, dates
+    and timestamps to datetime64, decimals, bytes, text and arrays to objects.
+
+    Args:
+        bind: Engine or connection of the Firebolt dialect.
+        statement: Core statement or SQL text.
+        parameters: Values of bound parameters, rendered into the query.
+    """
+    import pandas
+
+    if isinstance(bind, Engine):
+        with bind.connect() as connection:
+            return read_frame(connection, statement, parameters)
+
+    result = _fetch_raw(bind, _compile(bind, statement, parameters))
+    columns = result["meta"]
+    data = result["data"]
+    values = list(zip(*data)) if data else [()] * len(columns)
+    frame = pandas.DataFrame(
+        {
+            position: _converter(_firebolt_type(column["type"]))(list(column_values))
+            for position, (column, column_values) in enumerate(zip(columns, values))
+        }
+    )
+    frame.columns = [column["name"] for column in columns]
+    return frame
+
+
+def _render_insert(table: Table, keys: Sequence[str], rows: List[Tuple]) -> str:
+    """Render a multi-row INSERT with literal values, run in worker processes."""
+    statement = insert(table).values([dict(zip(keys, row)) for row in rows])
+    return str(
+        statement.compile(
+            dialect=FireboltDialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+class _ChunkWriter:
+    """`method` of `DataFrame.to_sql` handing chunks over to worker pools.
+
+    Each chunk is rendered in a process pool and inserted by a thread pool
+    on a connection of its own. At most two chunks per upload worker are in
+    flight, so that `to_sql` doesn't copy the whole frame into the pools.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        renderer: Optional["ProcessPoolExecutor"],
+        uploader: ThreadPoolExecutor,
+        workers: int,
+        retries: int,
+        backoff: float,
+    ):
+        self.engine = engine
+        self.renderer = renderer
+        self.uploader = uploader
+        self.retries = retries
+        self.backoff = backoff
+        self.uploads: List[Future] = []
+        self.error: Optional[BaseException] = None
+        self._in_flight = BoundedSemaphore(2 * workers)
+        self._lock = Lock()
+
+    def __call__(
+        self, pd_table: Any, connection: Any, keys: List[str], data_iter: Iterable
+    ) -> int:
+        if self.error is not None:
+            # Stop to_sql from producing more chunks
+            raise self.error
+        rows = list(data_iter)
+        self._in_flight.acquire()
+        rendered: Union[Future, str]
+        if self.renderer is not None:
+            rendered = self.renderer.submit(_render_insert, pd_table.table, keys, rows)
+        else:
+            rendered = _render_insert(pd_table.table, keys, rows)
+        upload = self.uploader.submit(self._upload, rendered, len(rows))
+        upload.add_done_callback(self._done)
+        self.uploads.append(upload)
+        return len(rows)
+
+    def _upload(self, rendered: Union[Future, str], row_count: int) -> int:
+        query = rendered.result() if isinstance(rendered, Future) else rendered
+        for attempt in range(self.retries + 1):
+            try:
+                with self.engine.connect() as connection:
+                    connection.exec_driver_sql(query)
+                    connection.commit()
+                return row_count
+            except Exception as error:
+                # SQLAlchemy wraps the errors of the SDK
+                if attempt == self.retries or not is_transient_error(
+                    getattr(error, "orig", error)
+                ):
+                    raise
+                delay = self.backoff * 2**attempt
+                logger.warning(
+                    "Inserting a chunk of %d rows failed, retrying in %.1f "
+                    "seconds: %s",
+                    row_count,
+                    delay,
+                    error,
+                )
+                sleep(delay)
+        return row_count  # pragma: no cover
+
+    def _done(self, upload: Future) -> None:
+        self._in_flight.release()
+        error = upload.exception()
+        if error is not None:
+            with self._lock:
+                if self.error is None:
+                    self.error = error
+
+    def wait(self) -> int:
+        """Wait for all chunks, return the number of rows inserted."""
+        inserted = 0
+        for upload in self.uploads:
+            if upload.exception() is None:
+                inserted += upload.result()
+        if self.error is not None:
+            raise self.error
+        return inserted
+
+
+def write_frame(
+    bind: Union[Engine, Connection],
+    frame: "DataFrame",
+    name: str,
+    if_exists: str = "fail",
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    workers: int = DEFAULT_UPLOAD_WORKERS,
+    processes: Optional[int] = None,
+    retries: int = DEFAULT_CHUNK_RETRIES,
+    backoff: float = DEFAULT_RETRY_BACKOFF,
+) -> int:
+    """Insert a DataFrame into a table in parallel chunks.
+
+    The table is created by `DataFrame.to_sql` with its column types, chunks
+    are inserted as they are rendered, in no particular order. Each chunk is
+    committed on its own and retried on transient errors, responses the
+    engine may not give again, so when a chunk fails for good the chunks
+    inserted before it are kept.
+
+    Args:
+        bind: Engine of the Firebolt dialect, or a connection of one. Chunks
+            are inserted over connections from its pool.
+        frame: DataFrame to insert, its index is not written.
+        name: Name of the table.
+        if_exists: `fail`, `replace` or `append`, as for `DataFrame.to_sql`.
+        chunk_size: Number of rows inserted by one statement.
+        workers: Number of chunks inserted at once.
+        processes: Number of processes rendering chunks into statements,
+            `os.cpu_count()` by default, 0 to render them in this process.
+        retries: Number of times a failed chunk is retried.
+        backoff: Seconds before the first retry of a chunk, doubled after
+            each one.
+
+    Returns:
+        Number of rows inserted.
+    """
+    # Process pools are slow to import, so they aren't imported with the package
+    from concurrent.futures import ProcessPoolExecutor
+
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    if processes is None:
+        processes = os.cpu_count() or 1
+    renderer = ProcessPoolExecutor(processes) if processes > 0 else None
+    try:
+        with ThreadPoolExecutor(workers) as uploader:
+            writer = _ChunkWriter(engine, renderer, uploader, workers, retries, backoff)
+            try:
+                frame.to_sql(
+                    name,
+                    engine,
+                    if_exists=if_exists,
+                    index=False,
+                    chunksize=chunk_size,
+                    method=writer,
+                )
+            except Exception:
+                if writer.error is None:
+                    raise
+            return writer.wait()
+    finally:
+        if renderer is not None:
+            renderer.shutdown()
@@ -0,0 +1,228 @@
+"""Native asyncio execution of Core statements, without greenlets.
+
+The asyncio extension of SQLAlchemy runs the synchronous engine in a
+greenlet and switches to it on every execute and fetch. `NativeAsyncEngine`
+only borrows the compiler of the dialect and awaits `firebolt.async_db`
+directly, which is cheaper for services running many small statements.
+It has no ORM, events or transactions, results are fetched completely.
+
+    engine = NativeAsyncEngine("firebolt://id:secret@db/engine?account_name=a")
+    async with engine.connect() as connection:
+        result = await connection.execute(select(table).where(table.c.id == 1))
+        rows = result.all()
+    await engine.dispose()
+"""
+
+from asyncio import Semaphore
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.compiler import Compiled
+
+from firebolt_db.firebolt_dialect import FireboltDialect, request_encoding
+from firebolt_db.routing import is_read_statement
+
+if TYPE_CHECKING:
+    from firebolt.async_db import Connection
+
+DEFAULT_POOL_SIZE = 5
+
+Statement = Union[str, ClauseElement, Compiled]
+
+
+class NativeAsyncDialect(FireboltDialect):
+    """Firebolt dialect used to compile statements for `NativeAsyncEngine`."""
+
+    driver = "firebolt_native_async"
+    supports_read_routing = False
+    supports_engine_start_wait = False
+
+
+class NativeResult:
+    """Fully fetched result of a statement."""
+
+    def __init__(self, keys: List[str], rows: List[Tuple], rowcount: int):
+        self._keys = keys
+        self._rows = rows
+        self.rowcount = rowcount
+
+    def keys(self) -> List[str]:
+        return self._keys
+
+    def all(self) -> List[Tuple]:
+        return self._rows
+
+    def first(self) -> Optional[Tuple]:
+        return self._rows[0] if self._rows else None
+
+    def scalar(self) -> Any:
+        return self._rows[0][0] if self._rows else None
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class NativeAsyncConnection:
+    """Connection of a `NativeAsyncEngine`, see `NativeAsyncEngine.connect`."""
+
+    def __init__(self, engine: "NativeAsyncEngine", connection: "Connection"):
+        self.engine = engine
+        self._connection = connection
+
+    async def execute(
+        self,
+        statement: Statement,
+        parameters: Optional[Union[Mapping[str, Any], Sequence[Any]]] = None,
+    ) -> NativeResult:
+        """Execute a statement and fetch its result.
+
+        Args:
+            statement: Core statement, statement compiled with the `dialect`
+                of the engine, or SQL text with `?` placeholders.
+            parameters: Values of bound parameters by name, or by position
+                for SQL text.
+        """
+        query, values, processors = self.engine.compile(statement, parameters)
+        cursor = self._connection.cursor()
+        # SET parameters belong to the connection, like in the dialect
+        cursor._set_parameters = self._connection._set_parameters
+        try:
+            execute = partial(cursor.execute, query, values or None)
+            engine_guard = self.engine.dialect.engine_guard
+            if engine_guard is not None:
+                execute = partial(engine_guard.acall, execute)
+            retry_policy = self.engine.dialect.retry_policy
+            if retry_policy is not None and is_read_statement(query):
+                await retry_policy.acall(execute)
+            else:
+                await execute()
+            self._connection._set_parameters = cursor._set_parameters
+            description = cursor.description
+            if not description:
+                return NativeResult([], [], cursor.rowcount)
+            rows = await cursor.fetchall()
+            if len(processors) != len(description) or not any(processors):
+                rows = [tuple(row) for row in rows]
+            else:
+                rows = [
+                    tuple(
+                        process(value) if process else value
+                        for process, value in zip(processors, row)
+                    )
+                    for row in rows
+                ]
+            return NativeResult(
+                [column.name for column in description], rows, cursor.rowcount
+            )
+        finally:
+            await cursor.aclose()
+
+
+class NativeAsyncEngine:
+    """Pool of `firebolt.async_db` connections executing Core statements.
+
+    Args:
+        url: Database URL, as for `create_engine`. Options that rely on
+            threads, like read routing or waiting for stopped engines,
+            are not supported.
+        pool_size: Maximum number of connections in use at once.
+        **kwargs: Arguments of `FireboltDialect`, e.g. `render_literal_binds`.
+    """
+
+    def __init__(
+        self, url: Union[str, URL], pool_size: int = DEFAULT_POOL_SIZE, **kwargs: Any
+    ):
+        import firebolt.async_db as async_dbapi
+
+        self.url = make_url(url)
+        self.dialect = NativeAsyncDialect(paramstyle=async_dbapi.paramstyle, **kwargs)
+        self._dbapi = async_dbapi
+        _, self._connect_kwargs = self.dialect.create_connect_args(self.url)
+        self.pool_size = pool_size
+        self._idle: List["Connection"] = []
+        # Created on first use, in the event loop of the caller
+        self._slots: Optional[Semaphore] = None
+
+    def compile(
+        self,
+        statement: Statement,
+        parameters: Optional[Union[Mapping[str, Any], Sequence[Any]]] = None,
+    ) -> Tuple[str, List[Any], List[Optional[Callable]]]:
+        """SQL text, positional values and result processors of a statement."""
+        if isinstance(statement, str):
+            return statement, list(parameters or ()), []
+        if isinstance(statement, ClauseElement):
+            statement = statement.compile(dialect=self.dialect)
+        state = statement.construct_expanded_state(parameters)  # type: ignore
+        values = [
+            (
+                state.processors[name](state.parameters[name])
+                if name in state.processors
+                else state.parameters[name]
+            )
+            for name in state.positiontup or ()
+        ]
+        return state.statement, values, self._result_processors(statement)
+
+    def _result_processors(self, compiled: Compiled) -> List[Optional[Callable]]:
+        columns = getattr(compiled.statement, "selected_columns", ())
+        return [
+            column.type.dialect_impl(self.dialect).result_processor(self.dialect, None)
+            for column in columns
+        ]
+
+    async def _connect(self) -> "Connection":
+        kwargs = dict(self._connect_kwargs)
+        set_parameters = kwargs.pop("set_parameters", {})
+        encoding = kwargs.pop("compression", None)
+        connection = await self._dbapi.connect(**kwargs)
+        if encoding is not None:
+            request_encoding(connection, encoding)
+        connection._set_parameters = dict(set_parameters)
+        return connection
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[NativeAsyncConnection]:
+        """Borrow a connection, waiting for one if all of them are in use."""
+        if self._slots is None:
+            self._slots = Semaphore(self.pool_size)
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield NativeAsyncConnection(self, connection)
+            finally:
+                if not connection.closed:
+                    self._idle.append(connection)
+
+    async def execute(
+        self,
+        statement: Statement,
+        parameters: Optional[Union[Mapping[str, Any], Sequence[Any]]] = None,
+    ) -> NativeResult:
+        """Execute a statement on a connection borrowed for it."""
+        async with self.connect() as connection:
+            return await connection.execute(statement, parameters)
+
+    async def dispose(self) -> None:
+        """Close idle connections."""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.aclose()
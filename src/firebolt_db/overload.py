@@ -0,0 +1,416 @@
+"""Protection of Firebolt engines from overload.
+
+Statements sent to a saturated engine only queue up there and slow down every
+other statement. An engine guard limits the number of statements in flight on
+an engine, adapting the limit to how the engine copes (additive increase,
+multiplicative decrease), and opens a circuit breaker that fails statements
+right away once most of them fail, until the engine had time to recover.
+
+Guards are shared by all connections to an engine, across SQLAlchemy engines
+with the same options, see `get_engine_guard`.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from functools import partial
+from threading import Event, Lock
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy.exc import ArgumentError
+
+from firebolt_db.retry import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_QUEUE_TIMEOUT = 10.0
+DEFAULT_BACKOFF_RATIO = 0.5
+DEFAULT_BREAKER_WINDOW = 20
+DEFAULT_BREAKER_MIN_CALLS = 10
+DEFAULT_BREAKER_RESET = 30.0
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Check whether an error means the engine can't keep up, as opposed to
+    an error of the statement itself."""
+    from httpx import TransportError
+
+    return is_transient_error(error) or isinstance(error, TransportError)
+
+
+def _overloaded(message: str) -> Exception:
+    # Raised as a DB-API error, so that SQLAlchemy wraps it in OperationalError
+    from firebolt.utils.exception import OperationalError
+
+    return OperationalError(message)
+
+
+def _wake_future(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """Limit of statements in flight adapted with AIMD.
+
+    Each statement that succeeds raises the limit by `1 / limit`, so by about
+    one per limit's worth of statements. Each one failing because the engine
+    is overloaded, or slower than `latency_target`, multiplies the limit by
+    `backoff_ratio`. Callers over the limit wait for a free slot.
+
+    Args:
+        max_limit: Highest limit, and the one it starts from.
+        min_limit: Lowest limit.
+        backoff_ratio: Factor the limit is multiplied by on overload.
+        latency_target: Seconds after which a statement is a sign of
+            overload, None to only back off on errors.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff_ratio: float = DEFAULT_BACKOFF_RATIO,
+        latency_target: Optional[float] = None,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._lock = Lock()
+        # Functions waking callers waiting for a slot, in arrival order
+        self._waiters: Deque[Callable[[], Any]] = deque()
+        self._rejected = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "rejected": self._rejected,
+            }
+
+    def _try_acquire(self, wake: Callable[[], Any]) -> bool:
+        with self._lock:
+            if self._in_flight < int(self.limit):
+                self._in_flight += 1
+                return True
+            self._waiters.append(wake)
+            return False
+
+    def _forget(self, wake: Callable[[], Any]) -> None:
+        """Stop waiting for a slot, passing the wake-up on if `wake` got one."""
+        with self._lock:
+            if wake in self._waiters:
+                self._waiters.remove(wake)
+                return
+            if not self._waiters or self._in_flight >= int(self.limit):
+                return
+            woken = self._waiters.popleft()
+        woken()
+
+    def _give_up(self, wake: Callable[[], Any]) -> Exception:
+        self._forget(wake)
+        with self._lock:
+            self._rejected += 1
+            limit = int(self.limit)
+        return _overloaded(
+            "Timed out waiting for one of {} statements in flight to "
+            "complete".format(limit)
+        )
+
+    def acquire(self, timeout: float) -> None:
+        """Take a slot, waiting up to `timeout` seconds for one."""
+        deadline = monotonic() + timeout
+        while True:
+            event = Event()
+            if self._try_acquire(event.set):
+                return
+            if not event.wait(max(deadline - monotonic(), 0)):
+                raise self._give_up(event.set)
+
+    async def aacquire(self, timeout: float) -> None:
+        """Take a slot, waiting up to `timeout` seconds for one."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            future = loop.create_future()
+            # Slots may be released from other threads and event loops
+            wake = partial(loop.call_soon_threadsafe, _wake_future, future)
+            if self._try_acquire(wake):
+                return
+            try:
+                await asyncio.wait_for(future, max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                raise self._give_up(wake)
+            except BaseException:
+                # Cancelled, a release must not spend its wake-up on us
+                self._forget(wake)
+                raise
+
+    def release(self, overloaded: bool, elapsed: float) -> None:
+        """Free a slot and adapt the limit to the outcome of the statement."""
+        if self.latency_target is not None and elapsed > self.latency_target:
+            overloaded = True
+        with self._lock:
+            self._in_flight -= 1
+            if overloaded:
+                self.limit = max(self.limit * self.backoff_ratio, self.min_limit)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            free = int(self.limit) - self._in_flight
+            woken = [
+                self._waiters.popleft() for _ in range(min(free, len(self._waiters)))
+            ]
+        for wake in woken:
+            wake()
+
+
+class CircuitBreaker:
+    """Fail statements right away while an engine is failing most of them.
+
+    The breaker opens when at least `failure_rate` of the last `window`
+    statements failed because of overload, once `min_calls` of them ran.
+    After `reset_timeout` seconds one statement is let through as a trial:
+    the breaker closes if it succeeds and opens again otherwise.
+
+    Args:
+        failure_rate: Share of failed statements opening the breaker.
+        reset_timeout: Seconds the breaker stays open.
+        window: Number of latest statements the failure rate is taken of.
+        min_calls: Number of statements needed to compute the rate.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        reset_timeout: float = DEFAULT_BREAKER_RESET,
+        window: int = DEFAULT_BREAKER_WINDOW,
+        min_calls: int = DEFAULT_BREAKER_MIN_CALLS,
+    ):
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.min_calls = min_calls
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = Lock()
+        self._opened = 0
+        self._rejected = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
+
+    def allow(self) -> None:
+        """Raise an error unless a statement may run now."""
+        with self._lock:
+            if (
+                self.state == OPEN
+                and monotonic() >= self._opened_at + self.reset_timeout
+            ):
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+            self._rejected += 1
+        raise _overloaded(
+            "The circuit breaker of the engine is open after too many "
+            "statements failed, retry in a while"
+        )
+
+    def cancel(self) -> None:
+        """Give up the trial of a statement that didn't run."""
+        with self._lock:
+            self._trial = False
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info("Circuit breaker closed, the engine recovered")
+                return
+            self._outcomes.append(failed)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = monotonic()
+        self._opened += 1
+        logger.warning(
+            "Circuit breaker opened for %.0f seconds, too many statements "
+            "failed because the engine is overloaded",
+            self.reset_timeout,
+        )
+
+
+class EngineGuard:
+    """Concurrency limiter and circuit breaker of an engine, both optional.
+
+    Args:
+        limiter: Limiter of statements in flight.
+        breaker: Circuit breaker.
+        queue_timeout: Seconds to wait for a slot of the limiter.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.queue_timeout = queue_timeout
+
+    def metrics(self) -> Dict[str, Any]:
+        """Metrics of the limiter and the breaker."""
+        return {
+            "limiter": self.limiter.metrics() if self.limiter else None,
+            "breaker": self.breaker.metrics() if self.breaker else None,
+        }
+
+    def _finish(self, error: Optional[BaseException], started: float) -> None:
+        overloaded = error is not None and is_overload_error(error)
+        if self.limiter is not None:
+            self.limiter.release(overloaded, monotonic() - started)
+        if self.breaker is not None:
+            self.breaker.record(overloaded)
+
+    def call(self, function: Callable[[], T]) -> T:
+        """Call a function executing a statement on the engine."""
+        if self.breaker is not None:
+            self.breaker.allow()
+        if self.limiter is not None:
+            try:
+                self.limiter.acquire(self.queue_timeout)
+            except Exception:
+                if self.breaker is not None:
+                    self.breaker.cancel()
+                raise
+        started = monotonic()
+        try:
+            result = function()
+        except Exception as error:
+            self._finish(error, started)
+            raise
+        self._finish(None, started)
+        return result
+
+    async def acall(self, function: Callable[[], Awaitable[T]]) -> T:
+        """Await a coroutine function executing a statement on the engine."""
+        if self.breaker is not None:
+            self.breaker.allow()
+        if self.limiter is not None:
+            try:
+                await self.limiter.aacquire(self.queue_timeout)
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.cancel()
+                raise
+        started = monotonic()
+        try:
+            result = await function()
+        except BaseException as error:
+            self._finish(error, started)
+            raise
+        self._finish(None, started)
+        return result
+
+
+_OPTIONS = (
+    ("concurrency_limit", int),
+    ("concurrency_timeout", float),
+    ("latency_target", float),
+    ("circuit_breaker", float),
+    ("circuit_breaker_reset", float),
+)
+
+
+def pop_engine_guard_options(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove options of the engine guard from URL query parameters."""
+    options: Dict[str, Any] = {}
+    for name, parse in _OPTIONS:
+        if name in parameters:
+            try:
+                options[name] = parse(parameters.pop(name))
+            except ValueError:
+                options[name] = -1
+            if options[name] <= 0:
+                raise ArgumentError("{} must be a positive number".format(name))
+    if "circuit_breaker" in options and options["circuit_breaker"] > 1:
+        raise ArgumentError("circuit_breaker must be a failure rate up to 1")
+    if options and not {"concurrency_limit", "circuit_breaker"} & set(options):
+        raise ArgumentError(
+            "{} require concurrency_limit or circuit_breaker".format(", ".join(options))
+        )
+    return options
+
+
+_guards: Dict[Tuple[str, Tuple], EngineGuard] = {}
+_guards_lock = Lock()
+
+
+def _build_engine_guard(options: Dict[str, Any]) -> EngineGuard:
+    limiter = breaker = None
+    if "concurrency_limit" in options:
+        limiter = AdaptiveLimiter(
+            options["concurrency_limit"],
+            latency_target=options.get("latency_target"),
+        )
+    if "circuit_breaker" in options:
+        breaker = CircuitBreaker(
+            options["circuit_breaker"],
+            options.get("circuit_breaker_reset", DEFAULT_BREAKER_RESET),
+        )
+    return EngineGuard(
+        limiter, breaker, options.get("concurrency_timeout", DEFAULT_QUEUE_TIMEOUT)
+    )
+
+
+def get_engine_guard(name: str, options: Dict[str, Any]) -> Optional[EngineGuard]:
+    """Get the guard of an engine target, see `engine_target_name`, None
+    without options."""
+    if not options:
+        return None
+    key = (name, tuple(sorted(options.items())))
+    with _guards_lock:
+        if key not in _guards:
+            _guards[key] = _build_engine_guard(options)
+        return _guards[key]
@@ -0,0 +1,213 @@
+"""Connection pools of the dialects, with telemetry.
+
+Connecting to Firebolt takes several HTTP requests: a token is requested
+from the authentication endpoint unless one is cached, and the system engine
+resolves the URL of the database and engine to connect to. The pools record
+how long checkouts wait and how long each part of connecting takes, as well
+as how old and how often reused the connections they hand out are.
+
+    engine = create_engine("firebolt://id:secret@db/engine?account_name=a")
+    ...
+    engine.pool.telemetry.metrics()
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+if TYPE_CHECKING:
+    from sqlalchemy.pool import ConnectionPoolEntry, PoolProxiedConnection
+
+# Connections are recycled well before their access token expires, which
+# takes hours, so that a connection doesn't outlive a restart of its engine
+DEFAULT_POOL_RECYCLE = 3600
+
+_CONNECTED_AT = "firebolt_connected_at"
+_CHECKOUTS = "firebolt_checkouts"
+
+
+class Summary:
+    """Count, total and maximum of observed values."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class ConnectTrace:
+    """Seconds spent in HTTP requests while a connection is made."""
+
+    def __init__(self) -> None:
+        self.auth = 0.0
+        self.engine_resolve = 0.0
+
+
+_connect_trace: ContextVar[Optional[ConnectTrace]] = ContextVar(
+    "firebolt_connect_trace", default=None
+)
+
+
+def trace_auth(auth: Any) -> Any:
+    """Time the requests `auth` authenticates while a connection is made.
+
+    Token requests count as authentication, other requests made while
+    connecting resolve the database and engine.
+    """
+    from firebolt.client.auth.base import AuthRequest
+
+    auth_flow = auth.auth_flow
+
+    def traced_auth_flow(request: Any) -> Any:
+        flow = auth_flow(request)
+        next_request = next(flow)
+        while True:
+            trace = _connect_trace.get()
+            started = monotonic()
+            response = yield next_request
+            if trace is not None:
+                elapsed = monotonic() - started
+                if isinstance(next_request, AuthRequest):
+                    trace.auth += elapsed
+                else:
+                    trace.engine_resolve += elapsed
+            try:
+                next_request = flow.send(response)
+            except StopIteration:
+                return
+
+    # The SDK calls auth_flow of the instance for sync and async clients
+    auth.auth_flow = traced_auth_flow
+    return auth
+
+
+class PoolTelemetry:
+    """Timings of checkouts and connections of a pool."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.checkout_wait = Summary()
+        self.connect = Summary()
+        self.connect_auth = Summary()
+        self.connect_engine_resolve = Summary()
+        self.connect_handshake = Summary()
+        self.connection_age = Summary()
+        self.connection_reuses = Summary()
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Summaries in seconds, except for reuses: count, mean and maximum.
+
+        `checkout_wait` includes making a connection when there's no idle
+        one. `connect` is split into `connect_auth` (token requests),
+        `connect_engine_resolve` (other requests made while connecting) and
+        `connect_handshake` (the rest). `connection_age` and
+        `connection_reuses` are those of connections when checked out.
+        """
+        with self._lock:
+            return {
+                name: summary.as_dict()
+                for name, summary in vars(self).items()
+                if isinstance(summary, Summary)
+            }
+
+    @contextmanager
+    def trace_connect(self) -> Iterator[None]:
+        trace = ConnectTrace()
+        token = _connect_trace.set(trace)
+        started = monotonic()
+        try:
+            yield
+        finally:
+            _connect_trace.reset(token)
+        elapsed = monotonic() - started
+        with self._lock:
+            self.connect.add(elapsed)
+            self.connect_auth.add(trace.auth)
+            self.connect_engine_resolve.add(trace.engine_resolve)
+            self.connect_handshake.add(
+                max(elapsed - trace.auth - trace.engine_resolve, 0.0)
+            )
+
+    def record_checkout(self, record: "ConnectionPoolEntry", wait: float) -> None:
+        checkouts = record.info.get(_CHECKOUTS, 0)
+        record.info[_CHECKOUTS] = checkouts + 1
+        age = monotonic() - record.info.get(_CONNECTED_AT, monotonic())
+        with self._lock:
+            self.checkout_wait.add(wait)
+            self.connection_age.add(age)
+            self.connection_reuses.add(checkouts)
+
+
+class _TelemetryPoolMixin:
+    telemetry: PoolTelemetry
+
+    def _should_wrap_creator(self, creator: Callable) -> Callable:
+        invoke_creator = super()._should_wrap_creator(creator)  # type: ignore
+
+        def traced_creator(record: "ConnectionPoolEntry") -> Any:
+            telemetry = self._telemetry()
+            with telemetry.trace_connect():
+                connection = invoke_creator(record)
+            record.info[_CONNECTED_AT] = monotonic()
+            record.info[_CHECKOUTS] = 0
+            return connection
+
+        return traced_creator
+
+    def _telemetry(self) -> PoolTelemetry:
+        # Created on first use, the creator is set before __init__ returns
+        if "telemetry" not in vars(self):
+            self.telemetry = PoolTelemetry()
+        return self.telemetry
+
+    def connect(self) -> "PoolProxiedConnection":
+        started = monotonic()
+        # Includes recycling and pre-pinging the connection checked out
+        connection = super().connect()  # type: ignore
+        record = connection._connection_record
+        if record is not None:
+            self._telemetry().record_checkout(record, monotonic() - started)
+        return connection
+
+    def recreate(self) -> Any:
+        pool = super().recreate()  # type: ignore
+        # Telemetry covers the pool of an engine across dispose()
+        pool.telemetry = self._telemetry()
+        return pool
+
+
+class FireboltQueuePool(_TelemetryPoolMixin, QueuePool):
+    """QueuePool with telemetry, recycling connections hourly by default."""
+
+    def __init__(
+        self, creator: Any, recycle: int = DEFAULT_POOL_RECYCLE, **kwargs: Any
+    ):
+        super().__init__(creator, recycle=recycle, **kwargs)
+        self._telemetry()
+
+
+class FireboltAsyncAdaptedQueuePool(_TelemetryPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with telemetry, recycling connections hourly
+    by default."""
+
+    def __init__(
+        self, creator: Any, recycle: int = DEFAULT_POOL_RECYCLE, **kwargs: Any
+    ):
+        super().__init__(creator, recycle=recycle, **kwargs)
+        self._telemetry()
@@ -0,0 +1,204 @@
+"""Prepared statements, executed with server-side parameters.
+
+By default the SDK parses statements with parameters and formats the values
+into the SQL text, so the engine gets a different statement for every set of
+values. Prepared statements instead keep `$1, $2, ...` placeholders and send
+the values separately as query parameters (the SDK's `fb_numeric` parameter
+style). The SQL text is then the same for every execution, so the engine
+can reuse what it cached for the statement, and the SDK does no parsing.
+
+Firebolt has no protocol to execute a statement by a handle, so every
+request still carries the SQL text. Each connection keeps the statements it
+prepared in an LRU cache, so that preparing a statement again is a lookup.
+"""
+
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
+
+from sqlalchemy.exc import ArgumentError
+
+if TYPE_CHECKING:
+    from firebolt.async_db.cursor import Cursor as AsyncCursor
+    from firebolt.common.cursor.statement_planners import ExecutionPlan
+    from firebolt.db.cursor import Cursor
+
+# String literals, quoted identifiers and comments, which may contain "?"
+# and ";" that aren't placeholders or statement ends
+_TOKENS = re.compile(
+    r"""(?P<skip>(?<!\w)[eE]'(?:\\.|''|[^'\\])*'|'(?:''|[^'])*'|"(?:""|[^"])*"
+    |--[^\n]*|/\*.*?\*/)|(?P<placeholder>\?)|(?P<end>;)""",
+    re.DOTALL | re.VERBOSE,
+)
+_SET_STATEMENT = re.compile(r"\s*set\s", re.IGNORECASE)
+# First SDK release planning statements, which prepared statements rely on
+MIN_SDK_VERSION = "1.16.0"
+
+
+class PreparedStatement:
+    """Statement with `$n` placeholders in place of `?` ones.
+
+    Args:
+        query: SQL text sent to the engine.
+        parameter_count: Number of parameters of the statement.
+    """
+
+    __slots__ = ("query", "parameter_count", "executions")
+
+    def __init__(self, query: str, parameter_count: int):
+        self.query = query
+        self.parameter_count = parameter_count
+        self.executions = 0
+
+    def plan(
+        self, cursor: Any, parameters: Sequence[Any], streaming: bool = False
+    ) -> "ExecutionPlan":
+        """Plan the execution with `parameters` by an SDK cursor."""
+        from firebolt.common.cursor.statement_planners import (
+            FbNumericStatementPlanner,
+        )
+
+        self.executions += 1
+        return FbNumericStatementPlanner(cursor._formatter).create_execution_plan(
+            self.query, [parameters], streaming=streaming
+        )
+
+
+def prepare_statement(statement: str) -> Optional[PreparedStatement]:
+    """Number the placeholders of a statement, None if it can't be prepared:
+    without placeholders, with several statements or for SET statements,
+    which the SDK handles itself."""
+    if _SET_STATEMENT.match(statement):
+        return None
+    count = 0
+    multiple = False
+
+    def number(match: "re.Match[str]") -> str:
+        nonlocal count, multiple
+        if match.group("placeholder"):
+            count += 1
+            return "${}".format(count)
+        if match.group("end") and statement[match.end() :].strip():
+            multiple = True
+        return match.group(0)
+
+    query = _TOKENS.sub(number, statement)
+    if not count or multiple:
+        return None
+    return PreparedStatement(query, count)
+
+
+class PreparedStatementCache:
+    """Statements prepared on a connection, least recently used ones are
+    evicted past `size`.
+
+    Statements that can't be prepared are cached too, so that they aren't
+    scanned again.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._statements: "OrderedDict[str, Optional[PreparedStatement]]" = (
+            OrderedDict()
+        )
+        self._metrics = {"prepared": 0, "hits": 0, "evicted": 0}
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of statements `prepared`, of `hits` on prepared ones and of
+        statements `evicted`."""
+        return dict(self._metrics)
+
+    def prepare(
+        self, statement: str, parameters: Sequence[Any]
+    ) -> Optional[PreparedStatement]:
+        """Get the prepared statement to execute with `parameters`, None to
+        execute it as is."""
+        if not parameters:
+            return None
+        if statement in self._statements:
+            self._statements.move_to_end(statement)
+            prepared = self._statements[statement]
+            if prepared is not None:
+                self._metrics["hits"] += 1
+        else:
+            prepared = self._statements[statement] = prepare_statement(statement)
+            if prepared is not None:
+                self._metrics["prepared"] += 1
+            if len(self._statements) > self.size:
+                self._statements.popitem(last=False)
+                self._metrics["evicted"] += 1
+        # The SDK reports the wrong number of parameters itself
+        if prepared is None or prepared.parameter_count != len(parameters):
+            return None
+        return prepared
+
+
+def execute_prepared(
+    cursor: "Cursor", prepared: PreparedStatement, parameters: Sequence[Any]
+) -> None:
+    """Execute a prepared statement like `Cursor.execute` does a statement."""
+    from firebolt.common.constants import CursorState
+    from firebolt.common.row_set.synchronous.in_memory import InMemoryRowSet
+
+    plan = prepared.plan(cursor, parameters)
+    cursor._close_rowset_and_reset()
+    cursor._row_set = InMemoryRowSet()
+    try:
+        cursor._execute_plan(plan, None)
+        cursor._state = CursorState.DONE
+    except Exception:
+        cursor._state = CursorState.ERROR
+        raise
+
+
+async def aexecute_prepared(
+    cursor: "AsyncCursor",
+    prepared: PreparedStatement,
+    parameters: Sequence[Any],
+    streaming: bool = False,
+) -> None:
+    """Execute a prepared statement like the `execute` and `execute_stream`
+    methods of an async cursor do a statement."""
+    from firebolt.common.constants import CursorState
+    from firebolt.common.row_set.asynchronous.in_memory import (
+        InMemoryAsyncRowSet,
+    )
+    from firebolt.common.row_set.asynchronous.streaming import (
+        StreamingAsyncRowSet,
+    )
+
+    plan = prepared.plan(cursor, parameters, streaming)
+    await cursor._close_rowset_and_reset()
+    cursor._row_set = StreamingAsyncRowSet() if streaming else InMemoryAsyncRowSet()
+    try:
+        await cursor._execute_plan(plan, None)
+        cursor._state = CursorState.DONE
+    except Exception:
+        cursor._state = CursorState.ERROR
+        raise
+
+
+def parse_prepared_statements(parameters: Dict[str, Any]) -> Optional[int]:
+    """Remove the `prepared_statements` option, the number of statements
+    cached per connection, from URL query parameters."""
+    if "prepared_statements" not in parameters:
+        return None
+    try:
+        size = int(parameters.pop("prepared_statements"))
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise ArgumentError(
+            "prepared_statements must be a positive number of statements"
+        )
+    try:
+        from firebolt.common.cursor.statement_planners import (  # noqa: F401
+            FbNumericStatementPlanner,
+        )
+    except ImportError:
+        raise ArgumentError(
+            "prepared_statements requires firebolt-sdk {} or later".format(
+                MIN_SDK_VERSION
+            )
+        )
+    return size
@@ -0,0 +1,78 @@
+"""Incremental reflection of table columns.
+
+SQLAlchemy caches reflected metadata per `Inspector`, so every call of
+`MetaData.reflect()` reads the columns of all tables again. A column cache
+keeps the reflected columns of tables across calls, along with a fingerprint
+of each table: its number of columns and a hash of their names, types and
+nullability, computed by the engine. Columns are only read again for tables
+whose fingerprint changed, see `FireboltDialect.get_multi_columns`.
+"""
+
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Number of columns and hash of their definitions
+Fingerprint = Tuple[int, int]
+_Key = Tuple[Optional[str], str]
+
+
+class ColumnCache:
+    """Reflected columns of tables, by schema and table name, with the
+    fingerprints they were reflected at."""
+
+    def __init__(self) -> None:
+        self._tables: Dict[_Key, Tuple[Fingerprint, List[Dict]]] = {}
+        self._lock = Lock()
+        self._metrics = {"reused": 0, "fetched": 0}
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of tables whose columns were `reused` from the cache, and
+        `fetched` because they changed or weren't cached."""
+        with self._lock:
+            return dict(self._metrics)
+
+    def lookup(
+        self, schema: Optional[str], fingerprints: Dict[str, Fingerprint]
+    ) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """Get the columns of unchanged tables, and the names of the others."""
+        columns: Dict[str, List[Dict]] = {}
+        changed: List[str] = []
+        with self._lock:
+            for name, fingerprint in fingerprints.items():
+                cached = self._tables.get((schema, name))
+                if cached is not None and cached[0] == fingerprint:
+                    # Copies, as column_reflect listeners may modify them
+                    columns[name] = [dict(column) for column in cached[1]]
+                else:
+                    changed.append(name)
+            self._metrics["reused"] += len(columns)
+            self._metrics["fetched"] += len(changed)
+        return columns, changed
+
+    def store(
+        self,
+        schema: Optional[str],
+        fingerprints: Dict[str, Fingerprint],
+        columns: Dict[str, List[Dict]],
+    ) -> None:
+        """Cache the columns of tables reflected at `fingerprints`."""
+        with self._lock:
+            for name, fingerprint in fingerprints.items():
+                if name in columns:
+                    self._tables[(schema, name)] = (
+                        fingerprint,
+                        [dict(column) for column in columns[name]],
+                    )
+
+    def retain(self, schema: Optional[str], names: Iterable[str]) -> None:
+        """Forget the tables of `schema` not in `names`, e.g. dropped ones."""
+        kept = set(names)
+        with self._lock:
+            for key in [key for key in self._tables if key[0] == schema]:
+                if key[1] not in kept:
+                    del self._tables[key]
+
+    def invalidate(self) -> None:
+        """Forget all tables."""
+        with self._lock:
+            self._tables.clear()
@@ -0,0 +1,197 @@
+"""Retries of read-only statements on transient errors.
+
+A scaling or overloaded engine answers with 429 or 503 for a while. Read-only
+statements can safely run again, so they are retried with exponential backoff
+and full jitter, which spreads the retries of concurrent callers. A retry
+budget keeps retries from multiplying the load on an engine that stays
+overloaded: every statement earns a fraction of a retry, and retrying spends
+a whole one.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy.exc import ArgumentError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Too Many Requests and Service Unavailable
+TRANSIENT_STATUS_CODES = (429, 503)
+
+DEFAULT_RETRY_BACKOFF = 0.1
+MAX_RETRY_BACKOFF = 10.0
+DEFAULT_RETRY_BUDGET = 0.1
+# Retries available before any statement has earned one
+RETRY_BUDGET_RESERVE = 10.0
+
+
+def get_error_status(error: BaseException) -> Optional[int]:
+    """Get the status code of the response an error was raised for, None if
+    it wasn't raised for a response."""
+    from firebolt.utils.util import raise_error_from_response
+    from httpx import HTTPStatusError, Response
+
+    if isinstance(error, HTTPStatusError):
+        return error.response.status_code
+    # The SDK raises errors from the body of a response without its status,
+    # which is still in the frame that raised them
+    traceback = error.__traceback__
+    while traceback is not None:
+        frame = traceback.tb_frame
+        if frame.f_code is raise_error_from_response.__code__:
+            response = frame.f_locals.get("resp")
+            if isinstance(response, Response):
+                return response.status_code
+        traceback = traceback.tb_next
+    return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Check whether an error is a response the engine may not give again."""
+    return get_error_status(error) in TRANSIENT_STATUS_CODES
+
+
+class RetryPolicy:
+    """Retry statements failing with transient errors, within a budget.
+
+    Args:
+        retries: Maximum number of retries of a statement.
+        backoff: Upper bound of the first delay in seconds, doubled for each
+            retry up to `MAX_RETRY_BACKOFF`. Delays are drawn uniformly
+            between 0 and the bound.
+        budget: Retries earned by each executed statement. Up to
+            `RETRY_BUDGET_RESERVE` unspent retries are kept.
+    """
+
+    def __init__(
+        self,
+        retries: int,
+        backoff: float = DEFAULT_RETRY_BACKOFF,
+        budget: float = DEFAULT_RETRY_BUDGET,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.budget = budget
+        self._balance = RETRY_BUDGET_RESERVE
+        self._lock = Lock()
+        self._metrics = {
+            "statements": 0,
+            "retries": 0,
+            "recovered": 0,
+            "exhausted": 0,
+            "budget_exhausted": 0,
+        }
+
+    def metrics(self) -> Dict[str, int]:
+        """Counters of the policy.
+
+        `statements` executed with the policy, `retries` made, statements
+        `recovered` by a retry, and statements that failed after using all
+        retries (`exhausted`) or because the budget was spent
+        (`budget_exhausted`).
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            self._metrics["statements"] += 1
+            self._balance = min(self._balance + self.budget, RETRY_BUDGET_RESERVE)
+
+    def _next_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Delay before retrying after a failed attempt, None if the statement
+        isn't retried."""
+        if not is_transient_error(error):
+            return None
+        with self._lock:
+            if attempt >= self.retries:
+                self._metrics["exhausted"] += 1
+                return None
+            if self._balance < 1:
+                self._metrics["budget_exhausted"] += 1
+                return None
+            self._balance -= 1
+            self._metrics["retries"] += 1
+        delay = random.uniform(0, min(self.backoff * 2**attempt, MAX_RETRY_BACKOFF))
+        logger.info(
+            "Statement failed with a transient error, retry %d of %d in %.2f "
+            "seconds: %s",
+            attempt + 1,
+            self.retries,
+            delay,
+            error,
+        )
+        return delay
+
+    def call(self, function: Callable[[], T]) -> T:
+        """Call a function, retrying it on transient errors."""
+        self._start()
+        attempt = 0
+        while True:
+            try:
+                result = function()
+            except Exception as error:
+                delay = self._next_delay(error, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if attempt:
+                self._count("recovered")
+            return result
+
+    async def acall(self, function: Callable[[], Awaitable[T]]) -> T:
+        """Await a coroutine function, retrying it on transient errors."""
+        self._start()
+        attempt = 0
+        while True:
+            try:
+                result = await function()
+            except Exception as error:
+                delay = self._next_delay(error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if attempt:
+                self._count("recovered")
+            return result
+
+
+def parse_retry_policy(parameters: Dict[str, Any]) -> Optional[RetryPolicy]:
+    """Remove retry options from URL query parameters and build their policy,
+    None unless `retries` is set."""
+    options: Dict[str, Any] = {}
+    for name, parse in (
+        ("retries", int),
+        ("retry_backoff", float),
+        ("retry_budget", float),
+    ):
+        if name in parameters:
+            try:
+                options[name] = parse(parameters.pop(name))
+            except ValueError:
+                options[name] = -1
+            if options[name] < 0:
+                raise ArgumentError("{} must be a non-negative number".format(name))
+    if options and "retries" not in options:
+        raise ArgumentError("retry_backoff and retry_budget require retries")
+    if not options.get("retries"):
+        return None
+    return RetryPolicy(
+        options["retries"],
+        options.get("retry_backoff", DEFAULT_RETRY_BACKOFF),
+        options.get("retry_budget", DEFAULT_RETRY_BUDGET),
+    )
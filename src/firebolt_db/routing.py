@@ -0,0 +1,210 @@
+"""Routing of read-only statements to Firebolt read engines.
+
+A routed SQLAlchemy engine keeps its regular pool of connections to the
+write engine, and a separate pool per read engine. Read-only statements are
+executed on a connection borrowed from one of the read pools, everything else
+goes to the write engine.
+"""
+
+import re
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.pool import QueuePool
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+READ_ROUTING_STRATEGIES = (ROUND_ROBIN, LEAST_LOADED)
+
+DEFAULT_READ_POOL_SIZE = 5
+
+# Leading comments and parentheses are skipped, e.g. "/* hint */ (SELECT ..."
+_READ_STATEMENT = re.compile(
+    r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*(?:select|with|show|describe|explain)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def is_read_statement(statement: str) -> bool:
+    """Check whether a statement only reads data and can go to a read engine."""
+    return _READ_STATEMENT.match(statement) is not None
+
+
+class ReadRouter:
+    """Pools of connections to read engines and the strategy to pick one.
+
+    Args:
+        creators: Functions creating a DB-API connection to each read engine.
+        pool_sizes: Maximum number of connections kept for each read engine.
+        strategy: `round_robin` to take turns, `least_loaded` to pick the
+            engine with the lowest share of its pool in use.
+    """
+
+    def __init__(
+        self,
+        creators: Sequence[Callable[[], Any]],
+        pool_sizes: Sequence[int],
+        strategy: str = ROUND_ROBIN,
+    ):
+        if strategy not in READ_ROUTING_STRATEGIES:
+            raise ArgumentError(
+                "read_routing must be one of: {}".format(
+                    ", ".join(READ_ROUTING_STRATEGIES)
+                )
+            )
+        self.strategy = strategy
+        self.pools = [
+            # Connections are in autocommit mode, nothing to reset on return
+            QueuePool(creator, pool_size=size, max_overflow=0, reset_on_return=None)
+            for creator, size in zip(creators, pool_sizes)
+        ]
+        self._turns = count()
+
+    def _choose_pool(self) -> QueuePool:
+        if self.strategy == LEAST_LOADED:
+            return min(self.pools, key=lambda pool: pool.checkedout() / pool.size())
+        # next() on itertools.count is atomic, no lock is needed
+        return self.pools[next(self._turns) % len(self.pools)]
+
+    def checkout(self) -> Any:
+        """Borrow a connection from a read pool, `close()` returns it."""
+        return self._choose_pool().connect()
+
+    def dispose(self) -> None:
+        for pool in self.pools:
+            pool.dispose()
+
+
+def parse_read_targets(value: Any) -> List[str]:
+    """Read targets from a comma separated or repeated URL query parameter."""
+    values = [value] if isinstance(value, str) else list(value)
+    return [target.strip() for item in values for target in item.split(",") if target]
+
+
+def parse_pool_sizes(value: Optional[Any], targets: Sequence[str]) -> List[int]:
+    """One size for all read targets, or a comma separated size per target."""
+    if value is None:
+        return [DEFAULT_READ_POOL_SIZE] * len(targets)
+    try:
+        sizes = [int(size) for size in parse_read_targets(value)]
+    except ValueError:
+        raise ArgumentError("read_pool_size must be an integer or a list of them")
+    if len(sizes) == 1:
+        sizes *= len(targets)
+    if len(sizes) != len(targets) or min(sizes) < 1:
+        raise ArgumentError(
+            "read_pool_size must be a positive size for all read engines "
+            "or one for each of them"
+        )
+    return sizes
+
+
+class RoutingCursor:
+    """DB-API cursor executing read-only statements on a read engine, unless
+    the writer connection is in a transaction.
+
+    The read connection is held until the next execution or until the cursor
+    is closed, which SQLAlchemy does once the result is consumed.
+    """
+
+    def __init__(
+        self, connection: "RoutingConnection", cursor: Any, router: ReadRouter
+    ):
+        self.connection = connection
+        self._writer = cursor
+        self._router = router
+        self._cursor = cursor
+        self._read_connection: Optional[Any] = None
+
+    def _release(self) -> None:
+        if self._read_connection is not None:
+            self._cursor.close()
+            self._read_connection.close()
+            self._read_connection = None
+            self._cursor = self._writer
+
+    def execute(
+        self,
+        query: str,
+        parameters: Optional[Sequence] = None,
+        skip_parsing: bool = False,
+    ) -> Any:
+        self._release()
+        # Statements of a transaction must see its writes, which readers don't;
+        # connections only track transactions since firebolt-sdk 1.18.0
+        in_transaction = getattr(self.connection, "in_transaction", False)
+        if is_read_statement(query) and not in_transaction:
+            self._read_connection = self._router.checkout()
+            self._cursor = self._read_connection.cursor()
+            self._cursor.arraysize = self._writer.arraysize
+            # SET parameters are executed on the writer and followed by readers
+            self._cursor._set_parameters = self._writer._set_parameters
+        return self._cursor.execute(query, parameters, skip_parsing)
+
+    def executemany(self, query: str, parameters_seq: Sequence[Sequence]) -> Any:
+        self._release()
+        return self._writer.executemany(query, parameters_seq)
+
+    @property
+    def _set_parameters(self) -> Dict[str, Any]:
+        return self._writer._set_parameters
+
+    @_set_parameters.setter
+    def _set_parameters(self, value: Dict[str, Any]) -> None:
+        self._writer._set_parameters = value
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def arraysize(self) -> int:
+        return self._writer.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value: int) -> None:
+        self._writer.arraysize = value
+
+    def fetchone(self) -> Any:
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: Optional[int] = None) -> List:
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self) -> List:
+        return self._cursor.fetchall()
+
+    def __iter__(self) -> Any:
+        return iter(self._cursor)
+
+    def close(self) -> None:
+        self._release()
+        self._writer.close()
+
+
+class RoutingConnection:
+    """DB-API connection to the write engine that routes reads of its cursors."""
+
+    def __init__(self, connection: Any, router: ReadRouter):
+        self._connection = connection
+        self._router = router
+
+    def cursor(self) -> RoutingCursor:
+        return RoutingCursor(self, self._connection.cursor(), self._router)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
@@ -0,0 +1,176 @@
+"""Background refresh of access tokens.
+
+The SDK requests a new token when the current one expired or is rejected,
+adding a round trip to the authentication service to whichever statement
+runs at that moment. A token refresher requests the next token in a daemon
+thread shortly before the current one expires, so statements keep using a
+valid token. It serves the sync and async dialects alike, both share the
+auth object of an engine across its connections.
+"""
+
+import logging
+import weakref
+from threading import Lock, Timer
+from time import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from firebolt.client.auth import Auth
+    from httpx import URL
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the expiry of a token a new one is requested
+DEFAULT_REFRESH_MARGIN = 300.0
+# Share of the remaining lifetime of a token waited at least before refreshing
+# it, so that tokens living shorter than the margin aren't refreshed in a loop
+MIN_REFRESH_FRACTION = 0.5
+# Seconds to wait before trying again after a refresh failed, doubled after
+# each consecutive failure
+REFRESH_RETRY_DELAY = 30.0
+MAX_REFRESH_RETRY_DELAY = 300.0
+REFRESH_TIMEOUT = 30.0
+
+
+def get_token_endpoint(api_endpoint: Optional[str], auth: "Auth") -> "URL":
+    """Base URL of token requests of `auth`, as the SDK client for it derives
+    it: V1 auth, e.g. UsernamePassword, logs in against the API itself."""
+    from firebolt.client.auth.base import FireboltAuthVersion
+    from firebolt.client.constants import DEFAULT_API_URL
+    from firebolt.utils.util import fix_url_schema, get_auth_endpoint
+    from httpx import URL
+
+    api_url = URL(fix_url_schema(api_endpoint or DEFAULT_API_URL))
+    if auth.get_firebolt_version() == FireboltAuthVersion.V1:
+        return api_url
+    return get_auth_endpoint(api_url)
+
+
+class TokenRefresher:
+    """Request new tokens for an auth object before its tokens expire.
+
+    Refreshes are scheduled from the expiry of the token in use, once one
+    is known: after the first statement requested a token. A token is used
+    for at least `MIN_REFRESH_FRACTION` of its remaining lifetime, and tokens
+    that already expired by the local clock are left for statements to
+    request again. The refresher doesn't keep the auth object alive and
+    stops once it's gone.
+
+    Args:
+        auth: Auth object getting its tokens from the authentication service.
+        token_endpoint: Base URL of token requests, see `get_token_endpoint`.
+        margin: Seconds before the expiry of a token to refresh it.
+    """
+
+    def __init__(
+        self,
+        auth: "Auth",
+        token_endpoint: "URL",
+        margin: float = DEFAULT_REFRESH_MARGIN,
+    ):
+        self._auth = weakref.ref(auth)
+        self.token_endpoint = token_endpoint
+        self.margin = margin
+        self._lock = Lock()
+        self._timer: Optional[Timer] = None
+        self._stopped = False
+        self._failures = 0
+        self._metrics = {"refreshed": 0, "failed": 0}
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of tokens `refreshed`, and of refreshes that `failed`."""
+        with self._lock:
+            return dict(self._metrics)
+
+    def schedule(self) -> None:
+        """Schedule the refresh of the current token, unless it's scheduled
+        already or its expiry isn't known."""
+        auth = self._auth()
+        if auth is None or auth._expires is None:
+            return
+        remaining = auth._expires - time()
+        if remaining <= 0:
+            return
+        with self._lock:
+            if self._timer is None and not self._stopped:
+                self._start_timer(
+                    max(remaining - self.margin, remaining * MIN_REFRESH_FRACTION)
+                )
+
+    def stop(self) -> None:
+        """Cancel the scheduled refresh, and stop scheduling refreshes."""
+        with self._lock:
+            self._stopped = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _start_timer(self, delay: float) -> None:
+        self._timer = Timer(delay, self._run)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _run(self) -> None:
+        auth = self._auth()
+        if auth is None:
+            return
+        try:
+            self.refresh(auth)
+        except Exception:
+            logger.warning("Failed to refresh the access token", exc_info=True)
+            with self._lock:
+                self._metrics["failed"] += 1
+                self._failures += 1
+                # Statements request a token themselves once it expired
+                if not self._stopped and not auth.expired:
+                    self._start_timer(
+                        min(
+                            REFRESH_RETRY_DELAY * 2 ** (self._failures - 1),
+                            MAX_REFRESH_RETRY_DELAY,
+                        )
+                    )
+                else:
+                    self._timer = None
+            return
+        with self._lock:
+            self._metrics["refreshed"] += 1
+            self._failures = 0
+            self._timer = None
+        self.schedule()
+
+    def refresh(self, auth: "Auth") -> None:
+        """Request a new token for `auth` now."""
+        from firebolt.utils.util import merge_urls
+        from httpx import Client, Request
+
+        flow = auth.get_new_token_generator()
+        request = next(flow)
+        with Client(timeout=REFRESH_TIMEOUT) as client:
+            response = client.send(
+                Request(
+                    request.method,
+                    merge_urls(self.token_endpoint, request.url),
+                    headers=request.headers,
+                    content=request.content,
+                )
+            )
+        try:
+            flow.send(response)
+        except StopIteration:
+            pass
+        auth._cache_token()
+
+
+def refresh_in_background(auth: "Auth", token_endpoint: "URL") -> TokenRefresher:
+    """Keep the tokens of `auth` fresh with a `TokenRefresher`, scheduled
+    whenever `auth` authenticates a request."""
+    refresher = TokenRefresher(auth, token_endpoint)
+    auth_flow = auth.auth_flow
+
+    def refreshing_auth_flow(request: Any) -> Any:
+        yield from auth_flow(request)
+        refresher.schedule()
+
+    auth.auth_flow = refreshing_auth_flow  # type: ignore[method-assign]
+    refresher.schedule()
+    return refresher
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, Iterator
+
+from pytest import fixture
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from tests.stub_server import StubFireboltServer, encode_result
+
+LARGE_FETCH_ROWS = 50_000
+REFLECTED_TABLES = ["big_table", "lineitem"]
+REFLECTED_COLUMNS = 50
+
+BIG_TABLE_COLUMNS = [
+    ("id", "bigint"),
+    ("name", "text"),
+    ("price", "double precision"),
+    ("created", "date"),
+]
+
+
+@fixture
+def benchmark_server(stub_server: StubFireboltServer) -> StubFireboltServer:
+    # Keeping every statement would skew memory usage of long benchmark runs
+    stub_server.record_queries = False
+    stub_server.add_result(
+        r"select .* from big_table",
+        BIG_TABLE_COLUMNS,
+        [[i, f"name_{i}", i * 1.5, "2024-01-01"] for i in range(LARGE_FETCH_ROWS)],
+    )
+    stub_server.add_result(
+        r"select table_name from information_schema\.tables.*",
+        [("table_name", "text")],
+        [[table_name] for table_name in REFLECTED_TABLES],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.views.*",
+        [("table_name", "text"), ("view_definition", "text")],
+        [],
+    )
+    column_rows = {
+        table_name: [
+            [
+                table_name,
+                f"column_{i}",
+                ("bigint", "text", "date", "array(int null)")[i % 4],
+                1,
+            ]
+            for i in range(REFLECTED_COLUMNS)
+        ]
+        for table_name in REFLECTED_TABLES
+    }
+
+    def columns_handler(statement: str, params: Dict[str, str]) -> bytes:
+        # Columns of the tables the statement filters on, or of all of them
+        tables = [
+            table_name
+            for table_name in REFLECTED_TABLES
+            if "table_name in" not in statement or f"'{table_name}'" in statement
+        ]
+        return encode_result(
+            [
+                ("table_name", "text"),
+                ("column_name", "text"),
+                ("data_type", "text"),
+                ("is_nullable", "int"),
+            ],
+            [row for table_name in tables for row in column_rows[table_name]],
+        )
+
+    stub_server.add_handler(r".*from information_schema\.columns.*", columns_handler)
+    return stub_server
+
+
+@fixture
+def benchmark_table() -> Table:
+    return Table(
+        "big_table",
+        MetaData(),
+        Column("id", Integer),
+        Column("name", String),
+        Column("price", Integer),
+    )
+
+
+@fixture
+def sync_engine(benchmark_server: StubFireboltServer) -> Iterator[Engine]:
+    engine = create_engine(f"firebolt://firebolt?url={benchmark_server.url}")
+    yield engine
+    engine.dispose()
+
+
+@fixture
+def event_loop_runner() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@fixture
+def async_engine(
+    benchmark_server: StubFireboltServer, event_loop_runner: asyncio.AbstractEventLoop
+) -> Iterator[AsyncEngine]:
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={benchmark_server.url}"
+    )
+    yield engine
+    event_loop_runner.run_until_complete(engine.dispose())
@@ -0,0 +1,157 @@
+from asyncio import AbstractEventLoop
+from typing import Any, Awaitable, Callable
+
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy import insert, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.schema import Table
+
+from firebolt_db.native_async import NativeAsyncEngine
+from tests.benchmarks.conftest import LARGE_FETCH_ROWS, REFLECTED_COLUMNS
+from tests.stub_server import StubFireboltServer
+
+BULK_INSERT_ROWS = 100
+
+
+def run_async(
+    loop: AbstractEventLoop, function: Callable[[], Awaitable[Any]]
+) -> Callable[[], Any]:
+    """Turn a coroutine function into a callable usable by pytest-benchmark."""
+    return lambda: loop.run_until_complete(function())
+
+
+def test_connect(
+    benchmark: BenchmarkFixture,
+    benchmark_server: StubFireboltServer,
+    event_loop_runner: AbstractEventLoop,
+):
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={benchmark_server.url}",
+        poolclass=NullPool,
+    )
+
+    async def connect() -> None:
+        connection = await engine.connect()
+        await connection.close()
+
+    benchmark(run_async(event_loop_runner, connect))
+    event_loop_runner.run_until_complete(engine.dispose())
+
+
+def test_small_query(
+    benchmark: BenchmarkFixture,
+    async_engine: AsyncEngine,
+    event_loop_runner: AbstractEventLoop,
+):
+    connection = event_loop_runner.run_until_complete(async_engine.connect())
+
+    async def query() -> list:
+        result = await connection.execute(text("select 1"))
+        return result.fetchall()
+
+    result = benchmark(run_async(event_loop_runner, query))
+    event_loop_runner.run_until_complete(connection.close())
+    assert result == [(1,)]
+
+
+def test_native_small_query(
+    benchmark: BenchmarkFixture,
+    benchmark_server: StubFireboltServer,
+    event_loop_runner: AbstractEventLoop,
+):
+    # Same statement as test_small_query, without the greenlet bridge
+    engine = NativeAsyncEngine(f"firebolt://firebolt?url={benchmark_server.url}")
+    statement = text("select 1")
+
+    async def query() -> list:
+        return (await engine.execute(statement)).all()
+
+    result = benchmark(run_async(event_loop_runner, query))
+    event_loop_runner.run_until_complete(engine.dispose())
+    assert result == [(1,)]
+
+
+def test_large_fetch(
+    benchmark: BenchmarkFixture,
+    async_engine: AsyncEngine,
+    event_loop_runner: AbstractEventLoop,
+):
+    connection = event_loop_runner.run_until_complete(async_engine.connect())
+
+    async def fetch() -> list:
+        result = await connection.execute(text("select * from big_table"))
+        return result.fetchall()
+
+    rows = benchmark.pedantic(run_async(event_loop_runner, fetch), rounds=5)
+    event_loop_runner.run_until_complete(connection.close())
+    assert len(rows) == LARGE_FETCH_ROWS
+
+
+def test_native_large_fetch(
+    benchmark: BenchmarkFixture,
+    benchmark_server: StubFireboltServer,
+    event_loop_runner: AbstractEventLoop,
+):
+    engine = NativeAsyncEngine(f"firebolt://firebolt?url={benchmark_server.url}")
+
+    async def fetch() -> list:
+        return (await engine.execute(text("select * from big_table"))).all()
+
+    rows = benchmark.pedantic(run_async(event_loop_runner, fetch), rounds=5)
+    event_loop_runner.run_until_complete(engine.dispose())
+    assert len(rows) == LARGE_FETCH_ROWS
+
+
+def test_reflection(
+    benchmark: BenchmarkFixture,
+    async_engine: AsyncEngine,
+    event_loop_runner: AbstractEventLoop,
+):
+    def reflect_tables(sync_connection: Any) -> list:
+        inspector = inspect(sync_connection)
+        return [
+            inspector.get_columns(table_name)
+            for table_name in inspector.get_table_names()
+        ]
+
+    async def reflect() -> list:
+        async with async_engine.connect() as connection:
+            return await connection.run_sync(reflect_tables)
+
+    tables = benchmark(run_async(event_loop_runner, reflect))
+    assert [len(columns) for columns in tables] == [REFLECTED_COLUMNS] * 2
+
+
+def test_batched_reflection(
+    benchmark: BenchmarkFixture,
+    async_engine: AsyncEngine,
+    event_loop_runner: AbstractEventLoop,
+):
+    async def reflect() -> dict:
+        async with async_engine.connect() as connection:
+            return await connection.run_sync(
+                lambda sync_connection: inspect(sync_connection).get_multi_columns()
+            )
+
+    tables = benchmark(run_async(event_loop_runner, reflect))
+    assert [len(columns) for columns in tables.values()] == [REFLECTED_COLUMNS] * 2
+
+
+def test_bulk_insert(
+    benchmark: BenchmarkFixture,
+    async_engine: AsyncEngine,
+    event_loop_runner: AbstractEventLoop,
+    benchmark_table: Table,
+):
+    rows = [{"id": i, "name": f"name_{i}", "price": i} for i in range(BULK_INSERT_ROWS)]
+    statement = insert(benchmark_table)
+    connection = event_loop_runner.run_until_complete(async_engine.connect())
+
+    async def bulk_insert() -> None:
+        # The async cursor doesn't implement executemany, insert row by row
+        for row in rows:
+            await connection.execute(statement, row)
+
+    benchmark(run_async(event_loop_runner, bulk_insert))
+    event_loop_runner.run_until_complete(connection.close())
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from pytest import mark
+from pytest_benchmark.fixture import BenchmarkFixture
+
+
+@mark.parametrize(
+    "module", ["firebolt_db.firebolt_dialect", "firebolt_db.firebolt_async_dialect"]
+)
+def test_import_time(benchmark: BenchmarkFixture, module: str):
+    # A fresh interpreter is needed for every round, so the interpreter
+    # startup is included. Compare against the `sqlalchemy` baseline.
+    benchmark.pedantic(
+        subprocess.check_call,
+        args=([sys.executable, "-c", f"import {module}"],),
+        rounds=10,
+    )
+
+
+def test_import_time_sqlalchemy_baseline(benchmark: BenchmarkFixture):
+    benchmark.pedantic(
+        subprocess.check_call,
+        args=([sys.executable, "-c", "import sqlalchemy.engine"],),
+        rounds=10,
+    )
@@ -0,0 +1,174 @@
+from typing import Optional
+
+from pytest import importorskip, mark
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    create_engine,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.schema import Table
+
+from firebolt_db import read_frame
+from firebolt_db.firebolt_dialect import FireboltDialect
+from tests.benchmarks.conftest import LARGE_FETCH_ROWS, REFLECTED_COLUMNS
+from tests.stub_server import StubFireboltServer
+
+BULK_INSERT_ROWS = 100
+WIDE_TABLE_COLUMNS = 200
+# Bandwidth of the simulated link for compressed transport, 100 Mbit/s
+LINK_BYTES_PER_SECOND = 12_500_000
+
+
+def test_connect(benchmark: BenchmarkFixture, benchmark_server: StubFireboltServer):
+    engine = create_engine(
+        f"firebolt://firebolt?url={benchmark_server.url}", poolclass=NullPool
+    )
+
+    def connect() -> None:
+        engine.connect().close()
+
+    benchmark(connect)
+
+
+def test_compile(benchmark: BenchmarkFixture, benchmark_table: Table):
+    dialect = FireboltDialect()
+    statement = (
+        select(benchmark_table)
+        .where(benchmark_table.c.id.in_(list(range(100))))
+        .where(benchmark_table.c.name.like("name_%"))
+        .order_by(benchmark_table.c.price.desc())
+        .limit(10)
+    )
+
+    benchmark(lambda: statement.compile(dialect=dialect))
+
+
+def test_compile_wide_select(benchmark: BenchmarkFixture):
+    dialect = FireboltDialect()
+    wide_table = Table(
+        "wide_table",
+        MetaData(),
+        *(Column(f"column_{i}", Integer) for i in range(WIDE_TABLE_COLUMNS)),
+    )
+    statement = select(wide_table).where(wide_table.c.column_0 > 0)
+
+    compiled = benchmark(lambda: str(statement.compile(dialect=dialect)))
+    benchmark.extra_info["statement_length"] = len(compiled)
+
+
+@mark.parametrize("render_literal_binds", [False, True])
+def test_large_in_list(
+    benchmark: BenchmarkFixture,
+    benchmark_server: StubFireboltServer,
+    benchmark_table: Table,
+    render_literal_binds: bool,
+):
+    engine = create_engine(
+        f"firebolt://firebolt?url={benchmark_server.url}",
+        render_literal_binds=render_literal_binds,
+    )
+    statement = select(benchmark_table.c.id).where(
+        benchmark_table.c.id.in_(list(range(5_000)))
+    )
+    with engine.connect() as connection:
+        benchmark(lambda: connection.execute(statement))
+    engine.dispose()
+
+
+def test_small_query(benchmark: BenchmarkFixture, sync_engine: Engine):
+    with sync_engine.connect() as connection:
+        result = benchmark(lambda: connection.execute(text("select 1")).fetchall())
+    assert result == [(1,)]
+
+
+def test_large_fetch(benchmark: BenchmarkFixture, sync_engine: Engine):
+    with sync_engine.connect() as connection:
+        rows = benchmark.pedantic(
+            lambda: connection.execute(text("select * from big_table")).fetchall(),
+            rounds=5,
+        )
+    assert len(rows) == LARGE_FETCH_ROWS
+
+
+@mark.parametrize("compression", [None, "none", "zstd"])
+def test_compressed_fetch(
+    benchmark: BenchmarkFixture,
+    benchmark_server: StubFireboltServer,
+    compression: Optional[str],
+):
+    # By default the stub picks gzip, the coding httpx accepts without extras
+    if compression == "zstd":
+        importorskip("zstandard")
+    benchmark_server.compress_responses = True
+    benchmark_server.bytes_per_second = LINK_BYTES_PER_SECOND
+    options = f"&compression={compression}" if compression else ""
+    engine = create_engine(f"firebolt://firebolt?url={benchmark_server.url}{options}")
+    with engine.connect() as connection:
+        sent = benchmark_server.bytes_sent
+        rows = benchmark.pedantic(
+            lambda: connection.execute(text("select * from big_table")).fetchall(),
+            rounds=5,
+        )
+        sent = benchmark_server.bytes_sent - sent
+    engine.dispose()
+    benchmark.extra_info["response_bytes"] = sent // 5
+    assert len(rows) == LARGE_FETCH_ROWS
+
+
+def test_read_sql(benchmark: BenchmarkFixture, sync_engine: Engine):
+    pandas = importorskip("pandas")
+    with sync_engine.connect() as connection:
+        frame = benchmark.pedantic(
+            lambda: pandas.read_sql(text("select * from big_table"), connection),
+            rounds=5,
+        )
+    assert len(frame) == LARGE_FETCH_ROWS
+
+
+def test_read_frame(benchmark: BenchmarkFixture, sync_engine: Engine):
+    importorskip("pandas")
+    with sync_engine.connect() as connection:
+        frame = benchmark.pedantic(
+            lambda: read_frame(connection, "select * from big_table"), rounds=5
+        )
+    assert len(frame) == LARGE_FETCH_ROWS
+
+
+def test_reflection(benchmark: BenchmarkFixture, sync_engine: Engine):
+    def reflect() -> list:
+        # New inspector every time so nothing is served from its cache
+        inspector = inspect(sync_engine)
+        return [
+            inspector.get_columns(table_name)
+            for table_name in inspector.get_table_names()
+        ]
+
+    tables = benchmark(reflect)
+    assert [len(columns) for columns in tables] == [REFLECTED_COLUMNS] * 2
+
+
+def test_batched_reflection(benchmark: BenchmarkFixture, sync_engine: Engine):
+    def reflect() -> dict:
+        # Columns of all tables are read with a single query
+        return inspect(sync_engine).get_multi_columns()
+
+    tables = benchmark(reflect)
+    assert [len(columns) for columns in tables.values()] == [REFLECTED_COLUMNS] * 2
+
+
+def test_bulk_insert(
+    benchmark: BenchmarkFixture, sync_engine: Engine, benchmark_table: Table
+):
+    rows = [{"id": i, "name": f"name_{i}", "price": i} for i in range(BULK_INSERT_ROWS)]
+    statement = insert(benchmark_table)
+
+    with sync_engine.connect() as connection:
+        benchmark(lambda: connection.execute(statement, rows))
@@ -0,0 +1,11 @@
+from typing import Iterator
+
+from pytest import fixture
+
+from tests.stub_server import StubFireboltServer
+
+
+@fixture
+def stub_server() -> Iterator[StubFireboltServer]:
+    with StubFireboltServer() as server:
+        yield server
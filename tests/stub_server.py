@@ -0,0 +1,239 @@
+import gzip
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from threading import Lock, Thread
+from time import sleep
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import parse_qsl, urlparse
+
+# (column name, Firebolt type) pairs, e.g. ("id", "int")
+Columns = Sequence[Tuple[str, str]]
+# A handler receives the SQL text and request query parameters and returns
+# the raw response body. An empty body is treated as a statement without results,
+# an exception raised by the handler is returned as an internal server error,
+# or with the status of a StubHTTPError.
+Handler = Callable[[str, Dict[str, str]], bytes]
+
+
+class StubHTTPError(Exception):
+    """Raised by a handler to respond with an HTTP error status, and the
+    message as a body of `content_type`."""
+
+    def __init__(
+        self, status: int, message: str = "", content_type: str = "application/json"
+    ):
+        super().__init__(message)
+        self.status = status
+        self.content_type = content_type
+
+
+def structured_error(status: int, description: str) -> StubHTTPError:
+    """Error with a body in Firebolt's structured error format."""
+    return StubHTTPError(
+        status,
+        json.dumps({"errors": [{"severity": "ERROR", "description": description}]}),
+    )
+
+
+def encode_result(columns: Columns, rows: Sequence[Sequence[Any]]) -> bytes:
+    """Serialize a result set into Firebolt's JSON_Compact response format."""
+    return json.dumps(
+        {
+            "meta": [{"name": name, "type": type_} for name, type_ in columns],
+            "data": rows,
+            "rows": len(rows),
+            "statistics": {"elapsed": 0.0, "rows_read": len(rows), "bytes_read": 0},
+        }
+    ).encode("utf-8")
+
+
+def to_json_lines(body: bytes, rows_per_record: int = 1000) -> bytes:
+    """Convert a JSON_Compact response body into the JSONLines_Compact records
+    Firebolt streams results in."""
+    result = json.loads(body) if body else {"meta": [], "data": []}
+    records: List[Dict[str, Any]] = [
+        {
+            "message_type": "START",
+            "result_columns": result["meta"],
+            "query_id": "",
+            "query_label": "",
+            "request_id": "",
+        }
+    ]
+    data = result["data"]
+    for start in range(0, len(data), rows_per_record):
+        records.append(
+            {"message_type": "DATA", "data": data[start : start + rows_per_record]}
+        )
+    records.append(
+        {
+            "message_type": "FINISH_SUCCESSFULLY",
+            "statistics": {"elapsed": 0.0, "rows_read": len(data), "bytes_read": 0},
+        }
+    )
+    return "\n".join(json.dumps(record) for record in records).encode("utf-8")
+
+
+_THROTTLE_CHUNK_BYTES = 64 * 1024
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        query = self.rfile.read(length).decode("utf-8")
+        params = dict(parse_qsl(urlparse(self.path).query))
+        try:
+            status, body = 200, self.server.stub.respond(query, params)
+            content_type = "application/json"
+        except StubHTTPError as error:
+            status, body = error.status, str(error).encode("utf-8")
+            content_type = error.content_type
+        except Exception as error:
+            status, body = 500, str(error).encode("utf-8")
+            content_type = "application/json"
+        stub = self.server.stub
+        encoding = stub.content_coding(self.headers.get("Accept-Encoding", ""))
+        if encoding == "zstd":
+            import zstandard
+
+            body = zstandard.ZstdCompressor(level=1).compress(body)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        stub.count_sent(len(body))
+        if stub.bytes_per_second is None:
+            self.wfile.write(body)
+            return
+        # Simulate a link of limited bandwidth
+        for start in range(0, len(body), _THROTTLE_CHUNK_BYTES):
+            chunk = body[start : start + _THROTTLE_CHUNK_BYTES]
+            self.wfile.write(chunk)
+            sleep(len(chunk) / stub.bytes_per_second)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubFireboltServer"
+
+
+class StubFireboltServer:
+    """In-process HTTP server mimicking the Firebolt Core query endpoint.
+
+    Statements are matched against registered regular expressions, the most
+    recently registered match produces the response. Unmatched statements
+    get an empty response, which the SDK treats as DDL/DML without results.
+    Requests for streamed results get the same response as JSON lines.
+    With `compress_responses` set, responses are compressed with zstd or
+    gzip for requests that accept it; `bytes_per_second` limits the
+    bandwidth of responses.
+    Connect to it with ``firebolt://firebolt?url=<StubFireboltServer.url>``.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: List[Tuple[Pattern, Handler]] = []
+        self._lock = Lock()
+        self.queries: List[str] = []
+        self.record_queries = True
+        self.compress_responses = False
+        self.bytes_per_second: Optional[float] = None
+        # Response body bytes sent, after compression
+        self.bytes_sent = 0
+        self._server: Optional[_StubHTTPServer] = None
+        self._thread: Optional[Thread] = None
+        # Used by the SDK to validate SET statements
+        self.add_result(r"select 1", [("?column?", "int")], [[1]])
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "Server is not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubFireboltServer":
+        self._server = _StubHTTPServer(("127.0.0.1", 0), _StubRequestHandler)
+        self._server.stub = self
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubFireboltServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def add_handler(self, pattern: str, handler: Handler) -> None:
+        """Register a handler for statements fully matching `pattern`."""
+        with self._lock:
+            self._handlers.insert(
+                0, (re.compile(pattern, re.IGNORECASE | re.DOTALL), handler)
+            )
+
+    def add_result(
+        self, pattern: str, columns: Columns, rows: Sequence[Sequence[Any]]
+    ) -> None:
+        """Register a static result; it is serialized once up front."""
+        body = encode_result(columns, rows)
+        self.add_handler(pattern, lambda query, params: body)
+
+    def content_coding(self, accept_encoding: str) -> Optional[str]:
+        """Content coding of responses to a request accepting `accept_encoding`,
+        None to send them as they are."""
+        if not self.compress_responses:
+            return None
+        accepted = {
+            coding.split(";")[0].strip() for coding in accept_encoding.split(",")
+        }
+        if "zstd" in accepted and find_spec("zstandard") is not None:
+            return "zstd"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def count_sent(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+
+    def respond(self, query: str, params: Dict[str, str]) -> bytes:
+        statement = query.strip().rstrip(";").strip()
+        with self._lock:
+            if self.record_queries:
+                self.queries.append(statement)
+            handlers = list(self._handlers)
+        body = b""
+        for pattern, handler in handlers:
+            if pattern.fullmatch(statement):
+                body = handler(statement, params)
+                break
+        if params.get("output_format") == "JSONLines_Compact":
+            return to_json_lines(body)
+        return body
@@ -38,6 +38,8 @@ class MockDBApi:
 
 
 class MockCursor:
+    connection = None
+
     def execute():
         pass
 
@@ -85,6 +87,7 @@ class MockAsyncCursor:
     description = ""
     rowcount = -1
     arraysize = 1
+    closed = False
 
     async def execute():
         pass
@@ -98,6 +101,9 @@ class MockAsyncCursor:
     def close():
         pass
 
+    async def aclose():
+        pass
+
 
 @fixture
 def dialect() -> firebolt_dialect.FireboltDialect:
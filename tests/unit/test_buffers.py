@@ -0,0 +1,108 @@
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from pytest import raises
+
+from firebolt_db.buffers import ColumnarRows, RemainingRows, SpilledRows
+
+WIDE_COLUMNS = 50
+WIDE_ROWS = 2000
+
+
+def wide_numeric_rows() -> List[List[Any]]:
+    return [
+        [row * WIDE_COLUMNS + column for column in range(WIDE_COLUMNS - 1)] + [row / 3]
+        for row in range(WIDE_ROWS)
+    ]
+
+
+def traced_memory(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Build a value and measure the memory it holds on to."""
+    tracemalloc.start()
+    try:
+        value = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, size
+
+
+def test_spilled_rows():
+    rows = SpilledRows(threshold=3, batch_rows=4)
+    rows.extend([[i, f"name_{i}"] for i in range(5)])
+    rows.extend([[i, f"name_{i}"] for i in range(5, 12)])
+    rows.finish()
+
+    assert rows.spilled
+    assert len(rows) == 12
+    assert rows[0] == [0, "name_0"]
+    assert rows[3] == [3, "name_3"]
+    assert rows[-1] == [11, "name_11"]
+    assert rows[2:8] == [[i, f"name_{i}"] for i in range(2, 8)]
+    assert list(rows) == [[i, f"name_{i}"] for i in range(12)]
+    with raises(IndexError):
+        rows[12]
+
+    rows.close()
+    assert len(rows) == 0
+    assert not rows.spilled
+
+
+def test_spilled_rows_below_threshold():
+    rows = SpilledRows(threshold=10)
+    rows.extend([[1], [2]])
+    rows.finish()
+    assert not rows.spilled
+    assert list(rows) == [[1], [2]]
+
+
+def test_spilled_rows_read_after_finish():
+    rows = SpilledRows(threshold=0, batch_rows=2)
+    rows.extend([[1], [2], [3]])
+    with raises(RuntimeError):
+        rows[0]
+
+
+def test_remaining_rows():
+    rows = SpilledRows(threshold=2, batch_rows=2)
+    rows.extend([[i] for i in range(7)])
+    rows.finish()
+    remaining = RemainingRows(rows, 3)
+    assert len(remaining) == 4
+    assert list(remaining) == [[3], [4], [5], [6]]
+    assert remaining[0] == [3] and remaining[-1] == [6]
+    assert remaining[1:3] == [[4], [5]]
+    with raises(IndexError):
+        remaining[4]
+
+    remaining.close()
+    assert len(remaining) == 0
+    assert not rows.spilled
+
+
+def test_columnar_rows():
+    rows = ColumnarRows(
+        [[1, 1.5, "a", None], [2, None, "b", 3], [None, 2.5, None, 2**70]],
+        [int, float, str, int],
+    )
+    assert len(rows) == 3
+    assert rows[0] == (1, 1.5, "a", None)
+    assert rows[1] == (2, None, "b", 3)
+    assert rows[-1] == (None, 2.5, None, 2**70)
+    assert rows[1:] == [(2, None, "b", 3), (None, 2.5, None, 2**70)]
+    assert rows[::2] == [rows[0], rows[2]]
+    assert list(rows) == rows[:]
+    with raises(IndexError):
+        rows[3]
+    assert ColumnarRows([], [int])[:] == []
+
+
+def test_columnar_rows_memory():
+    rows, rows_size = traced_memory(wide_numeric_rows)
+    columnar, columnar_size = traced_memory(
+        lambda: ColumnarRows(wide_numeric_rows(), [int] * (WIDE_COLUMNS - 1) + [float])
+    )
+    assert columnar[:] == [tuple(row) for row in rows]
+    # 8 bytes per value instead of a Python object and a list slot
+    assert columnar_size < WIDE_ROWS * WIDE_COLUMNS * 8 * 1.1
+    assert columnar_size < rows_size / 3
@@ -0,0 +1,115 @@
+import asyncio
+from time import sleep
+from typing import Any, Dict, List
+
+from pytest import raises
+from sqlalchemy import text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from firebolt_db.coalescing import SingleFlight
+from firebolt_db.firebolt_async_dialect import AsyncFireboltDialect
+from firebolt_db.firebolt_dialect import FireboltDialect
+from tests.stub_server import StubFireboltServer, encode_result
+
+
+async def test_single_flight():
+    single_flight = SingleFlight()
+    calls: List[str] = []
+
+    async def call(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    results = await asyncio.gather(
+        *(single_flight.run(key, lambda key=key: call(key)) for key in "aaba")
+    )
+    assert results == ["A", "A", "B", "A"]
+    assert calls == ["a", "b"]
+    assert single_flight.metrics() == {"executed": 2, "coalesced": 2}
+    # Results are not kept once the call completed
+    assert await single_flight.run("a", lambda: call("a")) == "A"
+    assert calls == ["a", "b", "a"]
+
+
+async def test_single_flight_errors():
+    single_flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        single_flight.run("a", fail),
+        single_flight.run("a", fail),
+        return_exceptions=True,
+    )
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+async def test_single_flight_cancelled_leader():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call() -> str:
+        started.set()
+        await asyncio.sleep(0.01)
+        return "done"
+
+    leader = asyncio.ensure_future(single_flight.run("a", call))
+    await started.wait()
+    follower = asyncio.ensure_future(single_flight.run("a", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    # The waiting caller runs the call itself
+    assert await follower == "done"
+    assert leader.cancelled()
+    assert single_flight.metrics() == {"executed": 2, "coalesced": 1}
+
+
+def test_coalesce_reads_option():
+    dialect = AsyncFireboltDialect()
+    dialect.create_connect_args(
+        url.make_url("asyncio+firebolt://db?url=http://localhost&coalesce_reads=1")
+    )
+    assert isinstance(dialect.single_flight, SingleFlight)
+    with raises(ArgumentError):
+        FireboltDialect().create_connect_args(
+            url.make_url("firebolt://db?url=http://localhost&coalesce_reads=1")
+        )
+
+
+def slow_result(query: str, params: Dict[str, str]) -> bytes:
+    sleep(0.2)
+    return encode_result([("label", "text")], [[params.get("query_label", "none")]] * 3)
+
+
+async def fetch_all(engine: AsyncEngine, statement: str, label: str = "") -> Any:
+    async with engine.connect() as connection:
+        if label:
+            await connection.execute(text(f"SET query_label = '{label}'"))
+        result = await connection.execute(text(statement))
+        return result.fetchall()
+
+
+async def test_coalesced_execution(stub_server: StubFireboltServer):
+    stub_server.add_handler(r"select label.*", slow_result)
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}&coalesce_reads=true",
+        pool_size=8,
+    )
+    results = await asyncio.gather(
+        *(fetch_all(engine, "select label") for _ in range(6)),
+        fetch_all(engine, "select label from t"),
+        fetch_all(engine, "select label", label="other"),
+    )
+    await engine.dispose()
+
+    assert results[:6] == [[("none",)] * 3] * 6
+    assert results[6] == [("none",)] * 3
+    assert results[7] == [("other",)] * 3
+    # The six identical statements in the same session ran once
+    assert stub_server.queries.count("select label") == 2
+    assert engine.dialect.single_flight.metrics()["coalesced"] == 5
@@ -0,0 +1,165 @@
+from threading import Event, Lock, Thread
+from time import sleep
+from typing import Any, List
+from unittest import mock
+
+from firebolt.utils.exception import EngineNotRunningError
+from pytest import fixture, raises
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+
+from firebolt_db.engine_gate import (
+    FAILED,
+    RUNNING,
+    ConnectGate,
+    engine_target_name,
+    get_connect_gate,
+)
+from firebolt_db.firebolt_async_dialect import AsyncFireboltDialect
+from firebolt_db.firebolt_dialect import FireboltDialect
+from tests.stub_server import StubFireboltServer
+
+
+@fixture(autouse=True)
+def no_sleep() -> Any:
+    with mock.patch("firebolt_db.engine_gate.sleep") as sleep_mock:
+        yield sleep_mock
+
+
+def run_threads(count: int, target: Any) -> List[Any]:
+    results: List[Any] = [None] * count
+
+    def run(index: int) -> None:
+        try:
+            results[index] = target()
+        except Exception as error:
+            results[index] = error
+
+    threads = [Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_connect_retries_with_backoff(no_sleep: mock.Mock):
+    gate = ConnectGate("account/engine")
+    connect = mock.Mock(
+        side_effect=[EngineNotRunningError("engine")] * 3 + ["connection"]
+    )
+    assert gate.connect(connect, start_timeout=60, backoff=2) == "connection"
+    assert [call.args[0] for call in no_sleep.call_args_list] == [2, 4, 8]
+    assert gate.status == RUNNING
+
+
+def test_connect_no_retries_by_default():
+    gate = ConnectGate("account/engine")
+    connect = mock.Mock(side_effect=EngineNotRunningError("engine"))
+    with raises(EngineNotRunningError):
+        gate.connect(connect)
+    connect.assert_called_once()
+    assert gate.status == FAILED
+
+    # Other errors are not retried
+    connect = mock.Mock(side_effect=ValueError())
+    with raises(ValueError):
+        gate.connect(connect, start_timeout=60)
+    connect.assert_called_once()
+
+
+def test_single_flight_while_starting():
+    gate = ConnectGate("account/engine")
+    lock = Lock()
+    attempts = []
+
+    def connect() -> str:
+        with lock:
+            attempts.append(1)
+            attempt = len(attempts)
+        sleep(0.01)
+        if attempt <= 3:
+            raise EngineNotRunningError("engine")
+        return "connection"
+
+    results = run_threads(5, lambda: gate.connect(connect, start_timeout=60))
+    assert results == ["connection"] * 5
+    # 3 failed attempts of a single caller, then one connection per caller
+    assert len(attempts) == 3 + 5
+    assert gate.status == RUNNING
+
+
+def test_queued_callers_hold_off_on_failure():
+    gate = ConnectGate("account/engine")
+    started = Event()
+    release = Event()
+    error = EngineNotRunningError("engine")
+    connect_calls = []
+
+    def connect() -> str:
+        connect_calls.append(1)
+        started.set()
+        release.wait()
+        raise error
+
+    leader = Thread(target=lambda: run_threads(1, lambda: gate.connect(connect)))
+    leader.start()
+    started.wait()
+    # Release the first caller once the others are queued behind it
+    Thread(target=lambda: (sleep(0.1), release.set())).start()
+    results = run_threads(4, lambda: gate.connect(connect))
+    leader.join()
+
+    assert results == [error] * 4
+    assert len(connect_calls) == 1
+    assert gate.last_error is error
+
+
+def test_engine_target_name():
+    assert engine_target_name({"url": "http://localhost:3473"}) == (
+        "http://localhost:3473"
+    )
+    assert (
+        engine_target_name({"account_name": "account", "engine_name": "engine"})
+        == "account/engine"
+    )
+    assert engine_target_name({"account_name": "account"}) == "account/system"
+    assert get_connect_gate("account/engine") is get_connect_gate("account/engine")
+
+
+def test_create_connect_args_engine_start():
+    dialect = FireboltDialect()
+    _, kwargs = dialect.create_connect_args(
+        url.make_url(
+            "firebolt://id:secret@db/engine?account_name=account"
+            "&engine_start_timeout=300&engine_start_backoff=0.5"
+        )
+    )
+    assert kwargs["engine_start_timeout"] == 300.0
+    assert kwargs["engine_start_backoff"] == 0.5
+    assert kwargs["set_parameters"] == {}
+    with raises(ArgumentError):
+        dialect.create_connect_args(
+            url.make_url(
+                "firebolt://id:secret@db/engine?account_name=a&engine_start_timeout=x"
+            )
+        )
+    # Waiting for the engine would block the event loop
+    with raises(ArgumentError, match="engine_start_timeout"):
+        AsyncFireboltDialect().create_connect_args(
+            url.make_url(
+                "asyncio+firebolt://id:secret@db/engine?account_name=a"
+                "&engine_start_timeout=300"
+            )
+        )
+
+
+def test_connect_through_gate(stub_server: StubFireboltServer):
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&engine_start_timeout=10"
+    )
+    with engine.connect() as connection:
+        assert connection.execute(text("select 1")).scalar() == 1
+    engine.dispose()
+    assert get_connect_gate(stub_server.url).status == RUNNING
@@ -1,8 +1,15 @@
+import tracemalloc
+
 import pytest
 from conftest import MockAsyncConnection, MockAsyncCursor, MockAsyncDBApi
 from mock import AsyncMock
+from sqlalchemy import text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.util import await_only, greenlet_spawn
 
+from firebolt_db.buffers import ColumnarRows, SpilledRows
 from firebolt_db.firebolt_async_dialect import (
     AsyncAPIWrapper,
     AsyncConnectionWrapper,
@@ -14,9 +21,11 @@ from firebolt_db.firebolt_async_dialect import (
 )
 from firebolt_db.firebolt_dialect import (
     FireboltCompiler,
+    FireboltDialect,
     FireboltIdentifierPreparer,
     FireboltTypeCompiler,
 )
+from tests.stub_server import StubFireboltServer
 
 
 class TestAsyncFireboltDialect:
@@ -78,7 +87,7 @@ class TestAsyncFireboltDialect:
         assert wrapper.description == "dummy"
         assert wrapper.rowcount == -1
         async_cursor.execute.assert_awaited_once_with(
-            "INSERT INTO test(a, b) VALUES (?, ?)", [(1, "a")]
+            "INSERT INTO test(a, b) VALUES (?, ?)", [(1, "a")], False
         )
         async_cursor.fetchall.assert_awaited_once()
 
@@ -102,7 +111,7 @@ class TestAsyncFireboltDialect:
         assert wrapper.description is None
         assert wrapper.rowcount == 100
         async_cursor.execute.assert_awaited_once_with(
-            "INSERT INTO test(a, b) VALUES (?, ?)", [(1, "a")]
+            "INSERT INTO test(a, b) VALUES (?, ?)", [(1, "a")], False
         )
         async_cursor.fetchall.assert_not_awaited()
 
@@ -123,6 +132,35 @@ class TestAsyncFireboltDialect:
 
         await greenlet_spawn(test_cursor)
 
+    async def test_cursor_soft_close(
+        self,
+        async_api: AsyncMock(spec=MockAsyncDBApi),
+        async_connection: AsyncMock(spec=MockAsyncConnection),
+        async_cursor: AsyncMock(spec=MockAsyncCursor),
+    ):
+        def test_cursor() -> AsyncCursorWrapper:
+            async_connection.cursor.return_value = async_cursor
+            conn_wrapper = AsyncConnectionWrapper(async_api, async_connection)
+            wrapper = AsyncCursorWrapper(conn_wrapper)
+            wrapper.execute("SELECT * FROM test")
+            return wrapper
+
+        async_cursor.description = "dummy"
+        async_cursor.rowcount = 2
+        async_cursor.closed = False
+        async_cursor.fetchall.return_value = [[1], [2]]
+        wrapper = await greenlet_spawn(test_cursor)
+        await wrapper._async_soft_close()
+        async_cursor.aclose.assert_awaited_once()
+
+        async_cursor.description = None
+        async_cursor.rowcount = -1
+        assert wrapper.description == "dummy"
+        assert wrapper.rowcount == 2
+        assert wrapper.fetchall() == [[1], [2]]
+        wrapper.close()
+        async_cursor.close.assert_not_called()
+
     async def test_cursor_executemany(
         self,
         async_api: AsyncMock(spec=MockAsyncDBApi),
@@ -151,6 +189,7 @@ class TestAsyncFireboltDialect:
             conn_wrapper = AsyncConnectionWrapper(async_api, async_connection)
             wrapper = AsyncCursorWrapper(conn_wrapper)
             wrapper._rows = [1, 2, 3, 4, 5, 6, 7, 8]
+            async_cursor.arraysize = 1
             assert wrapper.fetchone() == 1
             assert wrapper.fetchmany() == [2]
             async_cursor.arraysize = 2
@@ -160,3 +199,129 @@ class TestAsyncFireboltDialect:
             assert wrapper.fetchall() == [7, 8]
 
         await greenlet_spawn(test_cursor)
+
+    async def test_cursor_fetchall_spilled(
+        self,
+        async_api: AsyncMock(spec=MockAsyncDBApi),
+        async_connection: AsyncMock(spec=MockAsyncConnection),
+        async_cursor: AsyncMock(spec=MockAsyncCursor),
+    ):
+        def test_cursor():
+            async_connection.cursor.return_value = async_cursor
+            wrapper = AsyncCursorWrapper(
+                AsyncConnectionWrapper(async_api, async_connection)
+            )
+            rows = SpilledRows(threshold=0, batch_rows=100)
+            for start in range(0, 5000, 100):
+                rows.extend([[i, f"{i:01000d}"] for i in range(start, start + 100)])
+            rows.finish()
+            wrapper._rows = rows
+            assert wrapper.fetchone()[0] == 0
+
+            tracemalloc.start()
+            try:
+                remaining = wrapper.fetchall()
+                count = sum(1 for _ in remaining)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            assert count == 4999
+            assert wrapper.fetchall() == []
+            # About 5 MB of rows were read back one batch of 100 KB at a time
+            assert peak < 1_000_000
+            remaining.close()
+            assert not rows.spilled
+
+        await greenlet_spawn(test_cursor)
+
+
+async def test_spill_threshold(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select \* from big_table",
+        [("id", "bigint"), ("name", "text")],
+        [[i, f"name_{i}"] for i in range(2500)],
+    )
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}&spill_threshold=100"
+    )
+    async with engine.connect() as connection:
+        result = await connection.execute(text("select * from big_table"))
+        cursor = result.cursor
+        assert isinstance(cursor._buffer, SpilledRows) and cursor._buffer.spilled
+        assert result.fetchmany(2) == [(0, "name_0"), (1, "name_1")]
+        rows = result.fetchall()
+        assert len(rows) == 2498 and rows[-1] == (2499, "name_2499")
+        # Other statements are not streamed
+        await connection.execute(text("insert into big_table values (1, 'a')"))
+    await engine.dispose()
+
+
+async def test_columnar_results(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select \* from t",
+        [("id", "bigint"), ("price", "double precision null"), ("name", "text")],
+        [[1, 1.5, "a"], [2, None, "b"]],
+    )
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}&columnar_results=true"
+    )
+    async with engine.connect() as connection:
+        result = await connection.execute(text("select * from t"))
+        assert isinstance(result.cursor._buffer, ColumnarRows)
+        assert result.fetchall() == [(1, 1.5, "a"), (2, None, "b")]
+    await engine.dispose()
+
+
+async def test_soft_close_releases_cursor(stub_server: StubFireboltServer):
+    engine = create_async_engine(f"asyncio+firebolt://firebolt?url={stub_server.url}")
+    async with engine.connect() as connection:
+        result = await connection.execute(text("select 1"))
+        assert result.cursor._cursor.closed
+        assert result.keys() == ["?column?"]
+        assert result.fetchall() == [(1,)]
+    await engine.dispose()
+
+
+def test_spill_threshold_connect_args():
+    _, kwargs = AsyncFireboltDialect().create_connect_args(
+        url.make_url("asyncio+firebolt://id:secret@db?account_name=a&spill_threshold=0")
+    )
+    assert kwargs["spill_threshold"] == 0
+    _, kwargs = AsyncFireboltDialect().create_connect_args(
+        url.make_url("asyncio+firebolt://db?url=http://core&columnar_results=false")
+    )
+    assert kwargs["columnar_results"] is False
+    assert "spill_threshold" not in kwargs["set_parameters"]
+    with pytest.raises(ArgumentError):
+        AsyncFireboltDialect().create_connect_args(
+            url.make_url(
+                "asyncio+firebolt://id:secret@db?account_name=a&spill_threshold=x"
+            )
+        )
+    with pytest.raises(ArgumentError):
+        FireboltDialect().create_connect_args(
+            url.make_url("firebolt://id:secret@db?account_name=a&spill_threshold=10")
+        )
+
+
+async def test_compressed_streaming(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select \* from big_table",
+        [("id", "bigint"), ("name", "text")],
+        [[i, f"name_{i}"] for i in range(2500)],
+    )
+    stub_server.compress_responses = True
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}"
+        "&compression=gzip&spill_threshold=100"
+    )
+    async with engine.connect() as connection:
+        sent = stub_server.bytes_sent
+        result = await connection.execute(text("select * from big_table"))
+        rows = result.fetchall()
+        sent = stub_server.bytes_sent - sent
+    await engine.dispose()
+
+    assert len(rows) == 2500 and rows[-1] == (2499, "name_2499")
+    # Streamed JSON lines of the result are about 100KB uncompressed
+    assert sent < 25_000
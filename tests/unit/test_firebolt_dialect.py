@@ -1,24 +1,55 @@
 import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from threading import Barrier
+from typing import List, Optional
 from unittest import mock
 
 import sqlalchemy
 import sqlalchemy.types as sqltypes
 from conftest import MockCursor, MockDBApi
 from firebolt.client.auth import FireboltCore
-from pytest import mark, raises
+from pytest import importorskip, mark, raises
+from sqlalchemy import (
+    Column,
+    Date,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    column,
+    create_engine,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    select,
+    table,
+)
 from sqlalchemy.engine import url
-from sqlalchemy.exc import ArgumentError
+from sqlalchemy.engine.reflection import ObjectKind
+from sqlalchemy.exc import ArgumentError, NoSuchTableError
+from sqlalchemy.schema import CreateIndex, CreateTable, DropIndex
 from sqlalchemy.sql import text
 
 import firebolt_db  # SQLAlchemy package
 from firebolt_db.firebolt_dialect import (
+    ARRAY,
     FireboltCompiler,
     FireboltDialect,
     FireboltIdentifierPreparer,
     FireboltTypeCompiler,
 )
 from firebolt_db.firebolt_dialect import dialect as dialect_definition
-from firebolt_db.firebolt_dialect import resolve_type
+from firebolt_db.firebolt_dialect import (
+    render_bytea_literal,
+    render_string_literal,
+    resolve_type,
+)
+from tests.stub_server import StubFireboltServer, encode_result
 
 
 class TestFireboltDialect:
@@ -94,7 +125,7 @@ class TestFireboltDialect:
         assert (
             "account_name" in result_dict
         ), "account_name was not parsed correctly from connection string"
-        assert dialect._set_parameters == {"param1": "1", "param2": "2"}
+        assert result_dict["set_parameters"] == {"param1": "1", "param2": "2"}
 
     def test_create_connect_args_driver_override(self, dialect: FireboltDialect):
         connection_url = (
@@ -132,12 +163,12 @@ class TestFireboltDialect:
         assert result_dict["auth"].client_id == "aabbb2bccc-kkkn3nbbb-iii4ll"
         assert result_dict["auth"].client_secret == "test_password"
         assert result_dict["auth"]._use_token_cache == expected
-        assert dialect._set_parameters == {"param1": "1", "param2": "2"}
+        assert result_dict["set_parameters"] == {"param1": "1", "param2": "2"}
 
     def test_do_execute(
         self, dialect: FireboltDialect, cursor: mock.Mock(spec=MockCursor)
     ):
-        dialect._set_parameters = {"a": "b"}
+        cursor.connection._set_parameters = {"a": "b"}
         dialect.do_execute(cursor, "SELECT *", None)
         cursor.execute.assert_called_once_with("SELECT *", parameters=None)
         assert cursor._set_parameters == {"a": "b"}, "Set parameters were not set"
@@ -147,6 +178,48 @@ class TestFireboltDialect:
         cursor.execute.assert_called_once_with("SELECT *", parameters=(1, 22))
         assert cursor._set_parameters == {"a": "b"}, "Set parameters were not set"
 
+        def set_parameter(*args, **kwargs):
+            cursor._set_parameters = {"a": "b", "c": "d"}
+
+        cursor.execute.side_effect = set_parameter
+        dialect.do_execute(cursor, "SET c = d", None)
+        # Parameters are kept on the connection, not the dialect
+        assert cursor.connection._set_parameters == {"a": "b", "c": "d"}
+        assert not hasattr(dialect, "_set_parameters")
+
+    def test_do_execute_compiled_skips_parsing(
+        self, dialect: FireboltDialect, cursor: mock.Mock(spec=MockCursor)
+    ):
+        context = mock.Mock(compiled=mock.Mock(statement=select(literal_column("1"))))
+        dialect.do_execute(cursor, "SELECT 1", (), context)
+        cursor.execute.assert_called_once_with("SELECT 1", skip_parsing=True)
+        cursor.execute.reset_mock()
+        # Textual statements may contain SET or multiple statements
+        context = mock.Mock(compiled=mock.Mock(statement=text("SET a = b")))
+        dialect.do_execute(cursor, "SET a = b", (), context)
+        cursor.execute.assert_called_once_with("SET a = b", parameters=())
+
+    def test_literal_binds(self):
+        dialect = FireboltDialect(render_literal_binds=True)
+        table = Table("t", MetaData(), Column("id", Integer), Column("name", String))
+        compiled = (
+            select(table.c.id)
+            .where(table.c.id.in_([1, 2, 3]))
+            .where(table.c.name == "it's")
+            .compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        )
+        assert str(compiled) == (
+            "SELECT t.id \nFROM t \n" """WHERE t.id IN (1, 2, 3) AND t.name = 'it''s'"""
+        )
+        # DML keeps bound parameters, so executemany keeps working
+        compiled = insert(table).values(id=1).compile(dialect=dialect)
+        assert str(compiled) == "INSERT INTO t (id) VALUES (:id)"
+
+    def test_literal_binds_disabled(self, dialect: FireboltDialect):
+        table = Table("t", MetaData(), Column("id", Integer))
+        compiled = select(table.c.id).where(table.c.id == 1).compile(dialect=dialect)
+        assert str(compiled).endswith("WHERE t.id = :id_1")
+
     def test_schema_names(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
@@ -177,51 +250,84 @@ class TestFireboltDialect:
         assert str(connection.execute.call_args[0][0].compile()) == str(
             text(
                 "select table_name from information_schema.tables"
-                " where table_schema = 'schema'"
+                " where table_schema = :schema"
             ).compile()
         )
+        assert connection.execute.call_args[0][1] == {"schema": "schema"}
 
     def test_view_names(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
-        assert dialect.get_view_names(connection) == []
+        connection.execute.return_value = [
+            mock.Mock(table_name="view1", view_definition="select 1"),
+            mock.Mock(table_name="view2", view_definition="select 2"),
+        ]
+        assert dialect.get_view_names(connection) == ["view1", "view2"]
+        assert str(connection.execute.call_args[0][0]) == (
+            "select table_name, view_definition from information_schema.views"
+        )
+        assert dialect.get_view_names(connection, schema="public") == [
+            "view1",
+            "view2",
+        ]
+        assert connection.execute.call_args[0][1] == {"schema": "public"}
+
+    def test_view_definition(
+        self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
+    ):
+        connection.execute.return_value = [
+            mock.Mock(table_name="view1", view_definition="select 1"),
+        ]
+        assert dialect.get_view_definition(connection, "view1") == "select 1"
+        with raises(NoSuchTableError):
+            dialect.get_view_definition(connection, "dummy")
 
     def test_table_options(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
+        connection.execute.return_value = []
         assert dialect.get_table_options(connection, "table") == {}
 
+        connection.execute.return_value = [
+            mock.Mock(
+                table_name="table",
+                index_name="pi",
+                index_type="primary",
+                index_definition='[a, "B"]',
+            )
+        ]
+        assert dialect.get_table_options(connection, "table", schema="public") == {
+            "firebolt_primary_index": ["a", "B"]
+        }
+        assert connection.execute.call_args[0][1] == {
+            "table_names": ["table"],
+            "schema": "public",
+        }
+
     def test_columns(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
-        def multi_column_row(columns):
-            def getitem(self, idx):
-                for i, result in enumerate(columns):
-                    if idx == i:
-                        return result
-
-            return mock.Mock(__getitem__=getitem)
-
         connection.execute.return_value = [
-            multi_column_row(["name1", "INT", 1]),
-            multi_column_row(["name2", "date", 0]),
+            mock.Mock(column_name="name1", data_type="INT", is_nullable=1),
+            mock.Mock(column_name="name2", data_type="date", is_nullable=0),
         ]
 
-        expected_query = """
-            select column_name,
-                   data_type,
-                   is_nullable
-              from information_schema.columns
-             where table_name = 'table'
-        """
-
-        expected_query_schema = expected_query + " and table_schema = 'schema'"
+        expected_query = (
+            "select table_name, column_name, data_type, is_nullable"
+            " from information_schema.columns"
+            " where {}table_name in (__[POSTCOMPILE_table_names])"
+        )
 
-        for call, expected_query in (
-            (lambda: dialect.get_columns(connection, "table"), expected_query),
+        for call, expected_query, expected_parameters in (
+            (
+                lambda: dialect.get_columns(connection, "table"),
+                expected_query.format(""),
+                {"table_names": ["table"]},
+            ),
             (
                 lambda: dialect.get_columns(connection, "table", "schema"),
-                expected_query_schema,
+                expected_query.format("table_schema = :schema and "),
+                {"table_names": ["table"], "schema": "schema"},
             ),
         ):
             assert call() == [
@@ -239,9 +345,9 @@ class TestFireboltDialect:
                 },
             ]
             connection.execute.assert_called_once()
-            assert str(connection.execute.call_args[0][0].compile()) == str(
-                text(expected_query).compile()
-            )
+            statement, parameters = connection.execute.call_args[0]
+            assert str(statement.compile()) == expected_query
+            assert parameters == expected_parameters
             connection.execute.reset_mock()
 
     def test_has_table(
@@ -249,12 +355,32 @@ class TestFireboltDialect:
     ):
         connection.execute.return_value.fetchone.return_value.exists_ = True
         assert dialect.has_table(connection, "dummy")
-        assert "dummy" in str(connection.execute.call_args[0][0].compile())
+        assert "dummy" not in str(connection.execute.call_args[0][0].compile())
+        assert connection.execute.call_args[0][1] == {"table_name": "dummy"}
+        assert dialect.has_table(connection, "dummy", schema="public")
+        assert connection.execute.call_args[0][1] == {
+            "table_name": "dummy",
+            "schema": "public",
+        }
+
+    def test_reflection_statement_cache(self, stub_server: StubFireboltServer):
+        stub_server.add_result(
+            r".*from information_schema\.tables.*",
+            [("exists_", "boolean")],
+            [[True]],
+        )
+        engine = create_engine(f"firebolt://firebolt?url={stub_server.url}")
+        with engine.connect() as connection:
+            for table_name in ("first", "second"):
+                assert engine.dialect.has_table(connection, table_name)
+            # Both calls share a single compiled statement
+            assert len(engine._compiled_cache) == 1
+        engine.dispose()
+        assert "'second'" in stub_server.queries[-1]
 
     def test_noop(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
-        dialect.get_view_definition(connection, "dummy")
         dialect.do_rollback(connection)
         dialect.do_commit(connection)
         connection.assert_not_called()
@@ -286,7 +412,34 @@ class TestFireboltDialect:
     def test_indexes(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
     ):
-        assert dialect.get_indexes(connection, "table") == []
+        def index_row(name, index_type, definition):
+            return mock.Mock(
+                table_name="table",
+                index_name=name,
+                index_type=index_type,
+                index_definition=definition,
+            )
+
+        connection.execute.return_value = [
+            index_row("pi", "primary", "[a]"),
+            index_row("agg", "aggregating", '[a, "B", sum(c), count(distinct d, e)]'),
+            index_row("agg2", "aggregating", "(a)"),
+        ]
+        assert dialect.get_indexes(connection, "table") == [
+            {
+                "name": "agg",
+                "column_names": ["a", "B", None, None],
+                "expressions": ["a", '"B"', "sum(c)", "count(distinct d, e)"],
+                "unique": False,
+                "dialect_options": {"firebolt_aggregating": True},
+            },
+            {
+                "name": "agg2",
+                "column_names": ["a"],
+                "unique": False,
+                "dialect_options": {"firebolt_aggregating": True},
+            },
+        ]
 
     def test_unique_constraints(
         self, dialect: FireboltDialect, connection: mock.Mock(spec=MockDBApi)
@@ -426,3 +579,417 @@ def test_resolve_array_type(
     resolved_type = resolve_type(firebolt_type.lower())
     assert type(resolved_type.item_type) == item_type
     assert resolved_type.dimensions == dimensions
+
+
+@mark.parametrize(
+    "module", ["firebolt_db.firebolt_dialect", "firebolt_db.firebolt_async_dialect"]
+)
+def test_dialect_import_is_lazy(module: str):
+    # Run in a fresh interpreter since the SDK is already loaded in this one
+    loaded = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(' '.join(sys.modules))",
+        ],
+        text=True,
+    ).split()
+    assert not [
+        name for name in loaded if name.startswith(("firebolt.", "trio", "httpx"))
+    ]
+
+
+@mark.parametrize(
+    ["identifier", "quoted"],
+    [
+        ("price", "price"),
+        ("order_id", "order_id"),
+        ("order", '"order"'),
+        ("Date", '"Date"'),
+        ("date", '"date"'),
+        ("values", '"values"'),
+        ("camelCase", '"camelCase"'),
+        ("with space", '"with space"'),
+        ("1st", '"1st"'),
+        ('quo"te', '"quo""te"'),
+    ],
+)
+def test_identifier_quoting(dialect: FireboltDialect, identifier: str, quoted: str):
+    assert dialect.identifier_preparer.quote(identifier) == quoted
+
+
+@mark.parametrize(
+    ["value", "literal"],
+    [
+        ("text", "'text'"),
+        ("it's", "'it''s'"),
+        ("back\\slash", "E'back\\\\slash'"),
+        ("it's \\ \0", "E'it\\'s \\\\ \\0'"),
+    ],
+)
+def test_render_string_literal(value: str, literal: str):
+    assert render_string_literal(value) == literal
+
+
+def test_render_bytea_literal():
+    assert render_bytea_literal(b"\x00ab") == "'\\x006162'::BYTEA"
+
+
+def test_literal_binds_execution(stub_server: StubFireboltServer):
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}", render_literal_binds=True
+    )
+    table = Table("t", MetaData(), Column("id", Integer), Column("data", String))
+    with engine.connect() as connection:
+        connection.execute(
+            select(table.c.id).where(
+                table.c.id.in_(range(1000)), table.c.data == "a\\b"
+            )
+        )
+    engine.dispose()
+    assert stub_server.queries[-1] == (
+        "SELECT t.id \nFROM t \n"
+        f'WHERE t.id IN ({", ".join(map(str, range(1000)))})'
+        """ AND t.data = E'a\\\\b'"""
+    )
+
+
+def test_array_type_adaptation(dialect: FireboltDialect):
+    impl = sqlalchemy.ARRAY(sqltypes.INTEGER, dimensions=2).dialect_impl(dialect)
+    assert isinstance(impl, ARRAY)
+    assert impl.dimensions == 2
+    assert isinstance(resolve_type("array(int null)"), ARRAY)
+
+
+@mark.parametrize(
+    ["array_type", "expected"],
+    [
+        (ARRAY(sqltypes.INTEGER), "ARRAY(INTEGER)"),
+        (ARRAY(sqltypes.TEXT, dimensions=2), "ARRAY(ARRAY(TEXT))"),
+    ],
+)
+def test_array_ddl(dialect: FireboltDialect, array_type: ARRAY, expected: str):
+    assert dialect.type_compiler_instance.process(array_type) == expected
+
+
+@mark.parametrize(
+    ["array_type", "value", "literal"],
+    [
+        (ARRAY(sqltypes.INTEGER), [1, None, 3], "[1, null, 3]"),
+        (ARRAY(sqltypes.REAL, dimensions=2), [[1.5], [2.0]], "[[1.5], [2.0]]"),
+        (ARRAY(sqltypes.BOOLEAN), [True, False], "[true, false]"),
+        (ARRAY(sqltypes.TEXT), ["a", "it's", None], "['a', 'it''s', NULL]"),
+        (
+            ARRAY(sqltypes.TEXT, dimensions=2),
+            [["a\\b"], []],
+            "[[E'a\\\\b'], []]",
+        ),
+        (ARRAY(sqltypes.DATE), [date(2024, 1, 2)], "['2024-01-02']"),
+    ],
+)
+def test_array_literal(
+    dialect: FireboltDialect, array_type: ARRAY, value: list, literal: str
+):
+    assert array_type.literal_processor(dialect)(value) == literal
+
+
+def test_array_numpy(dialect: FireboltDialect):
+    numpy = importorskip("numpy")
+    array_type = ARRAY(sqltypes.INTEGER, dimensions=2)
+    value = numpy.arange(4).reshape(2, 2)
+    assert array_type.literal_processor(dialect)(value) == "[[0, 1], [2, 3]]"
+    assert array_type.bind_processor(dialect)(value) == [[0, 1], [2, 3]]
+    result_processor = ARRAY(sqltypes.INTEGER, as_numpy=True).result_processor(
+        dialect, None
+    )
+    assert result_processor([1, 2]).tolist() == [1, 2]
+    assert result_processor(None) is None
+
+
+def test_array_result_processing(dialect: FireboltDialect):
+    # Nothing to convert for plain item types, so no per-row work is done
+    assert ARRAY(sqltypes.INTEGER).result_processor(dialect, None) is None
+    result_processor = ARRAY(sqltypes.INTEGER, as_tuple=True).result_processor(
+        dialect, None
+    )
+    assert result_processor([[1], None, [2, 3]]) == ((1,), None, (2, 3))
+
+
+def test_array_execution(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r'select .*from "?arrays"?.*',
+        [("values", "array(array(int null) null)")],
+        [[[[1, 2], [3, None]]]],
+    )
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}", render_literal_binds=True
+    )
+    values = column("values", ARRAY(sqltypes.INTEGER, dimensions=2))
+    statement = (
+        select(values).select_from(table("arrays")).where(values == [[1, 2], [3, None]])
+    )
+    with engine.connect() as connection:
+        assert connection.execute(statement).fetchall() == [([[1, 2], [3, None]],)]
+    engine.dispose()
+    assert stub_server.queries[-1].endswith('WHERE "values" = [[1, 2], [3, null]]')
+
+
+def test_create_table_primary_index(dialect: FireboltDialect):
+    metadata = MetaData()
+    events = Table(
+        "events",
+        metadata,
+        Column("id", Integer),
+        Column("Day", Date),
+        firebolt_primary_index=["id", "Day"],
+        firebolt_partition_by='EXTRACT(YEAR FROM "Day")',
+    )
+    assert str(CreateTable(events).compile(dialect=dialect)).endswith(
+        ')\nPRIMARY INDEX id, "Day"\nPARTITION BY EXTRACT(YEAR FROM "Day")\n\n'
+    )
+
+    events = Table(
+        "events2",
+        metadata,
+        Column("id", Integer),
+        Column("day", Date),
+        firebolt_primary_index=events.c.id,
+        firebolt_partition_by=func.extract("month", Column("day")),
+    )
+    assert str(CreateTable(events).compile(dialect=dialect)).endswith(
+        ")\nPRIMARY INDEX id\nPARTITION BY EXTRACT(month FROM day)\n\n"
+    )
+
+
+def test_create_table_without_options(dialect: FireboltDialect):
+    events = Table("events", MetaData(), Column("id", Integer))
+    assert str(CreateTable(events).compile(dialect=dialect)).endswith(
+        "id INTEGER\n)\n\n"
+    )
+    with raises(ArgumentError):
+        Table("events", MetaData(), Column("id", Integer), firebolt_unknown=1)
+
+
+def test_aggregating_index_ddl(dialect: FireboltDialect):
+    sales = Table("sales", MetaData(), Column("id", Integer), Column("amount", Integer))
+    index = Index(
+        "sales_agg",
+        sales.c.id,
+        func.sum(sales.c.amount),
+        firebolt_aggregating=True,
+    )
+    assert (
+        str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+        == "CREATE AGGREGATING INDEX IF NOT EXISTS sales_agg ON sales "
+        "(id, sum(amount))"
+    )
+    assert (
+        str(DropIndex(index).compile(dialect=dialect))
+        == "DROP AGGREGATING INDEX sales_agg"
+    )
+
+
+def test_index_reflection(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select table_name from information_schema\.tables.*",
+        [("table_name", "text")],
+        [["sales"]],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.columns.*",
+        [
+            ("table_name", "text"),
+            ("column_name", "text"),
+            ("data_type", "text"),
+            ("is_nullable", "int"),
+        ],
+        [
+            ["sales", "id", "int", 0],
+            ["sales", "Day", "date", 0],
+            ["sales", "amount", "int", 0],
+        ],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.indexes.*",
+        [
+            ("table_name", "text"),
+            ("index_name", "text"),
+            ("index_type", "text"),
+            ("index_definition", "text"),
+        ],
+        [
+            ["sales", "sales_pi", "primary", '[id, "Day"]'],
+            ["sales", "sales_agg", "aggregating", "[id, sum(amount)]"],
+        ],
+    )
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}")
+    sales = Table("sales", MetaData(), autoload_with=engine)
+    inspector = inspect(engine)
+    inspector.get_indexes("sales")
+    inspector.get_table_options("sales")
+    engine.dispose()
+
+    assert sales.dialect_options["firebolt"]["primary_index"] == ["id", "Day"]
+    # The reflected table is created again as it was
+    assert 'PRIMARY INDEX id, "Day"\n' in str(
+        CreateTable(sales).compile(dialect=engine.dialect)
+    )
+    (index,) = sales.indexes
+    assert index.name == "sales_agg"
+    assert index.dialect_options["firebolt"]["aggregating"] is True
+    assert str(CreateIndex(index).compile(dialect=engine.dialect)) == (
+        "CREATE AGGREGATING INDEX sales_agg ON sales (id, sum(amount))"
+    )
+    # Indexes and options are read with a single query per inspector
+    assert (
+        sum("information_schema.indexes" in query for query in stub_server.queries) == 2
+    )
+
+
+def test_multi_reflection_of_no_tables(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select table_name from information_schema\.tables.*",
+        [("table_name", "text")],
+        [["sales"]],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.views.*",
+        [("table_name", "text"), ("view_definition", "text")],
+        [],
+    )
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}")
+    inspector = inspect(engine)
+    assert inspector.get_multi_columns(filter_names=["missing"]) == {}
+    assert inspector.get_multi_indexes(filter_names=["missing"]) == {}
+    assert inspector.get_multi_table_options(filter_names=["missing"]) == {}
+    engine.dispose()
+
+    # No table matches, so no metadata is queried with an empty list of names
+    assert not any(
+        "information_schema.columns" in query or "information_schema.indexes" in query
+        for query in stub_server.queries
+    )
+
+
+def test_view_reflection(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"select table_name from information_schema\.tables.*",
+        [("table_name", "text")],
+        [["sales"], ["sales_view"]],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.views.*",
+        [("table_name", "text"), ("view_definition", "text")],
+        [["sales_view", "select id from sales"]],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.columns.*",
+        [
+            ("table_name", "text"),
+            ("column_name", "text"),
+            ("data_type", "text"),
+            ("is_nullable", "int"),
+        ],
+        [["sales", "id", "int", 0], ["sales_view", "id", "int", 0]],
+    )
+    stub_server.add_result(
+        r".*from information_schema\.indexes.*",
+        [
+            ("table_name", "text"),
+            ("index_name", "text"),
+            ("index_type", "text"),
+            ("index_definition", "text"),
+        ],
+        [],
+    )
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}")
+    metadata = MetaData()
+    metadata.reflect(engine, views=True)
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        assert inspector.get_view_names() == ["sales_view"]
+        assert inspector.get_view_definition("sales_view") == "select id from sales"
+        assert list(inspector.get_multi_columns(kind=ObjectKind.VIEW)) == [
+            (None, "sales_view")
+        ]
+    engine.dispose()
+
+    assert sorted(metadata.tables) == ["sales", "sales_view"]
+    reflection_queries = [
+        query for query in stub_server.queries if "information_schema" in query
+    ]
+    # Reflecting the whole database takes one query per kind of metadata,
+    # the second inspector lists views once and reads their columns at once
+    assert len(reflection_queries) == 6
+
+
+def test_concurrent_set_parameters(stub_server: StubFireboltServer):
+    threads_count, queries_count = 8, 20
+    stub_server.record_queries = False
+    # Echo the query label the statement was sent with
+    stub_server.add_handler(
+        r"select label",
+        lambda query, params: encode_result(
+            [("label", "text")], [[params.get("query_label")]]
+        ),
+    )
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}",
+        pool_size=threads_count,
+        max_overflow=0,
+    )
+    barrier = Barrier(threads_count)
+
+    def run(thread: int) -> List[str]:
+        with engine.connect() as connection:
+            connection.execute(text(f"SET query_label = 'thread_{thread}'"))
+            barrier.wait()
+            return [
+                connection.execute(text("select label")).scalar()
+                for _ in range(queries_count)
+            ]
+
+    with ThreadPoolExecutor(threads_count) as executor:
+        labels = list(executor.map(run, range(threads_count)))
+    engine.dispose()
+
+    assert labels == [
+        [f"thread_{thread}"] * queries_count for thread in range(threads_count)
+    ]
+
+
+def test_create_connect_args_compression(dialect: FireboltDialect):
+    base = "firebolt://firebolt?url=http://localhost:3473"
+    _, kwargs = dialect.create_connect_args(url.make_url(f"{base}&compression=GZIP"))
+    assert kwargs["compression"] == "gzip"
+    assert kwargs["set_parameters"] == {}
+    _, kwargs = dialect.create_connect_args(url.make_url(f"{base}&compression=none"))
+    assert kwargs["compression"] == "identity"
+    with raises(ArgumentError):
+        dialect.create_connect_args(url.make_url(f"{base}&compression=brotli"))
+    with mock.patch("firebolt_db.firebolt_dialect.find_spec", return_value=None):
+        with raises(ArgumentError, match="zstandard"):
+            dialect.create_connect_args(url.make_url(f"{base}&compression=zstd"))
+
+
+@mark.parametrize(
+    ["compression", "compressed"], [(None, True), ("gzip", True), ("none", False)]
+)
+def test_compressed_responses(
+    stub_server: StubFireboltServer, compression: Optional[str], compressed: bool
+):
+    rows = [[i, f"name_{i}"] for i in range(1000)]
+    stub_server.add_result(r"select \* from t", [("id", "int"), ("name", "text")], rows)
+    stub_server.compress_responses = True
+    # The HTTP client accepts compressed responses by default
+    options = f"&compression={compression}" if compression else ""
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}{options}")
+    with engine.connect() as connection:
+        sent = stub_server.bytes_sent
+        result = connection.execute(text("select * from t")).fetchall()
+        sent = stub_server.bytes_sent - sent
+    engine.dispose()
+
+    assert result == [tuple(row) for row in rows]
+    body_size = len(encode_result([("id", "int"), ("name", "text")], rows))
+    assert (sent < body_size / 4) is compressed
@@ -0,0 +1,186 @@
+import re
+from datetime import date
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, List
+
+from pytest import fixture, importorskip, mark, raises
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    select,
+    text,
+)
+from sqlalchemy.exc import OperationalError
+
+from firebolt_db import read_frame, write_frame
+from tests.stub_server import (
+    StubFireboltServer,
+    encode_result,
+    structured_error,
+)
+
+pandas = importorskip("pandas")
+
+COLUMNS = [
+    ("id", "bigint"),
+    ("count", "int null"),
+    ("price", "double precision null"),
+    ("amount", "numeric(10, 2)"),
+    ("active", "boolean"),
+    ("day", "date null"),
+    ("created", "timestamp"),
+    ("name", "text"),
+    ("tags", "array(text)"),
+    ("data", "bytea"),
+    ("scores", "array(double precision null)"),
+    ("costs", "array(array(numeric(10, 2)))"),
+]
+ROWS = [
+    [
+        1,
+        10,
+        1.5,
+        1.25,
+        True,
+        "2024-01-01",
+        "2024-01-01 12:30:00.5",
+        "a",
+        ["x"],
+        "\\x61",
+        [1.5, 2.0, None],
+        [[1.25], []],
+    ],
+    [2, None, None, 3, False, None, "2024-01-02 00:00:00", "b", [], "\\x", [], []],
+]
+
+
+def test_read_frame(stub_server: StubFireboltServer):
+    stub_server.add_result(r"select \* from t.*", COLUMNS, ROWS)
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}")
+    frame = read_frame(engine, "select * from t where id > :id", {"id": 0})
+    engine.dispose()
+
+    assert stub_server.queries[-1] == "select * from t where id > 0"
+    assert list(frame.columns) == [name for name, _ in COLUMNS]
+    assert str(frame["id"].dtype) == "int64"
+    assert str(frame["count"].dtype) == "Int64"
+    assert frame["count"].isna().tolist() == [False, True]
+    assert str(frame["price"].dtype) == "float64"
+    assert frame["price"][0] == 1.5
+    assert frame["amount"].tolist() == [Decimal("1.25"), Decimal(3)]
+    assert frame["active"].tolist() == [True, False]
+    assert frame["day"][0] == pandas.Timestamp(date(2024, 1, 1))
+    assert frame["day"].isna().tolist() == [False, True]
+    assert frame["created"][0] == pandas.Timestamp("2024-01-01 12:30:00.5")
+    assert frame["name"].tolist() == ["a", "b"]
+    assert frame["tags"].tolist() == [["x"], []]
+    assert frame["data"].tolist() == [b"a", b""]
+    # As the SDK returns them, not as text
+    assert frame["scores"].tolist() == [[1.5, 2.0, None], []]
+    assert type(frame["scores"][0][1]) is float
+    assert frame["costs"].tolist() == [[[Decimal("1.25")], []], []]
+
+
+def test_read_frame_statement(stub_server: StubFireboltServer):
+    def echo_label(statement: str, params: Dict[str, str]) -> bytes:
+        return encode_result([("id", "int")], [[int(params["query_label"])]])
+
+    stub_server.add_handler(r"SELECT t.id.*", echo_label)
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}&query_label=7")
+    table = Table("t", MetaData(), Column("id", Integer))
+    with engine.connect() as connection:
+        frame = read_frame(connection, select(table).where(table.c.id.in_([1, 2])))
+        assert frame["id"].tolist() == [7]
+        empty = read_frame(connection, text("insert into t values (1)"))
+        assert empty.empty
+    engine.dispose()
+    assert stub_server.queries[0] == "SELECT t.id \nFROM t \nWHERE t.id IN (1, 2)"
+
+
+@fixture
+def missing_table(stub_server: StubFireboltServer) -> StubFireboltServer:
+    stub_server.add_result(
+        r"select count\(\*\) > 0 as exists_\s.*", [("exists_", "boolean")], [[False]]
+    )
+    stub_server.add_result(
+        r"select table_name from information_schema\.tables.*",
+        [("table_name", "text")],
+        [],
+    )
+    return stub_server
+
+
+def inserted_ids(queries: List[str]) -> List[int]:
+    return sorted(
+        int(row_id)
+        for query in queries
+        if query.startswith("INSERT")
+        for row_id in re.findall(r"[(] ?(\d+)[,)]", query.split("VALUES")[1])
+    )
+
+
+@mark.parametrize("processes", [0, 2])
+def test_write_frame(missing_table: StubFireboltServer, processes: int):
+    frame = pandas.DataFrame(
+        {
+            "id": range(25),
+            "price": [i / 2 if i % 5 else None for i in range(25)],
+            "name": [f"name_{i}" for i in range(25)],
+            "created": pandas.date_range("2024-01-01", periods=25, freq="h"),
+        }
+    )
+    engine = create_engine(f"firebolt://firebolt?url={missing_table.url}")
+    inserted = write_frame(
+        engine, frame, "t", chunk_size=10, workers=2, processes=processes
+    )
+    engine.dispose()
+
+    assert inserted == 25
+    assert any(query.startswith("CREATE TABLE t") for query in missing_table.queries)
+    inserts = [query for query in missing_table.queries if query.startswith("INSERT")]
+    assert len(inserts) == 3
+    assert inserted_ids(inserts) == list(range(25))
+    assert "(1, 0.5, 'name_1', '2024-01-01 01:00:00')" in "".join(inserts)
+    assert "(0, NULL, 'name_0'" in "".join(inserts)
+
+
+def test_write_frame_retries_chunks(missing_table: StubFireboltServer):
+    lock = Lock()
+    attempts: List[str] = []
+
+    def fail_once(statement: str, params: Dict[str, str]) -> bytes:
+        with lock:
+            attempts.append(statement)
+            if attempts.count(statement) == 1 and "VALUES (10)" in statement:
+                raise structured_error(503, "Engine is scaling")
+        return b""
+
+    missing_table.add_handler(r"INSERT INTO t .*", fail_once)
+    engine = create_engine(f"firebolt://firebolt?url={missing_table.url}")
+    frame = pandas.DataFrame({"id": range(30)})
+    assert write_frame(engine, frame, "t", chunk_size=10, processes=0, backoff=0) == 30
+    assert len(attempts) == 4
+    assert inserted_ids(attempts) == sorted(list(range(30)) + list(range(10, 20)))
+
+    def fail(statement: str, params: Dict[str, str]) -> bytes:
+        attempts.append(statement)
+        raise RuntimeError("Engine is scaling")
+
+    missing_table.add_handler(r"INSERT INTO t .*", fail)
+    attempts.clear()
+    with raises(OperationalError):
+        write_frame(
+            engine,
+            pandas.DataFrame({"id": range(10, 20)}),
+            "t",
+            if_exists="append",
+            processes=0,
+            backoff=0,
+        )
+    engine.dispose()
+    # Errors of the statement itself aren't retried
+    assert len(attempts) == 1
@@ -0,0 +1,85 @@
+from asyncio import gather, sleep
+from typing import Dict
+
+from pytest import raises
+from sqlalchemy import Column, Integer, MetaData, String, Table, select, text
+from sqlalchemy.exc import ArgumentError
+
+from firebolt_db.firebolt_dialect import ARRAY
+from firebolt_db.native_async import NativeAsyncEngine
+from tests.stub_server import StubFireboltServer, encode_result
+
+table = Table(
+    "t",
+    MetaData(),
+    Column("id", Integer),
+    Column("name", String),
+    Column("tags", ARRAY(String, as_tuple=True)),
+)
+
+
+async def test_execute(stub_server: StubFireboltServer):
+    stub_server.add_result(
+        r"SELECT .*FROM t\s+WHERE .*",
+        [("id", "int"), ("name", "text"), ("tags", "array(text)")],
+        [[1, "one", ["a", "b"]]],
+    )
+    engine = NativeAsyncEngine(f"firebolt://firebolt?url={stub_server.url}")
+    statement = select(table).where(table.c.id.in_([1, 2])).where(table.c.name == "o")
+    async with engine.connect() as connection:
+        result = await connection.execute(statement)
+        assert result.keys() == ["id", "name", "tags"]
+        # Result processors of the column types are applied
+        assert result.all() == [(1, "one", ("a", "b"))]
+
+        result = await connection.execute(text("select 1"))
+        assert result.scalar() == 1
+        result = await connection.execute("insert into t values (?, ?)", [2, "two"])
+        assert len(result) == 0 and result.first() is None
+    await engine.dispose()
+
+    assert stub_server.queries == [
+        "SELECT t.id, t.name, t.tags \nFROM t \n"
+        "WHERE t.id IN (1, 2) AND t.name = 'o'",
+        "select 1",
+        "insert into t values (2, 'two')",
+    ]
+
+
+async def test_set_parameters(stub_server: StubFireboltServer):
+    def echo_label(statement: str, params: Dict[str, str]) -> bytes:
+        return encode_result([("label", "text")], [[params.get("query_label")]])
+
+    stub_server.add_handler(r"select label", echo_label)
+    engine = NativeAsyncEngine(
+        f"firebolt://firebolt?url={stub_server.url}&query_label=default",
+        pool_size=1,
+    )
+    assert (await engine.execute("select label")).scalar() == "default"
+    await engine.execute("SET query_label = changed")
+    # The pooled connection keeps its SET parameters
+    assert (await engine.execute("select label")).scalar() == "changed"
+    await engine.dispose()
+
+
+async def test_pool_size(stub_server: StubFireboltServer):
+    engine = NativeAsyncEngine(f"firebolt://firebolt?url={stub_server.url}", 2)
+    in_use = []
+
+    async def borrow() -> None:
+        async with engine.connect() as connection:
+            in_use.append(connection)
+            assert len(in_use) <= 2
+            await sleep(0.01)
+            in_use.remove(connection)
+
+    await gather(*(borrow() for _ in range(5)))
+    assert len(engine._idle) == 2
+    await engine.dispose()
+    assert engine._idle == []
+
+
+def test_unsupported_options():
+    for query in ("read_engines=r1", "engine_start_timeout=10", "spill_threshold=1"):
+        with raises(ArgumentError):
+            NativeAsyncEngine(f"firebolt://firebolt?url=http://core&{query}")
@@ -0,0 +1,257 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from time import sleep
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from firebolt.utils.exception import OperationalError
+from httpx import HTTPStatusError, Request, Response
+from pytest import mark, raises
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.overload import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    EngineGuard,
+    get_engine_guard,
+    pop_engine_guard_options,
+)
+from tests.stub_server import (
+    StubFireboltServer,
+    StubHTTPError,
+    encode_result,
+    structured_error,
+)
+
+
+def unavailable() -> Any:
+    request = Request("POST", "http://localhost")
+    raise HTTPStatusError("error", request=request, response=Response(503))
+
+
+def test_limiter_aimd():
+    limiter = AdaptiveLimiter(8, min_limit=2, latency_target=1.0)
+    limiter.acquire(0)
+    limiter.release(overloaded=True, elapsed=0.1)
+    assert limiter.limit == 4
+    limiter.acquire(0)
+    # Slower than the latency target
+    limiter.release(overloaded=False, elapsed=2.0)
+    limiter.acquire(0)
+    limiter.release(overloaded=True, elapsed=0.1)
+    assert limiter.limit == 2
+    for _ in range(3):
+        limiter.acquire(0)
+        limiter.release(overloaded=False, elapsed=0.1)
+    assert 3 < limiter.limit < 4
+
+
+def test_limiter_waits_for_slot():
+    limiter = AdaptiveLimiter(1)
+    limiter.acquire(0)
+    with raises(OperationalError):
+        limiter.acquire(0.01)
+    assert limiter.metrics()["rejected"] == 1
+
+    acquired = Event()
+    with ThreadPoolExecutor(1) as executor:
+        waiter = executor.submit(lambda: (limiter.acquire(5), acquired.set()))
+        while not limiter.metrics()["waiting"]:
+            sleep(0.001)
+        assert not acquired.is_set()
+        limiter.release(overloaded=False, elapsed=0.1)
+        waiter.result()
+    assert limiter.metrics() == {
+        "limit": 1,
+        "in_flight": 1,
+        "waiting": 0,
+        "rejected": 1,
+    }
+
+
+async def test_limiter_async():
+    limiter = AdaptiveLimiter(1)
+    await limiter.aacquire(0)
+    with raises(OperationalError):
+        await limiter.aacquire(0.01)
+    waiter = asyncio.ensure_future(limiter.aacquire(5))
+    await asyncio.sleep(0)
+    assert limiter.metrics()["waiting"] == 1
+    limiter.release(overloaded=False, elapsed=0.1)
+    await waiter
+    assert limiter.metrics()["in_flight"] == 1
+
+
+async def test_limiter_cancelled_waiter():
+    limiter = AdaptiveLimiter(1)
+    await limiter.aacquire(0)
+    cancelled = asyncio.ensure_future(limiter.aacquire(5))
+    waiter = asyncio.ensure_future(limiter.aacquire(5))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with raises(asyncio.CancelledError):
+        await cancelled
+    assert limiter.metrics()["waiting"] == 1
+    # The slot goes to the waiter still there
+    limiter.release(overloaded=False, elapsed=0.1)
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.metrics()["in_flight"] == 1
+    assert limiter.metrics()["rejected"] == 0
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(0.5, reset_timeout=30, window=4, min_calls=4)
+    with mock.patch("firebolt_db.overload.monotonic", return_value=100.0):
+        for failed in (False, True, False, True):
+            breaker.allow()
+            breaker.record(failed)
+        assert breaker.state == OPEN
+        with raises(OperationalError):
+            breaker.allow()
+    with mock.patch("firebolt_db.overload.monotonic", return_value=130.0):
+        # A single trial once the reset timeout passed
+        breaker.allow()
+        assert breaker.state == HALF_OPEN
+        with raises(OperationalError):
+            breaker.allow()
+        breaker.record(True)
+        assert breaker.state == OPEN
+    with mock.patch("firebolt_db.overload.monotonic", return_value=160.0):
+        breaker.allow()
+        breaker.record(False)
+        assert breaker.state == CLOSED
+    assert breaker.metrics() == {"state": CLOSED, "opened": 2, "rejected": 2}
+
+
+def test_engine_guard():
+    guard = EngineGuard(AdaptiveLimiter(4), CircuitBreaker(0.5, min_calls=4))
+    assert guard.call(lambda: 1) == 1
+    # Errors of statements don't count as overload
+    with raises(ZeroDivisionError):
+        guard.call(lambda: 1 / 0)
+    for _ in range(2):
+        with raises(HTTPStatusError):
+            guard.call(unavailable)
+    with raises(OperationalError, match="circuit breaker"):
+        guard.call(lambda: 1)
+    assert guard.metrics()["limiter"]["limit"] == 1
+    assert guard.metrics()["limiter"]["in_flight"] == 0
+
+
+def test_pop_engine_guard_options():
+    parameters = {"concurrency_limit": "8", "circuit_breaker": "0.5", "a": "b"}
+    assert pop_engine_guard_options(parameters) == {
+        "concurrency_limit": 8,
+        "circuit_breaker": 0.5,
+    }
+    assert parameters == {"a": "b"}
+    for invalid in (
+        {"concurrency_limit": "0"},
+        {"circuit_breaker": "2"},
+        {"concurrency_limit": "many"},
+        {"latency_target": "1"},
+    ):
+        with raises(ArgumentError):
+            pop_engine_guard_options(invalid)
+
+
+def test_guards_are_shared_by_engine():
+    options = {"concurrency_limit": 4}
+    guard = get_engine_guard("account/engine", options)
+    assert get_engine_guard("account/engine", dict(options)) is guard
+    assert get_engine_guard("account/other", options) is not guard
+    assert get_engine_guard("account/engine", {}) is None
+
+    dialect = FireboltDialect()
+    dialect.create_connect_args(
+        url.make_url(
+            "firebolt://id:secret@db/engine?account_name=account&concurrency_limit=4"
+        )
+    )
+    assert dialect.engine_guard is guard
+
+
+def test_concurrency_limit(stub_server: StubFireboltServer):
+    lock = Lock()
+    running: Dict[str, int] = {"now": 0, "max": 0}
+
+    def slow(query: str, params: Dict[str, str]) -> bytes:
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        sleep(0.02)
+        with lock:
+            running["now"] -= 1
+        return encode_result([("id", "int")], [[1]])
+
+    stub_server.add_handler(r"select slow", slow)
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&concurrency_limit=2",
+        pool_size=6,
+    )
+
+    def run(_: int) -> List[Any]:
+        with engine.connect() as connection:
+            return connection.execute(text("select slow")).fetchall()
+
+    with ThreadPoolExecutor(6) as executor:
+        results = list(executor.map(run, range(12)))
+    engine.dispose()
+    assert results == [[(1,)]] * 12
+    assert running["max"] == 2
+
+
+def text_error(status: int, message: str) -> StubHTTPError:
+    return StubHTTPError(status, message, content_type="text/plain")
+
+
+@mark.parametrize(
+    "error,raised",
+    [
+        (StubHTTPError, HTTPStatusError),
+        (structured_error, exc.ProgrammingError),
+        (text_error, exc.DBAPIError),
+    ],
+)
+async def test_circuit_breaker_execution(
+    stub_server: StubFireboltServer, error: Callable, raised: type
+):
+    def unavailable_handler(query: str, params: Dict[str, str]) -> bytes:
+        raise error(503, "engine is overloaded")
+
+    stub_server.add_handler(r"select \* from t", unavailable_handler)
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}&circuit_breaker=0.5"
+    )
+    async with engine.connect() as connection:
+        for _ in range(10):
+            with raises(raised):
+                await connection.execute(text("select * from t"))
+        with raises(exc.OperationalError, match="circuit breaker"):
+            await connection.execute(text("select * from t"))
+    await engine.dispose()
+    assert stub_server.queries.count("select * from t") == 10
+
+
+def test_statement_errors_do_not_open_circuit(stub_server: StubFireboltServer):
+    def invalid_handler(query: str, params: Dict[str, str]) -> bytes:
+        raise structured_error(400, "syntax error")
+
+    stub_server.add_handler(r"select \* from t", invalid_handler)
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&circuit_breaker=0.5"
+    )
+    with engine.connect() as connection:
+        for _ in range(12):
+            with raises(exc.ProgrammingError, match="syntax error"):
+                connection.execute(text("select * from t"))
+    engine.dispose()
+    assert stub_server.queries.count("select * from t") == 12
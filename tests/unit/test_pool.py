@@ -0,0 +1,100 @@
+from time import sleep
+from typing import Any, Iterator
+
+from firebolt.client.auth.base import AuthRequest
+from httpx import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from firebolt_db.pool import (
+    DEFAULT_POOL_RECYCLE,
+    FireboltAsyncAdaptedQueuePool,
+    FireboltQueuePool,
+    PoolTelemetry,
+    trace_auth,
+)
+from tests.stub_server import StubFireboltServer
+
+
+class SlowAuth:
+    def auth_flow(self, request: Request) -> Iterator[Request]:
+        response = yield AuthRequest("POST", "http://auth/token")
+        assert response.status_code == 200
+        sleep(0.01)
+        yield request
+
+
+def run_auth_flow(auth: Any, requests: int) -> None:
+    flow = auth.auth_flow(Request("POST", "http://engine"))
+    next(flow)
+    for _ in range(requests):
+        sleep(0.02)
+        try:
+            flow.send(Response(200))
+        except StopIteration:
+            return
+
+
+def test_connect_phases():
+    telemetry = PoolTelemetry()
+    auth = trace_auth(SlowAuth())
+    with telemetry.trace_connect():
+        run_auth_flow(auth, 2)
+        sleep(0.01)
+    # Requests made outside of connecting aren't traced
+    run_auth_flow(auth, 2)
+
+    metrics = telemetry.metrics()
+    assert metrics["connect"]["count"] == 1
+    assert metrics["connect_auth"]["max"] >= 0.02
+    assert metrics["connect_engine_resolve"]["max"] >= 0.02
+    assert metrics["connect_handshake"]["max"] >= 0.01
+    assert metrics["connect"]["max"] >= sum(
+        metrics[name]["max"]
+        for name in ("connect_auth", "connect_engine_resolve", "connect_handshake")
+    )
+
+
+def test_pool_telemetry(stub_server: StubFireboltServer):
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}", pool_size=2)
+    assert isinstance(engine.pool, FireboltQueuePool)
+    assert engine.pool._recycle == DEFAULT_POOL_RECYCLE
+    assert engine.pool.size() == 2
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("select 1"))
+    telemetry = engine.pool.telemetry
+    engine.dispose()
+    # Telemetry is kept across dispose()
+    assert engine.pool.telemetry is telemetry
+
+    metrics = telemetry.metrics()
+    assert metrics["checkout_wait"]["count"] == 3
+    assert metrics["connection_reuses"] == {"count": 3, "mean": 1.0, "max": 2}
+    assert metrics["connection_age"]["max"] > 0
+    assert metrics["connect"]["count"] == metrics["connect_handshake"]["count"]
+
+
+def test_pool_recycle_option(stub_server: StubFireboltServer):
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}", pool_recycle=0)
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    engine.dispose()
+    # Recycled on every checkout
+    assert engine.pool.telemetry.metrics()["connection_reuses"]["max"] == 0
+
+
+async def test_async_pool_telemetry(stub_server: StubFireboltServer):
+    engine = create_async_engine(f"asyncio+firebolt://firebolt?url={stub_server.url}")
+    assert isinstance(engine.pool, FireboltAsyncAdaptedQueuePool)
+    for _ in range(2):
+        async with engine.connect() as connection:
+            await connection.execute(text("select 1"))
+    await engine.dispose()
+
+    metrics = engine.pool.telemetry.metrics()
+    assert metrics["checkout_wait"]["count"] == 2
+    assert metrics["connection_reuses"]["max"] == 1
+    assert metrics["connect"]["count"] >= 1
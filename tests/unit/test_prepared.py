@@ -0,0 +1,133 @@
+import json
+from typing import Dict, List
+from unittest import mock
+
+from pytest import mark, raises
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.prepared import (
+    PreparedStatementCache,
+    parse_prepared_statements,
+    prepare_statement,
+)
+from tests.stub_server import StubFireboltServer, encode_result
+
+
+@mark.parametrize(
+    "statement,query",
+    [
+        ("select * from t where a = ?", "select * from t where a = $1"),
+        (
+            "select '?', \"?\" from t where a = ? and b in (?, ?);",
+            "select '?', \"?\" from t where a = $1 and b in ($2, $3);",
+        ),
+        (
+            "select 'it''s ?' -- ?\n, /* ? */ ? from t",
+            "select 'it''s ?' -- ?\n, /* ? */ $1 from t",
+        ),
+        ("select E'\\'?' from t where a = ?", "select E'\\'?' from t where a = $1"),
+    ],
+)
+def test_prepare_statement(statement: str, query: str):
+    prepared = prepare_statement(statement)
+    assert prepared is not None
+    assert prepared.query == query
+    assert prepared.parameter_count == query.count("$")
+
+
+@mark.parametrize(
+    "statement",
+    [
+        "select * from t",
+        "select ?; select ?",
+        "SET time_zone = ?",
+        "select ';?' from t",
+    ],
+)
+def test_statements_not_prepared(statement: str):
+    assert prepare_statement(statement) is None
+
+
+def test_prepared_statement_cache():
+    cache = PreparedStatementCache(2)
+    first = cache.prepare("select ?", [1])
+    assert first is not None
+    assert cache.prepare("select ?", [2]) is first
+    assert cache.prepare("select ?", []) is None
+    # Wrong number of parameters are left to the SDK to report
+    assert cache.prepare("select ?", [1, 2]) is None
+    assert cache.prepare("select 1", [1]) is None
+    assert cache.prepare("select ?, ?", [1, 2]) is not None
+    assert cache.prepare("select ?", [3]) is not first
+    assert cache.metrics() == {"prepared": 3, "hits": 2, "evicted": 2}
+
+
+def test_prepared_statements_option():
+    parameters = {"prepared_statements": "64", "a": "b"}
+    assert parse_prepared_statements(parameters) == 64
+    assert parameters == {"a": "b"}
+    assert parse_prepared_statements({}) is None
+    for invalid in ("0", "many"):
+        with raises(ArgumentError):
+            parse_prepared_statements({"prepared_statements": invalid})
+    # SDK releases without statement planners
+    with mock.patch.dict(
+        "sys.modules", {"firebolt.common.cursor.statement_planners": None}
+    ):
+        with raises(ArgumentError, match="firebolt-sdk 1.16.0"):
+            parse_prepared_statements({"prepared_statements": "8"})
+    with raises(ArgumentError):
+        FireboltDialect().create_connect_args(
+            url.make_url(
+                "firebolt://db/engine?url=http://localhost&prepared_statements=8"
+                "&read_engines=http://localhost:1"
+            )
+        )
+
+
+def record_parameters(calls: List[Dict[str, str]]):
+    def handler(query: str, params: Dict[str, str]) -> bytes:
+        calls.append(json.loads(params.get("query_parameters", "[]")))
+        return encode_result([("id", "int")], [[1]])
+
+    return handler
+
+
+def test_prepared_execution(stub_server: StubFireboltServer):
+    calls: List[Dict[str, str]] = []
+    stub_server.add_handler(r"select id from t where id = .*", record_parameters(calls))
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&prepared_statements=8"
+    )
+    statement = text("select id from t where id = :id")
+    with engine.connect() as connection:
+        for value in (5, 6):
+            assert connection.execute(statement, {"id": value}).fetchall() == [(1,)]
+        cache = connection.connection.dbapi_connection._prepared_statements
+    engine.dispose()
+
+    assert stub_server.queries[-2:] == ["select id from t where id = $1"] * 2
+    assert calls == [[{"name": "$1", "value": 5}], [{"name": "$1", "value": 6}]]
+    assert cache.metrics() == {"prepared": 1, "hits": 1, "evicted": 0}
+
+
+async def test_prepared_execution_async(stub_server: StubFireboltServer):
+    calls: List[Dict[str, str]] = []
+    stub_server.add_handler(r"select id from t where id = .*", record_parameters(calls))
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}&prepared_statements=8"
+        "&spill_threshold=100"
+    )
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text("select id from t where id = :id"), {"id": "a"}
+        )
+        assert result.fetchall() == [(1,)]
+    await engine.dispose()
+
+    assert stub_server.queries[-1] == "select id from t where id = $1"
+    assert calls == [[{"name": "$1", "value": "a"}]]
@@ -0,0 +1,106 @@
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import MetaData, create_engine
+
+from firebolt_db.reflection import ColumnCache
+from tests.stub_server import StubFireboltServer, encode_result
+
+
+def test_column_cache():
+    cache = ColumnCache()
+    columns = {"a": [{"name": "id"}], "b": [{"name": "id"}, {"name": "x"}]}
+    assert cache.lookup(None, {"a": (1, 10), "b": (2, 20)}) == ({}, ["a", "b"])
+    cache.store(None, {"a": (1, 10), "b": (2, 20)}, columns)
+
+    cached, changed = cache.lookup(None, {"a": (1, 10), "b": (2, 21)})
+    assert cached == {"a": [{"name": "id"}]}
+    assert changed == ["b"]
+    # Cached columns are copies
+    cached["a"][0]["name"] = "changed"
+    assert cache.lookup(None, {"a": (1, 10)})[0] == {"a": [{"name": "id"}]}
+    # Schemas are cached separately
+    assert cache.lookup("other", {"a": (1, 10)}) == ({}, ["a"])
+
+    cache.retain(None, ["b"])
+    assert cache.lookup(None, {"a": (1, 10)}) == ({}, ["a"])
+    cache.store(None, {"a": (1, 10)}, columns)
+    cache.invalidate()
+    assert cache.lookup(None, {"a": (1, 10)}) == ({}, ["a"])
+    assert cache.metrics() == {"reused": 2, "fetched": 6}
+
+
+def test_incremental_reflection(stub_server: StubFireboltServer):
+    catalog: Dict[str, List[Tuple[str, str]]] = {
+        "sales": [("id", "int"), ("amount", "int")],
+        "users": [("id", "int")],
+        "events": [("id", "int"), ("name", "text")],
+    }
+
+    def tables(query: str, params: Dict[str, str]) -> bytes:
+        return encode_result([("table_name", "text")], [[name] for name in catalog])
+
+    def fingerprints(query: str, params: Dict[str, str]) -> bytes:
+        return encode_result(
+            [("table_name", "text"), ("column_count", "long"), ("column_hash", "long")],
+            [
+                [name, len(columns), hash(tuple(columns)) % 2**62]
+                for name, columns in catalog.items()
+            ],
+        )
+
+    def columns(query: str, params: Dict[str, str]) -> bytes:
+        match = re.search(r"table_name in \((.*)\)", query)
+        names = re.findall(r"'(\w+)'", match.group(1)) if match else list(catalog)
+        return encode_result(
+            [
+                ("table_name", "text"),
+                ("column_name", "text"),
+                ("data_type", "text"),
+                ("is_nullable", "int"),
+            ],
+            [
+                [name, column, type_, 0]
+                for name in names
+                for column, type_ in catalog[name]
+            ],
+        )
+
+    stub_server.add_handler(
+        r"select table_name from information_schema\.tables", tables
+    )
+    stub_server.add_result(
+        r".*from information_schema\.(views|indexes).*", [("table_name", "text")], []
+    )
+    stub_server.add_handler(r".*from information_schema\.columns.*", columns)
+    stub_server.add_handler(r".*column_count.*group by table_name", fingerprints)
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}", incremental_reflection=True
+    )
+
+    def reflect() -> MetaData:
+        stub_server.queries.clear()
+        metadata = MetaData()
+        metadata.reflect(engine)
+        return metadata
+
+    first = reflect()
+    assert sorted(first.tables) == ["events", "sales", "users"]
+    # Fingerprints and columns of all tables are read at once the first time
+    assert sum("information_schema.columns" in q for q in stub_server.queries) == 2
+
+    catalog["users"].append(("email", "text"))
+    del catalog["events"]
+    second = reflect()
+    engine.dispose()
+
+    assert sorted(second.tables) == ["sales", "users"]
+    assert list(second.tables["users"].columns.keys()) == ["id", "email"]
+    assert list(second.tables["sales"].columns.keys()) == ["id", "amount"]
+    (columns_query,) = [
+        query
+        for query in stub_server.queries
+        if "column_name" in query and "count(*)" not in query
+    ]
+    assert "table_name in ('users')" in columns_query
+    assert engine.dialect.column_cache.metrics() == {"reused": 1, "fetched": 4}
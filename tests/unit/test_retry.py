@@ -0,0 +1,200 @@
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from firebolt.utils.exception import FireboltError, FireboltStructuredError
+from httpx import HTTPStatusError, Request, Response
+from pytest import fixture, mark, raises
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.retry import (
+    RETRY_BUDGET_RESERVE,
+    RetryPolicy,
+    is_transient_error,
+    parse_retry_policy,
+)
+from tests.stub_server import (
+    StubFireboltServer,
+    StubHTTPError,
+    encode_result,
+    structured_error,
+)
+
+
+@fixture(autouse=True)
+def no_sleep() -> Any:
+    with mock.patch("firebolt_db.retry.time.sleep") as sleep_mock:
+        yield sleep_mock
+
+
+def status_error(status: int) -> HTTPStatusError:
+    request = Request("POST", "http://localhost")
+    return HTTPStatusError("error", request=request, response=Response(status))
+
+
+def failing(errors: List[Exception], result: Any = "ok") -> Callable[[], Any]:
+    """Function raising `errors` one after another, then returning `result`."""
+    remaining = list(errors)
+
+    def function() -> Any:
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    return function
+
+
+def flaky_handler(
+    failures: int, status: int = 503, error: Callable = StubHTTPError
+) -> Callable:
+    calls = {"count": 0}
+
+    def handler(query: str, params: Dict[str, str]) -> bytes:
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error(status, "engine is scaling")
+        return encode_result([("id", "int")], [[1]])
+
+    return handler
+
+
+def text_error(status: int, message: str) -> StubHTTPError:
+    return StubHTTPError(status, message, content_type="text/plain")
+
+
+def test_is_transient_error():
+    assert is_transient_error(status_error(429))
+    assert is_transient_error(status_error(503))
+    assert not is_transient_error(status_error(500))
+    assert not is_transient_error(ValueError("503"))
+    # Errors the SDK raised without a response
+    assert not is_transient_error(FireboltError("503"))
+
+
+def test_retry(no_sleep: mock.Mock):
+    policy = RetryPolicy(retries=3, backoff=1.0)
+    with mock.patch("firebolt_db.retry.random.uniform", side_effect=lambda a, b: b):
+        assert policy.call(failing([status_error(503), status_error(429)])) == "ok"
+    # Delays are drawn up to the doubled backoff
+    assert [call.args[0] for call in no_sleep.call_args_list] == [1.0, 2.0]
+    assert policy.metrics() == {
+        "statements": 1,
+        "retries": 2,
+        "recovered": 1,
+        "exhausted": 0,
+        "budget_exhausted": 0,
+    }
+
+
+def test_retry_gives_up():
+    policy = RetryPolicy(retries=1)
+    with raises(HTTPStatusError):
+        policy.call(failing([status_error(503)] * 2))
+    with raises(ValueError):
+        policy.call(failing([ValueError()]))
+    metrics = policy.metrics()
+    assert metrics["retries"] == 1 and metrics["exhausted"] == 1
+
+
+def test_retry_budget():
+    policy = RetryPolicy(retries=100, budget=0.5)
+    with raises(HTTPStatusError):
+        policy.call(failing([status_error(503)] * 100))
+    # The reserve and the share earned by the statement were spent
+    assert policy.metrics()["retries"] == RETRY_BUDGET_RESERVE
+    assert policy.metrics()["budget_exhausted"] == 1
+    for _ in range(4):
+        policy.call(failing([]))
+    # Four statements earned two retries
+    with raises(HTTPStatusError):
+        policy.call(failing([status_error(503)] * 100))
+    assert policy.metrics()["retries"] == RETRY_BUDGET_RESERVE + 2
+
+
+async def test_async_retry():
+    policy = RetryPolicy(retries=2, backoff=0)
+    failing_call = failing([status_error(503)])
+
+    async def call() -> str:
+        return failing_call()
+
+    assert await policy.acall(call) == "ok"
+    assert policy.metrics()["recovered"] == 1
+
+
+def test_parse_retry_policy():
+    assert parse_retry_policy({}) is None
+    assert parse_retry_policy({"retries": "0"}) is None
+    parameters = {"retries": "3", "retry_backoff": "0.5", "query_label": "x"}
+    policy = parse_retry_policy(parameters)
+    assert (policy.retries, policy.backoff) == (3, 0.5)
+    assert parameters == {"query_label": "x"}
+    for invalid in ({"retries": "-1"}, {"retries": "x"}, {"retry_budget": "1"}):
+        with raises(ArgumentError):
+            parse_retry_policy(invalid)
+
+
+def test_create_connect_args_retries():
+    dialect = FireboltDialect()
+    dialect.create_connect_args(
+        url.make_url("firebolt://firebolt?url=http://localhost&retries=2")
+    )
+    assert dialect.retry_policy.retries == 2
+
+
+@mark.parametrize("status", [429, 503])
+def test_retried_execution(stub_server: StubFireboltServer, status: int):
+    stub_server.add_handler(r"select \* from t", flaky_handler(2, status))
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}&retries=2")
+    with engine.connect() as connection:
+        assert connection.execute(text("select * from t")).fetchall() == [(1,)]
+    engine.dispose()
+    assert stub_server.queries.count("select * from t") == 3
+    assert engine.dialect.retry_policy.metrics()["recovered"] == 1
+
+
+@mark.parametrize(
+    "error,sdk_error",
+    [(structured_error, FireboltStructuredError), (text_error, FireboltError)],
+)
+def test_retried_error_bodies(
+    stub_server: StubFireboltServer, error: Callable, sdk_error: type
+):
+    stub_server.add_handler(r"select \* from t", flaky_handler(1, 503, error))
+    stub_server.add_handler(r"select 1 from t", flaky_handler(1, 400, error))
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}&retries=2")
+    with engine.connect() as connection:
+        assert connection.execute(text("select * from t")).fetchall() == [(1,)]
+        with raises(exc.DBAPIError) as info:
+            connection.execute(text("select 1 from t"))
+    engine.dispose()
+    # The SDK raised the error from the body, it was retried by its status
+    assert type(info.value.orig) is sdk_error
+    assert stub_server.queries.count("select * from t") == 2
+    assert stub_server.queries.count("select 1 from t") == 1
+
+
+def test_writes_are_not_retried(stub_server: StubFireboltServer):
+    stub_server.add_handler(r"insert into t .*", flaky_handler(1))
+    engine = create_engine(f"firebolt://firebolt?url={stub_server.url}&retries=2")
+    with engine.connect() as connection:
+        with raises(HTTPStatusError):
+            connection.execute(text("insert into t values (1)"))
+    engine.dispose()
+    assert stub_server.queries.count("insert into t values (1)") == 1
+
+
+async def test_async_retried_execution(stub_server: StubFireboltServer):
+    stub_server.add_handler(r"select \* from t", flaky_handler(1))
+    engine = create_async_engine(
+        f"asyncio+firebolt://firebolt?url={stub_server.url}"
+        "&retries=1&retry_backoff=0"
+    )
+    async with engine.connect() as connection:
+        result = await connection.execute(text("select * from t"))
+        assert result.fetchall() == [(1,)]
+    await engine.dispose()
+    assert engine.dialect.retry_policy.metrics()["retries"] == 1
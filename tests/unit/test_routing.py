@@ -0,0 +1,155 @@
+from typing import Iterator, List
+from unittest import mock
+
+from pytest import fixture, mark, raises
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+
+from firebolt_db.firebolt_async_dialect import AsyncFireboltDialect
+from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.routing import (
+    LEAST_LOADED,
+    ReadRouter,
+    RoutingConnection,
+    is_read_statement,
+    parse_pool_sizes,
+    parse_read_targets,
+)
+from tests.stub_server import StubFireboltServer
+
+
+@fixture
+def read_servers() -> Iterator[List[StubFireboltServer]]:
+    with StubFireboltServer() as first, StubFireboltServer() as second:
+        yield [first, second]
+
+
+@mark.parametrize(
+    ["statement", "is_read"],
+    [
+        ("SELECT 1", True),
+        ("  select * from t", True),
+        ("WITH x AS (SELECT 1) SELECT * FROM x", True),
+        ("(SELECT 1) UNION ALL (SELECT 2)", True),
+        ("-- comment\nSELECT 1", True),
+        ("/* hint */ select 1", True),
+        ("SHOW TABLES", True),
+        ("INSERT INTO t SELECT * FROM s", False),
+        ("CREATE TABLE t (id INT)", False),
+        ("SET time_zone = 'UTC'", False),
+        ("selection_table", False),
+    ],
+)
+def test_is_read_statement(statement: str, is_read: bool):
+    assert is_read_statement(statement) is is_read
+
+
+def test_parse_routing_parameters():
+    assert parse_read_targets("r1, r2") == ["r1", "r2"]
+    assert parse_read_targets(("r1", "r2,r3")) == ["r1", "r2", "r3"]
+    assert parse_pool_sizes(None, ["r1", "r2"]) == [5, 5]
+    assert parse_pool_sizes("3", ["r1", "r2"]) == [3, 3]
+    assert parse_pool_sizes("3,7", ["r1", "r2"]) == [3, 7]
+    for invalid in ("3,7,1", "0", "many"):
+        with raises(ArgumentError):
+            parse_pool_sizes(invalid, ["r1", "r2"])
+
+
+def test_create_connect_args_read_engines():
+    dialect = FireboltDialect()
+    u = url.make_url(
+        "firebolt://id:secret@db/writer?account_name=account"
+        "&read_engines=r1,r2&read_routing=least_loaded&read_pool_size=2,3"
+        "&query_label=routed"
+    )
+    with mock.patch.object(dialect, "_connect_read_engine") as connect:
+        _, kwargs = dialect.create_connect_args(u)
+        router = dialect.read_router
+        assert router.strategy == LEAST_LOADED
+        assert [pool.size() for pool in router.pools] == [2, 3]
+        router.pools[1].connect()
+    assert kwargs["engine_name"] == "writer"
+    assert connect.call_args.kwargs["engine_name"] == "r2"
+    # Routing options are not sent to Firebolt as SET parameters
+    assert kwargs["set_parameters"] == {"query_label": "routed"}
+
+
+def test_create_connect_args_read_routing_errors():
+    for query in ("read_routing=round_robin", "read_engines=r1&read_routing=random"):
+        with raises(ArgumentError):
+            FireboltDialect().create_connect_args(
+                url.make_url(f"firebolt://id:secret@db/writer?account_name=a&{query}")
+            )
+    with raises(ArgumentError):
+        AsyncFireboltDialect().create_connect_args(
+            url.make_url(
+                "asyncio+firebolt://id:secret@db/writer?account_name=a&read_engines=r1"
+            )
+        )
+
+
+def test_round_robin():
+    connections = [mock.Mock(), mock.Mock()]
+    router = ReadRouter([lambda: connections[0], lambda: connections[1]], [1, 1])
+    for expected in (0, 1, 0):
+        read_connection = router.checkout()
+        assert read_connection.dbapi_connection is connections[expected]
+        read_connection.close()
+
+
+def test_least_loaded():
+    router = ReadRouter([mock.Mock, mock.Mock], [1, 2], LEAST_LOADED)
+    first = router.checkout()
+    second = router.checkout()
+    # The first pool is full, the second one is half used
+    assert router.checkout()._pool is router.pools[1]
+    assert {first._pool, second._pool} == set(router.pools)
+
+
+def test_routed_execution(
+    stub_server: StubFireboltServer, read_servers: List[StubFireboltServer]
+):
+    for server in read_servers:
+        server.add_result(r"select \* from t", [("id", "int")], [[1]])
+    read_urls = ",".join(server.url for server in read_servers)
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&read_engines={read_urls}"
+    )
+    with engine.connect() as connection:
+        assert isinstance(connection.connection.dbapi_connection, RoutingConnection)
+        for _ in range(4):
+            assert connection.execute(text("select * from t")).fetchall() == [(1,)]
+        connection.execute(text("insert into t values (1)"))
+        router = engine.dialect.read_router
+        # Read connections are returned to their pools once results are fetched
+        assert [pool.checkedout() for pool in router.pools] == [0, 0]
+    engine.dispose()
+    assert [pool.checkedin() for pool in router.pools] == [0, 0]
+
+    assert stub_server.queries == ["insert into t values (1)"]
+    for server in read_servers:
+        assert server.queries == ["select * from t"] * 2
+
+
+def test_transaction_stays_on_writer(
+    stub_server: StubFireboltServer, read_servers: List[StubFireboltServer]
+):
+    stub_server.add_result(r"select \* from t", [("id", "int")], [[1]])
+    for server in read_servers:
+        server.add_result(r"select \* from t", [("id", "int")], [[2]])
+    read_urls = ",".join(server.url for server in read_servers)
+    engine = create_engine(
+        f"firebolt://firebolt?url={stub_server.url}&read_engines={read_urls}"
+    )
+    with engine.connect() as connection:
+        sdk_connection = connection.connection.dbapi_connection._connection
+        # As set by the engine's response to the first statement of a transaction
+        sdk_connection._transaction_id = "1"
+        assert connection.execute(text("select * from t")).fetchall() == [(1,)]
+        sdk_connection._transaction_id = None
+        assert connection.execute(text("select * from t")).fetchall() == [(2,)]
+    engine.dispose()
+
+    assert stub_server.queries == ["select * from t"]
+    assert sum(len(server.queries) for server in read_servers) == 1
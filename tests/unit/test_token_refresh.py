@@ -0,0 +1,181 @@
+import json
+from time import monotonic, sleep, time
+from typing import Dict
+from unittest import mock
+
+from firebolt.client.auth import ClientCredentials, UsernamePassword
+from httpx import URL, Request, Response
+from pytest import approx, raises
+from sqlalchemy import create_engine
+from sqlalchemy.engine import url
+from sqlalchemy.exc import ArgumentError
+
+from firebolt_db.firebolt_dialect import FireboltDialect
+from firebolt_db.token_refresh import (
+    TokenRefresher,
+    get_token_endpoint,
+    refresh_in_background,
+)
+from tests.stub_server import StubFireboltServer, StubHTTPError
+
+
+def token_handler(query: str, params: Dict[str, str]) -> bytes:
+    return json.dumps({"access_token": "fresh", "expires_in": 3600}).encode("utf-8")
+
+
+def expiring_auth(expires_in: int) -> ClientCredentials:
+    auth = ClientCredentials("id", "secret", use_token_cache=False)
+    auth._token = "stale"
+    auth._expires = int(time()) + expires_in
+    return auth
+
+
+def wait_for(refresher: TokenRefresher, metric: str) -> None:
+    deadline = monotonic() + 5
+    while not refresher.metrics()[metric] and monotonic() < deadline:
+        sleep(0.01)
+
+
+def test_get_token_endpoint():
+    auth = ClientCredentials("id", "secret", use_token_cache=False)
+    assert get_token_endpoint(None, auth) == URL("https://id.app.firebolt.io")
+    assert get_token_endpoint("api.dev.firebolt.io", auth) == URL(
+        "https://id.dev.firebolt.io"
+    )
+    # V1 auth logs in against the API
+    auth = UsernamePassword("user@firebolt.io", "password", use_token_cache=False)
+    assert get_token_endpoint(None, auth) == URL("https://api.app.firebolt.io")
+    assert get_token_endpoint("api.dev.firebolt.io", auth) == URL(
+        "https://api.dev.firebolt.io"
+    )
+
+
+def test_refresh_before_expiry(stub_server: StubFireboltServer):
+    stub_server.add_handler(r"client_id=id&client_secret=secret.*", token_handler)
+    auth = expiring_auth(1)
+    refresher = TokenRefresher(auth, URL(stub_server.url), margin=60)
+    refresher.schedule()
+    wait_for(refresher, "refreshed")
+    refresher.stop()
+
+    assert auth.token == "fresh"
+    assert auth._expires >= time() + 3500
+    assert refresher.metrics() == {"refreshed": 1, "failed": 0}
+
+
+def test_refresh_username_password(stub_server: StubFireboltServer):
+    stub_server.add_handler(r'\{"username": ?"user@firebolt\.io".*', token_handler)
+    auth = UsernamePassword("user@firebolt.io", "password", use_token_cache=False)
+    auth._token, auth._expires = "stale", int(time()) + 1
+    refresher = TokenRefresher(auth, get_token_endpoint(stub_server.url, auth))
+    refresher.schedule()
+    wait_for(refresher, "refreshed")
+    refresher.stop()
+
+    assert auth.token == "fresh"
+    assert refresher.metrics() == {"refreshed": 1, "failed": 0}
+
+
+def test_refresh_failure(stub_server: StubFireboltServer):
+    def failing_handler(query: str, params: Dict[str, str]) -> bytes:
+        raise StubHTTPError(503, "unavailable")
+
+    stub_server.add_handler(r"client_id=.*", failing_handler)
+    auth = expiring_auth(1)
+    refresher = TokenRefresher(auth, URL(stub_server.url), margin=60)
+    refresher.schedule()
+    wait_for(refresher, "failed")
+    refresher.stop()
+
+    # The token in use is kept until it expires
+    assert auth.token == "stale"
+    assert refresher.metrics() == {"refreshed": 0, "failed": 1}
+
+
+def test_refresh_delays():
+    auth = expiring_auth(1000)
+    refresher = TokenRefresher(auth, URL("http://localhost"), margin=300)
+    with mock.patch("firebolt_db.token_refresh.Timer") as timer:
+        refresher.schedule()
+        assert timer.call_args.args[0] == approx(700, abs=1)
+        # Tokens living shorter than the margin are used for half their lifetime
+        refresher._timer = None
+        auth._expires = int(time()) + 200
+        refresher.schedule()
+        assert timer.call_args.args[0] == approx(100, abs=1)
+        # Expired tokens, e.g. by a skewed clock, are left to statements
+        refresher._timer = None
+        auth._expires = int(time()) - 10
+        refresher.schedule()
+        assert timer.call_count == 2
+
+        # Failed refreshes are retried with backoff
+        auth._expires = int(time()) + 1000
+        with mock.patch.object(refresher, "refresh", side_effect=OSError):
+            for _ in range(5):
+                refresher._run()
+        delays = [call.args[0] for call in timer.call_args_list[2:]]
+        assert delays == [30, 60, 120, 240, 300]
+        assert refresher.metrics()["failed"] == 5
+
+
+def test_refresh_scheduled_by_requests(stub_server: StubFireboltServer):
+    stub_server.add_handler(r"client_id=.*", token_handler)
+    auth = ClientCredentials("id", "secret", use_token_cache=False)
+    refresher = refresh_in_background(auth, URL(stub_server.url))
+    assert refresher.metrics()["refreshed"] == 0
+
+    # A token about to expire was used for a request
+    auth._token, auth._expires = "stale", int(time()) + 1
+    flow = auth.auth_flow(Request("POST", "http://engine"))
+    assert next(flow).headers["Authorization"] == "Bearer stale"
+    with raises(StopIteration):
+        flow.send(Response(200))
+    wait_for(refresher, "refreshed")
+    refresher.stop()
+    assert auth.token == "fresh"
+
+
+def test_token_refresh_option():
+    dialect = FireboltDialect()
+    dialect.create_connect_args(
+        url.make_url("firebolt://id:secret@db/engine?account_name=a&token_refresh=1")
+    )
+    assert isinstance(dialect.token_refresher, TokenRefresher)
+    assert dialect.token_refresher.token_endpoint == URL("https://id.app.firebolt.io")
+    dialect.token_refresher.stop()
+
+    dialect.create_connect_args(
+        url.make_url(
+            "firebolt://user@firebolt.io:password@db/engine?account_name=a"
+            "&token_refresh=1"
+        )
+    )
+    assert dialect.token_refresher.token_endpoint == URL("https://api.app.firebolt.io")
+    dialect.token_refresher.stop()
+
+    dialect.create_connect_args(
+        url.make_url("firebolt://id:secret@db/engine?account_name=a")
+    )
+    assert dialect.token_refresher is None
+    with raises(ArgumentError):
+        dialect.create_connect_args(
+            url.make_url("firebolt://db?url=http://localhost&token_refresh=true")
+        )
+
+
+def test_refresh_stops_on_dispose():
+    engine = create_engine(
+        "firebolt://id:secret@db/engine?account_name=a&token_refresh=1"
+    )
+    refresher = engine.dialect.token_refresher
+    auth = refresher._auth()
+    auth._token, auth._expires = "stale", int(time()) + 3600
+    refresher.schedule()
+    assert refresher._timer is not None
+    engine.dispose()
+
+    assert refresher._timer is None
+    # Requests made after disposal don't schedule refreshes again
+    refresher.schedule()
+    assert refresher._timer is None